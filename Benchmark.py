@@ -0,0 +1,400 @@
+from Vertex import Vertex
+from Graph import Graph
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+def vertex_memory(n=100000, degree=6, seed=0):
+    """Measures how many bytes each vertex of a random graph takes up, including its edges
+
+    With the defaults, vertices took 961.8 bytes each before they were slotted and kept
+    their edges in a single dictionary, and take 785.3 bytes each after (18% less)
+
+    Parameters
+    ----------
+    n : int, optional
+        The number of vertices in the graph
+    degree : int, optional
+        The average degree of the vertices in the graph
+    seed : int, optional
+        The seed of the random number generator used to pick the edges
+
+    Returns
+    -------
+    float
+        The number of bytes allocated per vertex to build the graph
+    """
+    rng = random.Random(seed)
+
+    tracemalloc.start()
+    graph = Graph()
+    graph.add_vertices(*[Vertex(0, rng.randrange(1000), rng.randrange(1000), i) for i in range(n)])
+    for _ in range(n * degree // 2):
+        graph.create_edge(rng.randrange(n), rng.randrange(n), rng.randrange(100))
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return allocated / n
+
+
+def sandpile_drops(side=100, drops=100000, seed=0, mode='queue'):
+    """Measures how quickly grains can be dropped onto a sandpile on a square grid whose
+        boundary vertices are all joined to a sink, as in the Bak-Tang-Wiesenfeld model
+
+    Parameters
+    ----------
+    side : int, optional
+        The number of vertices along each side of the grid
+    drops : int, optional
+        The number of grains to drop
+    seed : int, optional
+        The seed of the random number generator used to pick where the grains are dropped
+    mode : str, optional
+        The avalanche mode of the sandpile, either 'queue' or 'wave'
+
+    Returns
+    -------
+    tuple
+        The number of drops per second and the mean size of the avalanches
+    """
+    from Sandpile import Sandpile
+
+    graph = Graph()
+    graph.add_vertices(*[Vertex(0, 0, 0, i) for i in range(side * side + 1)])
+    sink = side * side
+    for i in range(side * side):
+        if i % side < side - 1:
+            graph.create_edge(i, i + 1)
+        if i + side < side * side:
+            graph.create_edge(i, i + side)
+        if i < side or i >= sink - side or i % side in (0, side - 1):
+            graph.create_edge(i, sink)
+
+    sandpile = Sandpile(graph, sink)
+    start = time.perf_counter()
+    sizes, _ = sandpile.drop_random(drops, seed, mode)
+    return drops / (time.perf_counter() - start), sizes.mean()
+
+
+def dollar_game_time(side=150, seed=0):
+    """Measures how long DollarGameSolver takes to reduce random values on a square grid
+
+    Before the script was settled by bisection and the burning rounds were fired in batches, a
+    150 by 150 grid took about 17 s and a 100 by 100 one about 3.3 s, now they take about 3.4 s
+    and 1.1 s.
+
+    Parameters
+    ----------
+    side : int, optional
+        The number of vertices along each side of the grid
+    seed : int, optional
+        The seed of the random number generator used to pick the values, from 0 to 2
+
+    Returns
+    -------
+    float
+        The number of seconds reduce took
+    """
+    import GraphGenerators
+    from DollarGameSolver import DollarGameSolver
+
+    rng = random.Random(seed)
+    graph = GraphGenerators.grid_graph(side, side)
+    for vertex in graph.vertices:
+        vertex.value = rng.randint(0, 2)
+
+    solver = DollarGameSolver(graph)
+    start = time.perf_counter()
+    solver.reduce()
+    return time.perf_counter() - start
+
+
+def all_pairs_times(n=1000, degree=6, seed=0):
+    """Measures how long each method of ShortestPathCalculator.all_pairs takes on a random graph
+
+    Parameters
+    ----------
+    n : int, optional
+        The number of vertices in the graph
+    degree : int, optional
+        The average degree of the vertices in the graph
+    seed : int, optional
+        The seed of the random number generator used to pick the edges
+
+    Returns
+    -------
+    dict
+        The number of seconds each method took, by method
+    """
+    from ShortestPathCalculator import ShortestPathCalculator
+
+    rng = random.Random(seed)
+    graph = Graph()
+    graph.add_vertices(*[Vertex(0, 0, 0, i) for i in range(n)])
+    for _ in range(n * degree // 2):
+        graph.create_edge(rng.randrange(n), rng.randrange(n), rng.randrange(1, 100))
+
+    # Take the snapshot (and import SciPy) before timing anything
+    sp = ShortestPathCalculator()
+    sp.all_pairs(graph, 'dijkstra')
+
+    times = {}
+    for method in ('floyd-warshall', 'dijkstra'):
+        start = time.perf_counter()
+        sp.all_pairs(graph, method)
+        times[method] = time.perf_counter() - start
+    return times
+
+
+def bulk_edges(n=100000, edges=1000000, seed=0):
+    """Measures how long it takes to add the edges of a random graph with create_edge and with
+        add_edges_from
+
+    With the defaults, create_edge took 3.9 seconds and add_edges_from 2.1 seconds, which came
+    down to 1.6 seconds once its degree histogram changes were grouped by degree
+
+    Parameters
+    ----------
+    n : int, optional
+        The number of vertices in the graph
+    edges : int, optional
+        The number of edges to add (some are repeats or loops, which are not created)
+    seed : int, optional
+        The seed of the random number generator used to pick the edges
+
+    Returns
+    -------
+    dict
+        The number of seconds each way of adding the edges took
+    """
+    rng = random.Random(seed)
+    edge_list = [(rng.randrange(n), rng.randrange(n), rng.randrange(1, 100)) for _ in range(edges)]
+
+    times = {}
+    for method in ('create_edge', 'add_edges_from'):
+        graph = Graph()
+        graph.add_vertices(*[Vertex(0, 0, 0, i) for i in range(n)])
+
+        start = time.perf_counter()
+        if method == 'create_edge':
+            for edge in edge_list:
+                graph.create_edge(*edge)
+        else:
+            graph.add_edges_from(edge_list)
+        times[method] = time.perf_counter() - start
+    return times
+
+
+def edge_list_import(n=100000, edges=1000000, seed=0):
+    """Measures how many edges per second an edge list is imported at, into a Graph and into a
+        binary graph file
+
+    Parameters
+    ----------
+    n : int, optional
+        The number of vertices of the random graph written to the edge list
+    edges : int, optional
+        The number of lines of the edge list
+    seed : int, optional
+        The seed of the random number generator used to pick the edges
+
+    Returns
+    -------
+    dict
+        The number of edges read per second by load_edge_list and by edge_list_to_binary
+    """
+    import os
+    import tempfile
+    from GraphIO import load_edge_list, edge_list_to_binary
+
+    rng = random.Random(seed)
+    rates = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'edges.txt')
+        with open(path, 'w') as file:
+            for _ in range(edges):
+                file.write(f'{rng.randrange(n)} {rng.randrange(n)} {rng.randrange(1, 100)}\n')
+
+        start = time.perf_counter()
+        load_edge_list(path)
+        rates['graph'] = edges / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        edge_list_to_binary(path, os.path.join(directory, 'graph.bin'))
+        rates['binary'] = edges / (time.perf_counter() - start)
+    return rates
+
+
+def round_trips(n=100000, edges=1000000, seed=0):
+    """Measures how long a random graph takes to be written to and read back from each of the
+        graph file formats
+
+    Parameters
+    ----------
+    n : int, optional
+        The number of vertices in the graph
+    edges : int, optional
+        The number of edges to try to add to the graph (repeats and loops are not created)
+    seed : int, optional
+        The seed of the random number generator used to pick the vertices and edges
+
+    Returns
+    -------
+    dict
+        The seconds taken to write and to read the graph, and the size of the file in bytes, by
+        the extension of the format
+    """
+    import os
+    import tempfile
+    from GraphIO import load_graph, save_graph
+
+    rng = random.Random(seed)
+    graph = Graph()
+    graph.add_vertices(*[Vertex(rng.randrange(-10, 10), rng.randrange(1000), rng.randrange(1000), i)
+                         for i in range(n)])
+    graph.add_edges_from([(rng.randrange(n), rng.randrange(n), rng.randrange(1, 100)) for _ in range(edges)])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in ('.txt', '.json', '.graphml', '.bin'):
+            path = os.path.join(directory, 'graph' + extension)
+
+            start = time.perf_counter()
+            save_graph(graph, path)
+            written = time.perf_counter()
+            loaded = load_graph(path)
+            read = time.perf_counter()
+
+            if loaded.weights != graph.weights:
+                raise RuntimeError(f'The {extension} round trip changed the graph')
+            results[extension] = (written - start, read - written, os.path.getsize(path))
+    return results
+
+
+def generator_times(n=1000000, degree=6, seed=0, csr=False):
+    """Measures how long each of the generators of GraphGenerators takes to build a graph
+
+    With the defaults, building Graphs took from 3.8 s (grid) to 15.5 s (Barabasi-Albert), most
+    of it spent creating the vertices and edges, while building CSRGraph snapshots takes from
+    0.2 s (grid) to 2.0 s (random geometric, mostly finding the pairs within the radius)
+
+    Parameters
+    ----------
+    n : int, optional
+        The number of vertices in each graph (rounded down to a square for the grids)
+    degree : int, optional
+        The average degree aimed for by the random geometric, Erdos-Renyi and Barabasi-Albert graphs
+    seed : int, optional
+        The seed of the random number generators
+    csr : bool, optional
+        If True the generators build CSRGraph snapshots rather than Graphs
+
+    Returns
+    -------
+    dict
+        The number of seconds each generator took and the number of edges it created, by generator
+    """
+    import math
+    import GraphGenerators
+
+    side = math.isqrt(n)
+    generators = {'grid': lambda: GraphGenerators.grid_graph(side, side, csr=csr),
+                  'random geometric': lambda: GraphGenerators.random_geometric_graph(
+                      n, 1000 * math.sqrt(degree / (math.pi * n)), seed, csr=csr),
+                  'erdos-renyi': lambda: GraphGenerators.erdos_renyi_graph(n, degree / (n - 1), seed, csr=csr),
+                  'barabasi-albert': lambda: GraphGenerators.barabasi_albert_graph(n, degree // 2, seed,
+                                                                                   csr=csr),
+                  'road': lambda: GraphGenerators.road_graph(side, side, seed=seed, csr=csr)}
+
+    results = {}
+    for name, generate in generators.items():
+        start = time.perf_counter()
+        graph = generate()
+        results[name] = (time.perf_counter() - start, graph.num_edges() if csr else len(graph.weights))
+    return results
+
+
+def import_time(modules=None, runs=5):
+    """Measures how long a fresh interpreter takes to import modules, using python -X importtime
+
+    Parameters
+    ----------
+    modules : str, optional
+        The modules to import, separated by commas, e.g. 'Graph, ShortestPathCalculator', by
+        default nothing is imported, which measures the interpreter's own startup imports
+    runs : int, optional
+        The number of interpreters to start, the fastest one is reported
+
+    Returns
+    -------
+    tuple
+        The total import time in milliseconds (the sum of the time each module took itself)
+        and the number of modules that were imported
+    """
+    best = None
+    for _ in range(runs):
+        code = f'import {modules}' if modules else 'pass'
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                capture_output=True, text=True, check=True)
+
+        # Every module imported writes a line 'import time: self | cumulative | name', after
+        # a header line that has no numbers in it
+        times = []
+        for line in result.stderr.splitlines():
+            if line.startswith('import time:'):
+                own_time = line.split(':', 1)[1].split('|')[0].strip()
+                if own_time.isdigit():
+                    times.append(int(own_time))
+
+        if best is None or sum(times) < best[0]:
+            best = (sum(times), len(times))
+
+    return best[0] / 1000, best[1]
+
+
+# The modules imported by each entry point, and the most milliseconds each may take to import
+# on top of the interpreter's own startup
+STARTUP_BUDGETS = {'Graph, ShortestPathCalculator': 25,
+                   'GraphCLI': 60,
+                   'Graph_GUI': 120}
+
+
+def startup_times():
+    """Prints how long each entry point takes to import and whether it is within its budget"""
+    baseline, baseline_count = import_time()
+    print(f'Interpreter startup: {baseline:.1f} ms for {baseline_count} modules')
+
+    for modules, budget in STARTUP_BUDGETS.items():
+        milliseconds, count = import_time(modules)
+        milliseconds, count = milliseconds - baseline, count - baseline_count
+        status = 'ok' if milliseconds <= budget else 'OVER BUDGET'
+        print(f'{modules}: {milliseconds:.1f} ms for {count} modules (budget {budget} ms) {status}')
+
+
+# The benchmarks that can be run from the command line, e.g. python Benchmark.py memory
+BENCHMARKS = {'memory': lambda: print(f'{vertex_memory():.1f} bytes per vertex'),
+              'sandpile': lambda: print('{:.0f} drops per second, mean avalanche size {:.1f}'
+                                        .format(*sandpile_drops())),
+              'startup': startup_times,
+              'dollar-game': lambda: print(f'{dollar_game_time():.2f} s to reduce a 150 by 150 grid'),
+              'all-pairs': lambda: print(', '.join(f'{method} {seconds:.2f} s'
+                                                   for method, seconds in all_pairs_times().items())),
+              'bulk-edges': lambda: print(', '.join(f'{method} {seconds:.2f} s'
+                                                    for method, seconds in bulk_edges().items())),
+              'round-trip': lambda: print('\n'.join(f'{extension}: write {write:.2f} s, read {read:.2f} s, '
+                                                     f'{size / 2 ** 20:.1f} MiB'
+                                                     for extension, (write, read, size) in round_trips().items())),
+              'edge-list': lambda: print(', '.join(f'{target} {rate:.0f} edges per second'
+                                                   for target, rate in edge_list_import().items())),
+              'generators': lambda: print('\n'.join(f'{name}: {seconds:.2f} s, {edges} edges'
+                                                     for name, (seconds, edges) in generator_times().items())),
+              'generators-csr': lambda: print('\n'.join(f'{name}: {seconds:.2f} s, {edges} edges'
+                                                         for name, (seconds, edges)
+                                                         in generator_times(csr=True).items()))}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS.keys():
+        BENCHMARKS[name]()
@@ -0,0 +1,425 @@
+import numpy as np
+import os
+import struct
+
+
+class CSRGraph:
+    """
+    Class which holds a compressed sparse row (CSR) snapshot of a graph's adjacency structure
+
+    Every vertex of the graph is given an index from 0 to n-1 (in the order of Graph.vertices).
+    The neighbors of the vertex with index i are indices[indptr[i]:indptr[i+1]] and the weights
+    of the edges to them are weights[indptr[i]:indptr[i+1]]. Since the graph is undirected
+    every edge appears twice, once in the row of each of its vertices.
+
+    Attributes
+    ----------
+    indptr : ndarray
+        An array of length n+1 of the offsets at which each vertex's row begins in indices
+    indices : ndarray
+        An array of the indices of the neighbors of every vertex, row by row
+    weights : ndarray
+        An array of the weights of the edges in the same order as indices
+    ids : ndarray
+        An array mapping each index to the id number of the vertex it stands for
+    index : dict
+        A dictionary mapping the id number of each vertex to its index, built the first time
+        it is needed
+    x : ndarray
+        An array of the x-coordinate of every vertex, or None if the snapshot has no coordinates
+    y : ndarray
+        An array of the y-coordinate of every vertex, or None if the snapshot has no coordinates
+    values : ndarray
+        An array of the value of every vertex, or None if the snapshot has no values
+
+    Methods
+    -------
+    from_graph(graph)
+        Builds the CSR snapshot of a Graph
+    from_edges(n, first, second, weights, x=None, y=None, values=None)
+        Builds a snapshot straight from arrays of edges, without a Graph
+    num_vertices()
+        Returns the number of vertices in the snapshot
+    num_edges()
+        Returns the number of (undirected) edges in the snapshot
+    degrees()
+        Returns an array of the degree of every vertex
+    neighbors(i)
+        Returns the indices of the neighbors of the vertex with index i
+    index_of(id)
+        Returns the index of the vertex with the given id number
+    laplacian()
+        Returns the (unweighted) Laplacian matrix of the graph as a SciPy sparse matrix
+    save(path)
+        Writes the snapshot to a binary graph file
+    load(path, mmap=True)
+        Reads a snapshot from a binary graph file, memory-mapping its arrays
+    to_graph()
+        Builds a Graph with the vertices and edges of the snapshot
+    """
+
+    # A binary graph file starts with a header of the magic bytes, the version of the format,
+    # the size in bytes of each entry of indices, the flags below, the number of vertices and
+    # the number of entries of indices. Then come the arrays ids, x, y, values, indptr, indices
+    # and weights, in that order, little endian and each starting at a multiple of ALIGNMENT
+    # bytes so that they can be used straight from a memory map
+    MAGIC = b'GRAPHCSR'
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<8sHHIQQ')
+    ALIGNMENT = 64
+
+    # Flags of the header, set when every weight (or every coordinate) is a whole number, so that
+    # they become ints again when a Graph is built from the file
+    INTEGER_WEIGHTS = 1
+    INTEGER_COORDINATES = 2
+
+    def __init__(self, indptr, indices, weights, ids, index=None, x=None, y=None, values=None):
+        # The offsets of each vertex's row in the indices and weights arrays
+        self.indptr = indptr
+
+        # The neighbor indices and edge weights of every row, one after the other
+        self.indices = indices
+        self.weights = weights
+
+        # The id number of the vertex with each index, and the reverse mapping (which is only
+        # built when first needed, since a snapshot loaded from a file may be huge)
+        self.ids = ids
+        self.__index = index
+
+        # The coordinates and value of every vertex
+        self.x = x
+        self.y = y
+        self.values = values
+
+        # The flags of the binary graph file the snapshot was loaded from, if it was
+        self.__flags = None
+
+    @property
+    def index(self):
+        """The dictionary mapping the id number of each vertex to its index"""
+        if self.__index is None:
+            self.__index = {id: i for i, id in enumerate(self.ids.tolist())}
+        return self.__index
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Builds the CSR snapshot of a graph
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph whose adjacency structure will be copied
+
+        Returns
+        -------
+        CSRGraph
+            The snapshot of the graph
+        """
+        vertices = graph.vertices
+        n = len(vertices)
+
+        ids = np.fromiter((v.id for v in vertices), dtype=np.int64, count=n)
+        index = {v.id: i for i, v in enumerate(vertices)}
+
+        # The row offsets are the running total of the degrees
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(v.adjacent) for v in vertices), dtype=np.int64, count=n),
+                  out=indptr[1:])
+        nnz = int(indptr[-1])
+
+        index_type = np.int32 if n <= np.iinfo(np.int32).max else np.int64
+        indices = np.fromiter((index[adj.id] for v in vertices for adj in v.adjacent),
+                              dtype=index_type, count=nnz)
+        weights = np.fromiter((w for v in vertices for w in v.adjacent.values()),
+                              dtype=np.float64, count=nnz)
+
+        x = np.fromiter((v.x for v in vertices), dtype=np.float64, count=n)
+        y = np.fromiter((v.y for v in vertices), dtype=np.float64, count=n)
+        values = np.fromiter((v.value for v in vertices), dtype=np.int64, count=n)
+
+        return cls(indptr, indices, weights, ids, index, x, y, values)
+
+    @classmethod
+    def from_edges(cls, n, first, second, weights, x=None, y=None, values=None):
+        """Builds a snapshot of a graph with the vertices 0 to n-1 straight from arrays of its
+            edges, which never creates a Python object for a vertex or an edge
+
+        Just like Graph.add_edges_from, an edge from a vertex to itself is not created, and
+        when the same edge is given more than once only the first one is created.
+
+        Parameters
+        ----------
+        n : int
+            The number of vertices, which are given the indices and id numbers 0 to n-1
+        first : ndarray
+            The index of the first vertex of each edge
+        second : ndarray
+            The index of the second vertex of each edge
+        weights : ndarray
+            The weight of each edge
+        x : ndarray, optional
+            The x-coordinate of every vertex
+        y : ndarray, optional
+            The y-coordinate of every vertex
+        values : ndarray, optional
+            The value of every vertex
+
+        Returns
+        -------
+        CSRGraph
+            The snapshot of the graph
+        """
+        first, second = np.asarray(first, dtype=np.int64), np.asarray(second, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+
+        # Each edge is keyed by its ends in order, and the first time each key appears is kept
+        low, high = np.minimum(first, second), np.maximum(first, second)
+        _, kept = np.unique(low * n + high, return_index=True)
+        kept = kept[low[kept] != high[kept]]
+        low, high, weights = low[kept], high[kept], weights[kept]
+
+        # Every edge goes in the row of both of its vertices. The edges are sorted by their ends,
+        # so a stable sort by row keeps the neighbors of each vertex in increasing order
+        rows = np.concatenate((high, low))
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+        index_type = np.int32 if n <= np.iinfo(np.int32).max else np.int64
+        indices = np.concatenate((low, high))[order].astype(index_type)
+        weights = np.concatenate((weights, weights))[order]
+
+        if values is None:
+            values = np.zeros(n, dtype=np.int64)
+        return cls(indptr, indices, weights, np.arange(n, dtype=np.int64), x=x, y=y, values=values)
+
+    def num_vertices(self):
+        """Returns the number of vertices in the snapshot
+
+        Returns
+        -------
+        int
+            The number of vertices
+        """
+        return len(self.ids)
+
+    def num_edges(self):
+        """Returns the number of edges in the snapshot
+
+        Returns
+        -------
+        int
+            The number of undirected edges, each counted once
+        """
+        return len(self.indices) // 2
+
+    def degrees(self):
+        """Returns the degree of every vertex
+
+        Returns
+        -------
+        ndarray
+            An array where entry i is the degree of the vertex with index i
+        """
+        return np.diff(self.indptr)
+
+    def neighbors(self, i):
+        """Returns the indices of the neighbors of a vertex
+
+        Parameters
+        ----------
+        i : int
+            The index (not the id number) of a vertex
+
+        Returns
+        -------
+        ndarray
+            The indices of the vertices adjacent to it
+        """
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def index_of(self, id):
+        """Returns the index of the vertex with the given id number
+
+        Parameters
+        ----------
+        id : int
+            The id number of a vertex in the snapshot
+
+        Returns
+        -------
+        int
+            The index of the vertex, or None if there is no vertex with that id
+        """
+        return self.index.get(id)
+
+    def laplacian(self):
+        """Returns the Laplacian matrix L = D - A of the graph
+
+        Edge weights are ignored, every edge counts once, so that L @ f is exactly the change
+        in value caused by vertex i giving f[i] times (this is how Vertex.give works).
+
+        Returns
+        -------
+        csr_matrix
+            The n x n Laplacian as a SciPy sparse matrix of integers
+        """
+        from scipy.sparse import coo_matrix
+
+        # Every entry of the adjacency structure becomes a -1, and the degrees go on the diagonal
+        n = self.num_vertices()
+        rows = np.concatenate((np.repeat(np.arange(n), self.degrees()), np.arange(n)))
+        cols = np.concatenate((self.indices, np.arange(n)))
+        data = np.concatenate((np.full(len(self.indices), -1, dtype=np.int64), self.degrees()))
+        return coo_matrix((data, (rows, cols)), shape=(n, n)).tocsr()
+
+    def save(self, path):
+        """Writes the snapshot to a binary graph file (see MAGIC for the layout)
+
+        Parameters
+        ----------
+        path : str
+            The path of the file to write
+        """
+        n = self.num_vertices()
+        x = self.x if self.x is not None else np.zeros(n)
+        y = self.y if self.y is not None else np.zeros(n)
+        values = self.values if self.values is not None else np.zeros(n, dtype=np.int64)
+
+        flags = 0
+        if np.array_equal(self.weights, np.floor(self.weights)):
+            flags |= self.INTEGER_WEIGHTS
+        if np.array_equal(x, np.floor(x)) and np.array_equal(y, np.floor(y)):
+            flags |= self.INTEGER_COORDINATES
+
+        index_type = np.dtype(self.indices.dtype).newbyteorder('<')
+        with open(path, 'wb') as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, index_type.itemsize, flags,
+                                        n, len(self.indices)))
+            for array, dtype in self.__sections(index_type, self.ids, x, y, values, self.indptr,
+                                                self.indices, self.weights):
+                # Pad up to the next multiple of the alignment before each array. The arrays are
+                # written straight from their memory (which may itself be a memory map)
+                file.write(bytes(-file.tell() % self.ALIGNMENT))
+                file.flush()
+                np.ascontiguousarray(array, dtype=dtype).tofile(file)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Reads a snapshot from a binary graph file
+
+        With mmap the arrays are views of a read-only memory map of the file, so opening even a
+        huge file is quick and the operating system reads in the parts that are used as they are
+        used. The id to index dictionary is only built once it is needed.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file to read
+        mmap : bool, optional
+            If True (the default) the file is memory-mapped, otherwise it is read into memory
+
+        Returns
+        -------
+        CSRGraph
+            The snapshot stored in the file, with its coordinates and values
+
+        Raises
+        ------
+        RuntimeError
+            If the file is not a binary graph file of a version we can read, or is cut short
+        """
+        if mmap and os.path.getsize(path) > 0:
+            data = np.memmap(path, dtype=np.uint8, mode='r')
+        else:
+            data = np.fromfile(path, dtype=np.uint8)
+
+        if len(data) < cls.HEADER.size:
+            raise RuntimeError(f'{path} is not a binary graph file')
+        magic, version, index_size, flags, n, nnz = cls.HEADER.unpack(bytes(data[:cls.HEADER.size]))
+        if magic != cls.MAGIC:
+            raise RuntimeError(f'{path} is not a binary graph file')
+        if version != cls.FORMAT_VERSION or index_size not in (4, 8):
+            raise RuntimeError(f'{path} is a binary graph file of an unknown version: {version}')
+
+        lengths = (n, n, n, n, n + 1, nnz, nnz)
+        arrays = []
+        offset = cls.HEADER.size
+        for length, (_, dtype) in zip(lengths, cls.__sections(np.dtype(f'<i{index_size}'))):
+            offset += -offset % cls.ALIGNMENT
+            end = offset + length * dtype.itemsize
+            if end > len(data):
+                raise RuntimeError(f'{path} is cut short')
+            arrays.append(data[offset:end].view(dtype))
+            offset = end
+
+        ids, x, y, values, indptr, indices, weights = arrays
+        snapshot = cls(indptr, indices, weights, ids, x=x, y=y, values=values)
+        snapshot.__flags = flags
+        return snapshot
+
+    def to_graph(self):
+        """Builds a Graph with the vertices (including their coordinates and values) and edges of
+            the snapshot, this creates a Python object for every vertex and edge so it is much
+            slower than loading the snapshot
+
+        Returns
+        -------
+        Graph
+            A new graph equal to the one the snapshot was taken of
+        """
+        from Graph import Graph
+        from Vertex import Vertex
+
+        n = self.num_vertices()
+        x = self.x if self.x is not None else np.zeros(n)
+        y = self.y if self.y is not None else np.zeros(n)
+        values = self.values if self.values is not None else np.zeros(n, dtype=np.int64)
+
+        # Snapshots loaded from a file know whether the weights and coordinates were whole
+        # numbers when saved, others are taken to be whole numbers whenever they can be
+        flags = self.__flags
+        if flags is None:
+            flags = self.INTEGER_WEIGHTS if np.array_equal(self.weights, np.floor(self.weights)) else 0
+            if np.array_equal(x, np.floor(x)) and np.array_equal(y, np.floor(y)):
+                flags |= self.INTEGER_COORDINATES
+
+        if flags & self.INTEGER_COORDINATES:
+            x, y = x.astype(np.int64), y.astype(np.int64)
+
+        vertices = [Vertex(value, vx, vy, id) for value, vx, vy, id
+                    in zip(values.tolist(), x.tolist(), y.tolist(), self.ids.tolist())]
+        graph = Graph()
+        graph.add_vertices(*vertices)
+
+        # Every edge is in the rows of both of its vertices, it is only created from the row of
+        # the vertex with the smaller index
+        rows = np.repeat(np.arange(n), self.degrees())
+        first = self.indices > rows
+        weights = self.weights[first]
+        if flags & self.INTEGER_WEIGHTS:
+            weights = weights.astype(np.int64)
+
+        graph.add_edges_from(zip(self.ids[rows[first]].tolist(), self.ids[self.indices[first]].tolist(),
+                                 weights.tolist()))
+        return graph
+
+    @staticmethod
+    def __sections(index_type, *arrays):
+        """Returns the (array, dtype) of each section of a binary graph file, in order
+
+        Parameters
+        ----------
+        index_type : dtype
+            The type of the entries of indices
+        arrays : ndarray
+            The arrays to write, or none when only the types are wanted
+
+        Returns
+        -------
+        list
+            The (array, dtype) pairs, the arrays are None if none were given
+        """
+        dtypes = [np.dtype('<i8'), np.dtype('<f8'), np.dtype('<f8'), np.dtype('<i8'),
+                  np.dtype('<i8'), index_type, np.dtype('<f8')]
+        return list(zip(arrays or [None] * len(dtypes), dtypes))
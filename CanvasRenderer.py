@@ -0,0 +1,165 @@
+class CanvasRenderer:
+    """
+    Class which collects changes to the items on a tkinter canvas and applies them all at once
+
+    Rather than configuring items straight away, the changes are remembered and applied when
+    tkinter next becomes idle (so at most once per frame, however many changes were asked for).
+    The renderer remembers what every item looks like on the canvas, so only options that really
+    change are sent, several changes to one item become a single call, and changing an item back
+    before the flush costs nothing at all. When the same change is asked of many items sharing a
+    tag, the whole tag is configured in one call.
+
+    Attributes
+    ----------
+    canvas : Canvas
+        The canvas whose items are being drawn
+    bulk_threshold : int
+        The number of items of a tag that must change before the whole tag is configured at once
+    calls : int
+        The number of configuration calls made to the canvas so far
+
+    Methods
+    -------
+    track(item, **options)
+        Records the options an item was created with
+    configure(item, **options)
+        Asks for options of an item to be changed at the next flush
+    configure_tag(tag, items, **options)
+        Asks for options of every item with a tag to be changed at the next flush
+    get(item, option)
+        Returns the value an option of an item will have after the next flush
+    delete(*items)
+        Deletes items from the canvas straight away
+    flush()
+        Applies every change asked for since the last flush
+    """
+
+    def __init__(self, canvas, bulk_threshold=8):
+        self.canvas = canvas
+        self.bulk_threshold = bulk_threshold
+        self.calls = 0
+
+        # The options of each item as they are on the canvas, and as they should be after the
+        # next flush (only for the items that have been asked to change)
+        self.__applied = {}
+        self.__wanted = {}
+
+        # The (tag, items, options) of each configure_tag since the last flush, in order
+        self.__tag_changes = []
+
+        # Whether a flush is already waiting for tkinter to become idle
+        self.__scheduled = False
+
+    def track(self, item, **options):
+        """Records the options an item was created with, so that asking for them again does nothing
+
+        Parameters
+        ----------
+        item : int
+            The id of an item on the canvas
+        options : dict
+            The options the item was created with, for example fill='green'
+        """
+        self.__applied.setdefault(item, {}).update(options)
+
+    def configure(self, item, **options):
+        """Asks for options of an item to be changed when the canvas is next flushed
+
+        Parameters
+        ----------
+        item : int
+            The id of an item on the canvas
+        options : dict
+            The options to change, for example fill='red'
+        """
+        self.__wanted.setdefault(item, {}).update(options)
+        self.__schedule()
+
+    def configure_tag(self, tag, items, **options):
+        """Asks for options of every item with a tag to be changed when the canvas is next flushed
+
+        Parameters
+        ----------
+        tag : str
+            A tag of the items on the canvas, for example 'vertex'
+        items : iterable
+            The ids of every item that has the tag. Items left out would be changed as well if
+            the tag is configured in bulk, without the renderer knowing about it
+        options : dict
+            The options to change, for example fill='green'
+        """
+        items = list(items)
+        for item in items:
+            self.__wanted.setdefault(item, {}).update(options)
+
+        self.__tag_changes.append((tag, items, options))
+        self.__schedule()
+
+    def get(self, item, option):
+        """Returns the value an option of an item will have after the next flush
+
+        Parameters
+        ----------
+        item : int
+            The id of an item on the canvas
+        option : str
+            The name of the option, for example 'fill'
+
+        Returns
+        -------
+        object
+            The value of the option, or None if the renderer does not know it
+        """
+        if option in self.__wanted.get(item, {}):
+            return self.__wanted[item][option]
+        return self.__applied.get(item, {}).get(option)
+
+    def delete(self, *items):
+        """Deletes items from the canvas straight away and forgets any changes asked of them
+
+        Parameters
+        ----------
+        items : int
+            The ids of the items to delete
+        """
+        for item in items:
+            self.canvas.delete(item)
+            self.__applied.pop(item, None)
+            self.__wanted.pop(item, None)
+
+    def flush(self):
+        """Applies every change asked for since the last flush, skipping those that change nothing"""
+        self.__scheduled = False
+
+        # When enough of the items of a tag need the same change, the whole tag is changed at
+        # once, any of its items that should look different are then fixed up one at a time
+        for tag, items, options in self.__tag_changes:
+            changed = [item for item in items if item in self.__applied
+                       and self.__differences(self.__applied[item], options)]
+            if len(changed) >= self.bulk_threshold:
+                self.canvas.itemconfigure(tag, **options)
+                self.calls += 1
+                for item in items:
+                    if item in self.__wanted:
+                        self.__applied.setdefault(item, {}).update(options)
+        self.__tag_changes = []
+
+        for item, options in self.__wanted.items():
+            applied = self.__applied.setdefault(item, {})
+            differences = self.__differences(applied, options)
+            if differences:
+                self.canvas.itemconfigure(item, **differences)
+                self.calls += 1
+                applied.update(differences)
+        self.__wanted = {}
+
+    def __schedule(self):
+        """Makes sure a flush will happen once tkinter is idle"""
+        if not self.__scheduled:
+            self.__scheduled = True
+            self.canvas.after_idle(self.flush)
+
+    @staticmethod
+    def __differences(applied, options):
+        """Returns the options whose values differ from those applied"""
+        return {k: v for k, v in options.items() if k not in applied or applied[k] != v}
@@ -0,0 +1,155 @@
+import numpy as np
+
+
+class ChipFiring:
+    """
+    Class which plays the dollar game on a whole graph at once using its Laplacian matrix
+
+    Rather than moving values one neighbor at a time the way Vertex.give and Vertex.take do,
+    the values of every vertex are kept in an array and a firing vector f (where f[i] is the
+    number of times the vertex with index i gives, negative to take) changes them all at once:
+    values -= L @ f. Since that is linear, any number of simultaneous or consecutive fires can
+    be combined into a single sparse matrix-vector product.
+
+    Attributes
+    ----------
+    graph : Graph
+        The graph the game is being played on
+    csr : CSRGraph
+        The snapshot of the graph the Laplacian was built from, it fixes the index of each vertex
+    laplacian : csr_matrix
+        The Laplacian matrix of the graph
+    values : ndarray
+        The current value of every vertex, by index
+
+    Methods
+    -------
+    fire(firing)
+        Applies a firing vector to the values of the vertices
+    give(ids, times=1)
+        Has each of the given vertices give to all of its neighbors
+    take(ids, times=1)
+        Has each of the given vertices take from all of its neighbors
+    run(sequence)
+        Applies a whole sequence of gives (and takes) in one step
+    is_winning()
+        Returns True if no vertex is in debt
+    write_back()
+        Copies the values back into the Vertex objects of the graph
+    reload()
+        Copies the values of the Vertex objects of the graph into the values array
+    """
+
+    def __init__(self, graph):
+        # The graph and the snapshot of it that fixes the index of each vertex
+        self.graph = graph
+        self.csr = graph.to_csr()
+
+        # The version of the graph when the snapshot was taken, so we can detect later changes
+        self.__version = graph.version
+
+        # The Laplacian of the graph, L = D - A
+        self.laplacian = self.csr.laplacian()
+
+        # The current value of every vertex
+        self.values = np.zeros(self.csr.num_vertices(), dtype=np.int64)
+        self.reload()
+
+    def fire(self, firing):
+        """Applies a firing vector to the values of the vertices
+
+        Parameters
+        ----------
+        firing : ndarray
+            An array where entry i is the number of times the vertex with index i gives to its
+            neighbors, a negative entry means that vertex takes from its neighbors instead
+        """
+        self.values -= self.laplacian @ np.asarray(firing, dtype=np.int64)
+
+    def give(self, ids, times=1):
+        """Has each of the given vertices give to all of its neighbors
+
+        Parameters
+        ----------
+        ids : list
+            The id numbers of the vertices that give, an id may appear more than once
+        times : int, optional
+            The number of times each of the vertices gives, default is 1
+        """
+        self.fire(self.__firing_vector(ids) * times)
+
+    def take(self, ids, times=1):
+        """Has each of the given vertices take from all of its neighbors
+
+        Parameters
+        ----------
+        ids : list
+            The id numbers of the vertices that take, an id may appear more than once
+        times : int, optional
+            The number of times each of the vertices takes, default is 1
+        """
+        self.fire(self.__firing_vector(ids) * -times)
+
+    def run(self, sequence):
+        """Applies a whole sequence of moves in one sparse matrix-vector product
+
+        Parameters
+        ----------
+        sequence : iterable
+            An iterable of (id, times) pairs, each one meaning that the vertex with that id
+            gives that many times (or takes, if times is negative)
+        """
+        firing = np.zeros(self.csr.num_vertices(), dtype=np.int64)
+        for id, times in sequence:
+            firing[self.__index(id)] += times
+        self.fire(firing)
+
+    def is_winning(self):
+        """Returns True if the current values are a win, meaning no vertex is in debt
+
+        Returns
+        -------
+        bool
+            True if every vertex has a non-negative value
+        """
+        return bool((self.values >= 0).all())
+
+    def write_back(self):
+        """Copies the current values into the Vertex objects of the graph
+
+        Raises
+        ------
+        RuntimeError
+            If the vertices or edges of the graph have changed since this game was set up
+        """
+        self.__check_version()
+        for vertex, value in zip(self.graph.vertices, self.values.tolist()):
+            vertex.value = value
+
+    def reload(self):
+        """Copies the values of the Vertex objects of the graph into the values array
+
+        Raises
+        ------
+        RuntimeError
+            If the vertices or edges of the graph have changed since this game was set up
+        """
+        self.__check_version()
+        self.values[:] = [vertex.value for vertex in self.graph.vertices]
+
+    def __firing_vector(self, ids):
+        """Returns the firing vector in which each given vertex fires once per time it is listed"""
+        indices = [self.__index(id) for id in ids]
+        return np.bincount(indices, minlength=self.csr.num_vertices()).astype(np.int64)
+
+    def __index(self, id):
+        """Returns the index of the vertex with the given id, raising a KeyError if there is none"""
+        i = self.csr.index_of(id)
+        if i is None:
+            raise KeyError(f'There is no vertex with the id: {id}')
+        return i
+
+    def __check_version(self):
+        """Raises a RuntimeError if the graph has changed since the Laplacian was built"""
+        if self.graph.version != self.__version:
+            raise RuntimeError('The graph has changed since the chip-firing game was set up')
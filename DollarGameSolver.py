@@ -0,0 +1,389 @@
+from collections import deque
+import inspect
+import numpy as np
+
+
+class DollarGameSolver:
+    """
+    Class which decides whether the dollar game on a graph can be won, and how to win it
+
+    The values of the vertices form a divisor D on the graph. The game is won when no vertex is in
+    debt, and it can be won exactly when the q-reduced divisor equivalent to D (for any vertex q)
+    has a non-negative value at q. The q-reduced divisor is found by first moving all of the debt
+    onto q and then using Dhar's burning algorithm to fire sets of vertices towards q for as long
+    as that is legal. Edge weights play no part, just like in Vertex.give and Vertex.take.
+
+    Attributes
+    ----------
+    graph : Graph
+        The graph the game is played on, it must be connected
+    csr : CSRGraph
+        The snapshot of the graph used by the solver
+    q : int
+        The index of the vertex the divisor was reduced with respect to
+    reduced : ndarray
+        The q-reduced divisor, by index, once reduce has been called
+    script : ndarray
+        The firing script (gives per vertex, by index) that turns the values of the graph into
+        the reduced divisor, once reduce has been called
+
+    Methods
+    -------
+    degree()
+        Returns the total value on the graph
+    genus()
+        Returns the genus E - V + 1 of the graph
+    reduce(q=None)
+        Calculates the q-reduced divisor equivalent to the values on the graph
+    is_winnable()
+        Returns True if the game on the graph can be won
+    winning_script()
+        Returns a number of gives for every vertex that wins the game, or None if it can't be won
+    """
+
+    # The number of times the bisection for how far to settle the values halves its interval
+    SETTLE_STEPS = 12
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.csr = graph.to_csr()
+        self.q = None
+        self.reduced = None
+        self.script = None
+
+    def degree(self):
+        """Returns the degree of the divisor, that is the total value of all of the vertices
+
+        Returns
+        -------
+        int
+            The sum of the values of the vertices
+        """
+        return sum(vertex.value for vertex in self.graph.vertices)
+
+    def genus(self):
+        """Returns the genus of the graph, the number of independent cycles E - V + 1
+
+        Returns
+        -------
+        int
+            The genus of the graph
+        """
+        return self.csr.num_edges() - self.csr.num_vertices() + 1
+
+    def is_winnable(self):
+        """Returns True if the dollar game on the graph can be won
+
+        If the total value is negative the game can never be won, and if it is at least the genus
+        it can always be won (a consequence of the Riemann-Roch theorem for graphs). Only in
+        between do we need to calculate the reduced divisor.
+
+        Returns
+        -------
+        bool
+            True if the game can be won and False if not
+        """
+        degree = self.degree()
+        if degree < 0:
+            return False
+        if degree >= self.genus():
+            return True
+
+        self.reduce()
+        return bool(self.reduced[self.q] >= 0)
+
+    def winning_script(self):
+        """Returns how many times each vertex should give in order to win the game
+
+        Returns
+        -------
+        dict
+            A map of the id of every vertex to the non-negative number of times it should give,
+            or None if the game cannot be won
+        """
+        if self.degree() < 0:
+            return None
+
+        self.reduce()
+        if self.reduced[self.q] < 0:
+            return None
+
+        # Having every vertex give once changes nothing, so we shift the script until the
+        # vertex giving the least gives zero times and no vertex needs to take
+        script = self.script - self.script.min()
+        return dict(zip(self.csr.ids.tolist(), script.tolist()))
+
+    def reduce(self, q=None):
+        """Calculates the q-reduced divisor equivalent to the values of the vertices
+
+        Parameters
+        ----------
+        q : int, optional
+            The id number of the vertex to reduce with respect to, default is the first vertex
+
+        Returns
+        -------
+        dict
+            A map of the id of every vertex to its value in the reduced divisor
+
+        Raises
+        ------
+        RuntimeError
+            If the graph is empty or is not connected
+        """
+        n = self.csr.num_vertices()
+        if n == 0:
+            raise RuntimeError('The dollar game cannot be played on an empty graph')
+
+        self.q = 0 if q is None else self.csr.index_of(q)
+        if self.q is None:
+            raise RuntimeError(f'The vertex given: {q} is not in the graph')
+
+        indptr = self.csr.indptr.tolist()
+        indices = self.csr.indices.tolist()
+
+        # Debt can only be moved onto q from vertices that are connected to it
+        if not self.__is_connected(indptr, indices):
+            raise RuntimeError('The dollar game can only be solved on a connected graph')
+
+        values, script = self.__settle_near_q(indptr, indices)
+
+        self.__move_debt_to_q(indptr, indices, values, script)
+        self.__burn(indptr, indices, values, script)
+
+        self.reduced = np.array(values, dtype=np.int64)
+        self.script = np.array(script, dtype=np.int64)
+        return dict(zip(self.csr.ids.tolist(), values))
+
+    def __is_connected(self, indptr, indices):
+        """Returns True if every vertex can be reached from q"""
+        reached = [False] * (len(indptr) - 1)
+        reached[self.q] = True
+        stack = [self.q]
+        count = 1
+        while stack:
+            v = stack.pop()
+            for j in range(indptr[v], indptr[v + 1]):
+                u = indices[j]
+                if not reached[u]:
+                    reached[u] = True
+                    stack.append(u)
+                    count += 1
+        return count == len(reached)
+
+    def __settle_near_q(self, indptr, indices):
+        """Finds a firing script after which every vertex other than q has about its reduced value
+
+        We solve the reduced Laplacian system for the real valued script x that would leave every
+        vertex v other than q with mu * (deg(v) - 1), and then round x down. The system is
+        symmetric and positive definite, so it is solved with the conjugate gradient method, which
+        needs no more memory than the matrix itself, and since it is linear only two solves are
+        needed for every mu. The values after the script are calculated with integers, so any
+        rounding error is fixed up later by __move_debt_to_q.
+
+        How many chips the reduced divisor leaves off q depends on the graph and the values, and
+        every chip too many has to be moved onto q by a round of burning, and every chip too few
+        borrowed back from q, so mu is found by bisection: too small a mu needs borrowing that
+        reaches q (or just more than a few per vertex), too large a one leaves a set of vertices
+        that can still fire. Often a mu is found for which the borrowing ends with the reduced
+        divisor, otherwise we carry on from the smallest mu that was too large, since moving the
+        chips left over onto q in batches is much quicker than borrowing them back.
+
+        Parameters
+        ----------
+        indptr : list
+            The CSR row pointers of the graph
+        indices : list
+            The CSR column indices of the graph
+
+        Returns
+        -------
+        tuple
+            The list of values after the script and the script itself, both by index
+        """
+        from scipy.sparse.linalg import cg
+
+        n = self.csr.num_vertices()
+        laplacian = self.csr.laplacian()
+        values = np.array([vertex.value for vertex in self.graph.vertices], dtype=np.int64)
+        if n == 1:
+            return values.tolist(), [0]
+
+        # The Laplacian with the row and column of q removed is invertible for a connected graph
+        keep = np.arange(n) != self.q
+        reduced_laplacian = laplacian[keep][:, keep].astype(np.float64)
+
+        # SciPy before 1.12 calls the relative tolerance tol
+        tolerance = 'rtol' if 'rtol' in inspect.signature(cg).parameters else 'tol'
+
+        def solve(target):
+            return cg(reduced_laplacian, target.astype(np.float64), maxiter=10 * n, **{tolerance: 1e-10})[0]
+
+        full = solve(values[keep])
+        per_chip = solve(self.csr.degrees()[keep] - 1)
+
+        def settle(mu):
+            script = np.zeros(n, dtype=np.int64)
+            script[keep] = np.floor(full - mu * per_chip).astype(np.int64)
+            return (values - laplacian @ script).tolist(), script.tolist()
+
+        # mu = 0 leaves every vertex but q with nothing, which is already reduced for values
+        # that start out that way, as many games do
+        degree_q = indptr[self.q + 1] - indptr[self.q]
+        low, high = 0.0, 1.0
+        for mu in [low] + [None] * self.SETTLE_STEPS:
+            if mu is None:
+                mu = (low + high) / 2
+            settled_values, settled_script = settle(mu)
+
+            on_q = settled_values[self.q]
+            finished = self.__move_debt_to_q(indptr, indices, settled_values, settled_script, 8 * n)
+            if finished and not self.__unburnt(indptr, indices, settled_values):
+                return settled_values, settled_script
+
+            # Borrowing only has to reach q when there were too few chips left off it
+            if not finished or settled_values[self.q] < on_q - degree_q:
+                low = mu
+            else:
+                high = mu
+
+        return settle(high)
+
+    def __unburnt(self, indptr, indices, values):
+        """Returns the number of vertices a fire started at q does not reach"""
+        burnt = [False] * len(values)
+        burnt[self.q] = True
+        burning = [0] * len(values)
+        order = [self.q]
+        for v in order:
+            for j in range(indptr[v], indptr[v + 1]):
+                u = indices[j]
+                if not burnt[u]:
+                    burning[u] += 1
+                    if burning[u] > values[u]:
+                        burnt[u] = True
+                        order.append(u)
+        return len(values) - len(order)
+
+    def __move_debt_to_q(self, indptr, indices, values, script, budget=None, start=None):
+        """Makes every vertex other than q debt free by having the vertices in debt borrow
+
+        A vertex in debt borrows (takes from every neighbor) as many times as it needs to get out
+        of debt, which may put some of its neighbors into debt, who then borrow in turn. Seen as
+        deg(v) - 1 - value this is just a sandpile being stabilized with q as the sink, so it
+        always comes to an end, and it is quick when the debts are small to begin with.
+
+        Returns False, leaving the values part way through, if more than budget vertices had to
+        borrow, and True otherwise. If start is given only the vertices in it can be in debt to
+        begin with.
+        """
+        queue = deque(v for v in (range(len(values)) if start is None else start)
+                      if v != self.q and values[v] < 0)
+        while queue:
+            if budget is not None:
+                budget -= 1
+                if budget < 0:
+                    return False
+            v = queue.popleft()
+            degree = indptr[v + 1] - indptr[v]
+            k = (degree - 1 - values[v]) // degree
+
+            values[v] += k * degree
+            script[v] -= k
+            for j in range(indptr[v], indptr[v + 1]):
+                u = indices[j]
+                values[u] -= k
+                if u != self.q and values[u] < 0 <= values[u] + k:
+                    queue.append(u)
+        return True
+
+    def __burn(self, indptr, indices, values, script):
+        """Uses Dhar's burning algorithm to fire sets of vertices until the divisor is q-reduced
+
+        A fire starts at q and spreads along the edges. A vertex catches fire once more burning
+        edges reach it than its value. If the whole graph burns the divisor is q-reduced,
+        otherwise the unburnt vertices can legally fire together, as many times as every one of
+        them can afford, and we start again.
+
+        Only the burnt vertices and the unburnt vertices next to them are ever looked at: firing
+        the unburnt set only changes the values on either side of its boundary, and rather than
+        adding to the script of every unburnt vertex we add to all of them at once through an
+        offset and take it back off the burnt ones.
+
+        When __settle_near_q leaves too many chips off q they can only reach it a few at a time,
+        which takes many rounds that each fire the unburnt set once. So rounds are fired in
+        batches that double in size for as long as the debt fired into the boundary is cheap to
+        borrow back, which __move_debt_to_q does before the next round. Firing too much is
+        always safe, as borrowing only ever gives back what the reduced divisor does not need.
+        """
+        n = len(values)
+
+        # The round in which each vertex last burnt, and the number of burning edges reaching
+        # it, so that nothing needs to be cleared between rounds
+        burnt_in = [-1] * n
+        reached_in = [-1] * n
+        burning = [0] * n
+
+        # The number of times every vertex has fired so far on top of its entry in script
+        offset = 0
+
+        # The number of times the unburnt set is fired in the next round, whether it can afford
+        # to or not
+        batch = 1
+
+        burn_round = 0
+        while True:
+            burnt_in[self.q] = burn_round
+            burnt = [self.q]
+            boundary = []
+
+            i = 0
+            while i < len(burnt):
+                v = burnt[i]
+                i += 1
+                for j in range(indptr[v], indptr[v + 1]):
+                    u = indices[j]
+                    if burnt_in[u] == burn_round:
+                        continue
+                    if reached_in[u] != burn_round:
+                        reached_in[u] = burn_round
+                        burning[u] = 0
+                        boundary.append(u)
+                    burning[u] += 1
+                    if burning[u] > values[u]:
+                        burnt_in[u] = burn_round
+                        burnt.append(u)
+
+            if len(burnt) == n:
+                break
+
+            # Fire the unburnt vertices as many times as each of them can afford, each firing
+            # sends one along each edge from an unburnt vertex to a burnt one
+            boundary = [u for u in boundary if burnt_in[u] != burn_round]
+            affordable = min(values[u] // burning[u] for u in boundary)
+            k = max(affordable, batch)
+
+            for u in boundary:
+                values[u] -= k * burning[u]
+            for v in burnt:
+                for j in range(indptr[v], indptr[v + 1]):
+                    if burnt_in[indices[j]] != burn_round:
+                        values[v] += k
+                script[v] -= k
+            offset += k
+            burn_round += 1
+
+            if k > affordable:
+                # Only the boundary can have gone into debt. Borrowing changes the script of a
+                # vertex by the same amount whatever the offset is, so the offset can stay
+                if self.__move_debt_to_q(indptr, indices, values, script, n - len(burnt), boundary):
+                    batch *= 2
+                else:
+                    # A batch that needs more borrowing than there are unburnt vertices was too big
+                    self.__move_debt_to_q(indptr, indices, values, script)
+                    batch = 1
+            else:
+                batch *= 2
+
+        for v in range(n):
+            script[v] += offset
@@ -7,8 +7,10 @@
 
 
 from Vertex import Vertex
-from tkinter import *
-import numpy as np
+from collections import Counter
+from itertools import chain
+from operator import add
+import math
 
 
 class Graph:
@@ -20,7 +22,15 @@ class Graph:
     vertices : list
         a list of the vertices which make up the graph
     weights : dict
-        a dictionary which maps lists of adjacent vertices to the weight of the edge between them
+        a dictionary which maps the edge key of each pair of adjacent vertices to the weight of
+        the edge between them
+    vertex_index : dict
+        a dictionary which maps the id number of each vertex in the graph to the vertex itself
+    version : int
+        a counter which is increased every time the vertices or edges of the graph change
+    degree_histogram : list
+        a list whose entry d is the number of vertices in the graph with degree d, kept up to
+        date as vertices and edges are added and removed
 
     Methods
     -------
@@ -30,18 +40,34 @@ class Graph:
         Removes an existing vertex from the graph
     create_edge(vertex1, vertex2, weight=0)
         Adds a new edge to the graph with a given weight between two vertices
+    add_edges_from(edges)
+        Adds many new edges to the graph all at once
     remove_edge(vertex1, vertex2)
         If an edge exists between the given vertices in the graph, it is removed
     get_weight(vertex1, vertex2)
         Returns the weight of the edge (if there is one) between two vertices
     are_adjacent(vertex1, vertex2)
         Returns True if the given vertices are adjacent in the graph and False otherwise
+    find_min_degree()
+        Returns the smallest degree of any vertex in the graph
+    find_max_degree()
+        Returns the largest degree of any vertex in the graph
+    degree_distribution()
+        Returns a dictionary of each degree to the number of vertices with that degree
     find_vertex(id)
         Returns the vertex in the graph with the given id number
     contains_vertex(vertex)
         Returns True if the graph contains the vertex and False if not
     get_coordinates(vertex)
         Returns an ordered pair of the coordinates of a vertex in the graph
+    edge_key(id1, id2)
+        Returns the canonical key under which the edge between two vertices is stored
+    to_csr()
+        Returns a compressed sparse row snapshot of the graph's adjacency structure
+    save(path)
+        Writes the graph to a binary graph file
+    load(path)
+        Reads a graph from a binary graph file
     """
 
     def __init__(self):
@@ -49,18 +75,38 @@ class Graph:
         self.vertices = []
 
         # Dictionary mapping a tuple of vertex id's to the weight of the edge
-        # between the vertices with the corresponding id's
+        # between the vertices with the corresponding id's, the tuple is always
+        # ordered (smaller id, larger id) so that an edge has exactly one key
         self.weights = {}
 
+        # Dictionary mapping the id number of each vertex to the vertex itself, kept in
+        # sync with the list of vertices so that lookups by id do not need to scan it
+        self.vertex_index = {}
+
+        # Dictionary mapping the id number of each vertex to its position in the list of vertices,
+        # so that a vertex can be taken out of the list without searching for it
+        self.__positions = {}
+
+        # Counter of changes made to the graph, used to tell whether something computed
+        # from the graph (such as its CSR snapshot) is out of date
+        self.version = 0
+
+        # The cached CSR snapshot of the graph, None until it is requested
+        self.__csr = None
+
+        # The number of vertices with each degree, updated with every change to the graph so that
+        # the minimum and maximum degrees never need a pass over the vertices. Trailing zeros are
+        # dropped when the maximum degree is asked for, and the minimum degree is at least
+        # __min_degree (it is only moved up when asked for)
+        self.degree_histogram = []
+        self.__min_degree = 0
+
     def __repr__(self):
-        rep = ""
-        for i in range(len(self.vertices)):
-            rep = rep + 'Vertex ' + str(self.vertices[i].id) + ': (' + str(self.vertices[i].x) \
-                  + ', ' + str(self.vertices[i].y) + ')\n'
-        for k in self.weights.keys():
-            rep = rep + 'Edge (' + str(k[0]) + ' - ' + str(k[1]) + ') weight = ' \
-                  + str(self.weights[k]) + '\n'
-        return rep
+        # The lines are joined once at the end, since adding each one onto the string so far
+        # would copy it over and over again
+        lines = [f'Vertex {vertex.id}: ({vertex.x}, {vertex.y})\n' for vertex in self.vertices]
+        lines.extend(f'Edge ({k[0]} - {k[1]}) weight = {weight}\n' for k, weight in self.weights.items())
+        return ''.join(lines)
 
     def add_vertices(self, *args):
         """Adds a number of new vertices to this graph
@@ -83,22 +129,40 @@ class Graph:
             If one of the vertices has the same id number as a vertex already in the graph
         """
 
+        # The id numbers of the new vertices, used to catch duplicates among the arguments
+        new_ids = set()
+
         # We must ensure that every argument given is a Vertex
-        for i in range(len(args)):
-            if not isinstance(args[i], Vertex):
-                raise TypeError(f'{args[i]} is not a Vertex object, it is type {type(args[i])}')
-            else:
-                for vertex in self.vertices:
-                    # We do not allow multiple vertices with the same id number
-                    if vertex.id == args[i].id:
-                        raise RuntimeError(f'A vertex already exists in the graph with the id: {args[i].id}')
+        vertex_index = self.vertex_index
+        for vertex in args:
+            if not isinstance(vertex, Vertex):
+                raise TypeError(f'{vertex} is not a Vertex object, it is type {type(vertex)}')
 
+            # We do not allow multiple vertices with the same id number
+            if vertex.id in vertex_index or vertex.id in new_ids:
+                raise RuntimeError(f'A vertex already exists in the graph with the id: {vertex.id}')
+            new_ids.add(vertex.id)
+
+        self.__positions.update((vertex.id, i) for i, vertex in enumerate(args, len(self.vertices)))
         self.vertices.extend(args)
+        vertex_index.update((vertex.id, vertex) for vertex in args)
+
+        # The degrees of the new vertices are counted first and added to the histogram together,
+        # since a million vertices would otherwise mean a million calls to __change_degree
+        degrees = Counter(len(vertex.adjacent) for vertex in args)
+        for degree, count in degrees.items():
+            # __change_degree adds one of them (and keeps the minimum degree right), then the rest
+            self.__change_degree(None, degree)
+            self.degree_histogram[degree] += count - 1
+        self.__modified()
         return True
 
     def remove_vertex(self, vertex):
         """Removes an existing vertex from this graph if it is in the graph
 
+        The last vertex in the list of vertices is moved into the place of the removed one, so
+        the order of the other vertices is not kept.
+
         Parameters
         ----------
         vertex : Vertex/int
@@ -114,20 +178,30 @@ class Graph:
         if not self.contains_vertex(vertex):
             return False
 
-        # If vertex was given as an integer id number, then we must find the vertex in
-        # this graph that has that id number
-        if isinstance(vertex, int):
-            vertex = self.find_vertex(vertex)
-
-        for v in self.vertices:
-            if v is vertex:
-                # Before removing the vertex from the graph, the first thing we do
-                # is make sure that every vertex it was adjacent to deletes it
-                for i in range(len(self.vertices)):
-                    self.vertices[i].delete_adjacent(v)
-                self.vertices.remove(v)
-                return True
-        return False
+        # Whether the vertex was given as a Vertex or as an id number, we remove
+        # the instance that is actually stored in the graph
+        if isinstance(vertex, Vertex):
+            vertex = vertex.id
+        v = self.vertex_index.pop(vertex)
+
+        # Before removing the vertex from the graph, the first thing we do
+        # is make sure that every vertex it was adjacent to deletes it
+        self.__change_degree(v.degree(), None)
+        for adj in v.get_adjacent_vertices():
+            v.delete_adjacent(adj)
+            del self.weights[self.edge_key(v.id, adj.id)]
+            self.__change_degree(adj.degree() + 1, adj.degree())
+
+        # The last vertex fills the gap left by the removed one, rather than every vertex after it
+        # moving down one place
+        vertices, positions = self.vertices, self.__positions
+        position = positions.pop(v.id)
+        last = vertices.pop()
+        if last is not v:
+            vertices[position] = last
+            positions[last.id] = position
+        self.__modified()
+        return True
 
     def create_edge(self, vertex1, vertex2, weight=0):
         """Creates an edge between 2 vertices in the graph with the supplied weight
@@ -158,10 +232,95 @@ class Graph:
         if isinstance(vertex2, int):
             vertex2 = self.find_vertex(vertex2)
 
-        vertex1.add_adjacent(vertex2, weight)
-        self.weights.update({(vertex1.id, vertex2.id): weight})
+        # If the vertices are the same or are already adjacent, no new edge is created
+        if not vertex1.add_adjacent(vertex2, weight):
+            return False
+
+        self.weights[self.edge_key(vertex1.id, vertex2.id)] = weight
+        self.__change_degree(vertex1.degree() - 1, vertex1.degree())
+        self.__change_degree(vertex2.degree() - 1, vertex2.degree())
+        self.__modified()
         return True
 
+    def add_edges_from(self, edges):
+        """Adds a number of new edges to this graph all at once, which is much quicker than
+            calling create_edge for each of them
+
+        Just like create_edge, an edge from a vertex to itself or between vertices that are
+        already adjacent is not created, and when the same edge is given more than once only
+        the first one is created.
+
+        Parameters
+        ----------
+        edges : iterable/ndarray
+            The (id1, id2) or (id1, id2, weight) of each edge, where id1 and id2 are the id numbers
+            of vertices in the graph and the weight is 0 when it is not given. A NumPy array with
+            a row for each edge can be given as well
+
+        Returns
+        -------
+        int
+            The number of edges that were created
+
+        Raises
+        ------
+        KeyError
+            If an edge uses an id number that is not in the graph, in which case no edge is created
+        """
+
+        # A NumPy array is turned into lists all at once, which is much quicker than taking
+        # its rows one at a time, the ids of an array of floats are turned back into ints
+        if hasattr(edges, 'tolist'):
+            whole_ids = edges.dtype.kind in 'iu'
+            edges = edges.tolist()
+            if not whole_ids:
+                edges = [(int(edge[0]), int(edge[1]), *edge[2:]) for edge in edges]
+
+        # The new edges by their key (as in edge_key, written out since this runs for every edge),
+        # skipping loops, edges the graph already has and repeats of earlier edges
+        weights = self.weights
+        new_edges = {}
+        for edge in edges:
+            id1, id2 = edge[0], edge[1]
+            key = (id1, id2) if id1 < id2 else (id2, id1)
+            if id1 != id2 and key not in weights:
+                new_edges.setdefault(key, edge[2] if len(edge) > 2 else 0)
+
+        # The number of new edges at each vertex, which is also every id the edges use
+        added = Counter(chain.from_iterable(new_edges))
+
+        # Every id is checked before anything is changed, so that a bad edge leaves the graph as it was
+        vertex_index = self.vertex_index
+        missing = added.keys() - vertex_index
+        if missing:
+            raise KeyError(f'There is no vertex with the id: {min(missing)}')
+
+        # The degree of each vertex before and after, grouped by degree so that the histogram is
+        # changed once for each degree rather than once for each edge or vertex
+        old_degrees = [len(vertex_index[id].adjacent) for id in added]
+        leaving = Counter(old_degrees)
+        joining = Counter(map(add, old_degrees, added.values()))
+
+        for (id1, id2), weight in new_edges.items():
+            vertex1, vertex2 = vertex_index[id1], vertex_index[id2]
+            vertex1.adjacent[vertex2] = weight
+            vertex2.adjacent[vertex1] = weight
+        weights.update(new_edges)
+
+        # Degrees only go up here, so the lower bound on the minimum degree stays right and the
+        # histogram can be updated directly once it is long enough for the largest new degree
+        histogram = self.degree_histogram
+        largest = max(joining, default=0)
+        if largest >= len(histogram):
+            histogram.extend([0] * (largest + 1 - len(histogram)))
+        for degree, count in leaving.items():
+            histogram[degree] -= count
+        for degree, count in joining.items():
+            histogram[degree] += count
+        if new_edges:
+            self.__modified()
+        return len(new_edges)
+
     def remove_edge(self, vertex1, vertex2):
         """Deletes the edge between two vertices in the graph
 
@@ -191,10 +350,11 @@ class Graph:
             return False
 
         vertex1.delete_adjacent(vertex2)
-        for k in self.weights.keys():
-            if vertex1.id in k and vertex2.id in k:
-                del self.weights[k]
-                return True
+        del self.weights[self.edge_key(vertex1.id, vertex2.id)]
+        self.__change_degree(vertex1.degree() + 1, vertex1.degree())
+        self.__change_degree(vertex2.degree() + 1, vertex2.degree())
+        self.__modified()
+        return True
 
     def get_weight(self, vertex1, vertex2):
         """Returns the weight of the edge between two vertices in the graph if they are adjacent
@@ -222,18 +382,16 @@ class Graph:
         if not self.contains_vertex(vertex1) or not self.contains_vertex(vertex2):
             raise RuntimeError(f'Both vertices must be present in the graph')
 
-        if isinstance(vertex1, int):
-            vertex1 = self.find_vertex(vertex1)
+        if isinstance(vertex1, Vertex):
+            vertex1 = vertex1.id
 
-        if isinstance(vertex2, int):
-            vertex2 = self.find_vertex(vertex2)
+        if isinstance(vertex2, Vertex):
+            vertex2 = vertex2.id
 
-        if self.are_adjacent(vertex1, vertex2):
-            for k in self.weights.keys():
-                if vertex1.id in k and vertex2.id in k:
-                    return self.weights[k]
-        else:
+        key = self.edge_key(vertex1, vertex2)
+        if key not in self.weights:
             raise KeyError("The vertices given are not adjacent")
+        return self.weights[key]
 
     def are_adjacent(self, vertex1, vertex2):
         """Return True if the two vertices are adjacent and False otherwise
@@ -254,13 +412,13 @@ class Graph:
         if not self.contains_vertex(vertex1) or not self.contains_vertex(vertex2):
             return False
 
-        if isinstance(vertex1, int):
-            vertex1 = self.find_vertex(vertex1)
+        if isinstance(vertex1, Vertex):
+            vertex1 = vertex1.id
 
-        if isinstance(vertex2, int):
-            vertex2 = self.find_vertex(vertex2)
+        if isinstance(vertex2, Vertex):
+            vertex2 = vertex2.id
 
-        return vertex1.is_adjacent(vertex2)
+        return self.edge_key(vertex1, vertex2) in self.weights
 
     def find_vertex(self, id):
         """Returns the Vertex in this Graph with the requested id, and None if it doesn't exist
@@ -275,12 +433,7 @@ class Graph:
         Vertex
             The Vertex in the graph with the given id number, or None if there is not one
         """
-        vertex = None
-        for i in range(0, len(self.vertices)):
-            if self.vertices[i].id == id:
-                vertex = self.vertices[i]
-
-        return vertex
+        return self.vertex_index.get(id)
 
     def contains_vertex(self, vertex):
         """Function that returns whether or not a given Vertex is in this graph
@@ -296,17 +449,14 @@ class Graph:
             True if this graph contains the vertex or False if it does not
         """
 
-        # If the argument was given as a Vertex, then check if it is in the list of vertices
+        # If the argument was given as a Vertex, then check if a vertex with its id is in the graph
         if isinstance(vertex, Vertex):
-            return vertex in self.vertices
+            return vertex.id in self.vertex_index
 
         # If instead the argument was given as an int, check to see if there is a vertex
         # in the graph that has that id number
         if isinstance(vertex, int):
-            for v in self.vertices:
-                if v.id == vertex:
-                    return True
-            return False
+            return vertex in self.vertex_index
 
     def get_coordinates(self, vertex):
         """Returns a 2-tuple of the coordinates of a vertex
@@ -334,41 +484,153 @@ class Graph:
 
         return vertex.get_coordinates()
 
+    @staticmethod
+    def edge_key(id1, id2):
+        """Returns the key under which the edge between two vertices is stored in weights
+
+        Parameters
+        ----------
+        id1 : int
+            The id number of one of the edge's vertices
+        id2 : int
+            The id number of the other vertex of the edge
+
+        Returns
+        -------
+        tuple
+            A 2-tuple of the id numbers ordered from smallest to largest, so that it
+            does not matter which way round the vertices are given
+        """
+        if id1 <= id2:
+            return id1, id2
+        return id2, id1
+
     def find_min_degree(self):
-        """Calculates and returns the minimum degree of the graph
+        """Returns the minimum degree of the graph
 
         Returns
         -------
         int
-            The minimum degree of all vertices in the graph
+            The minimum degree of all vertices in the graph, infinity if there are no vertices
         """
+        if not self.vertices:
+            return math.inf
 
-        # The minimum degree of the graph
-        min_degree = np.inf
-
-        for vertex in self.vertices:
-            if len(vertex.get_adjacent_vertices()) < min_degree:
-                min_degree = len(vertex.get_adjacent_vertices())
+        # Move the lower bound up to the first degree that some vertex actually has
+        while self.degree_histogram[self.__min_degree] == 0:
+            self.__min_degree += 1
 
-        return min_degree
+        return self.__min_degree
 
     def find_max_degree(self):
-        """Calculates and returns the maximum degree of the graph
+        """Returns the maximum degree of the graph
 
         Returns
         -------
         int
-            The maximum degree of all vertices in the graph
+            The maximum degree of all vertices in the graph, 0 if there are no vertices
+        """
+
+        # Drop the degrees at the end of the histogram that no vertex has any more
+        while self.degree_histogram and self.degree_histogram[-1] == 0:
+            self.degree_histogram.pop()
+
+        return max(len(self.degree_histogram) - 1, 0)
+
+    def degree_distribution(self):
+        """Returns how many vertices of the graph have each degree
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each degree that at least one vertex has to the number of
+            vertices with that degree, in increasing order of degree
+        """
+        return {d: count for d, count in enumerate(self.degree_histogram) if count}
+
+    def to_csr(self):
+        """Returns a compressed sparse row (CSR) snapshot of the graph
+
+        The snapshot is cached, so calling this repeatedly without changing the graph is cheap.
+        Adding or removing vertices or edges through the graph discards the cached snapshot.
+
+        Returns
+        -------
+        CSRGraph
+            The adjacency structure of the graph stored in contiguous NumPy arrays
+        """
+        if self.__csr is None:
+            # CSRGraph needs NumPy, which is only imported once a snapshot is first asked for
+            from CSRGraph import CSRGraph
+
+            self.__csr = CSRGraph.from_graph(self)
+        return self.__csr
+
+    def save(self, path):
+        """Writes the graph (its vertices with their coordinates and values, and its edges) to a
+            binary graph file, the layout of which is described in CSRGraph
+
+        Parameters
+        ----------
+        path : str
+            The path of the file to write
+        """
+        from CSRGraph import CSRGraph
+
+        # The cached snapshot is only discarded on structural changes, so it may hold stale
+        # vertex values or coordinates; always write a fresh one
+        CSRGraph.from_graph(self).save(path)
+
+    @staticmethod
+    def load(path):
+        """Reads a graph from a binary graph file
+
+        This builds a Vertex for every vertex and adds every edge, to work with a huge graph
+        without doing that use CSRGraph.load, which memory-maps the file instead.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file to read
+
+        Returns
+        -------
+        Graph
+            The graph stored in the file
+
+        Raises
+        ------
+        RuntimeError
+            If the file is not a binary graph file
+        """
+        from CSRGraph import CSRGraph
+
+        return CSRGraph.load(path, mmap=False).to_graph()
+
+    def __change_degree(self, old, new):
+        """Moves a vertex from one degree to another in the degree histogram
+
+        Parameters
+        ----------
+        old : int
+            The degree the vertex had, or None if it was not in the graph
+        new : int
+            The degree the vertex has now, or None if it has been removed from the graph
         """
+        if old is not None:
+            self.degree_histogram[old] -= 1
 
-        # The maximum degree of the graph
-        max_degree = 0
+        if new is not None:
+            if new >= len(self.degree_histogram):
+                self.degree_histogram.extend([0] * (new + 1 - len(self.degree_histogram)))
+            self.degree_histogram[new] += 1
+            self.__min_degree = min(self.__min_degree, new)
 
-        for vertex in self.vertices:
-            if len(vertex.get_adjacent_vertices()) > max_degree:
-                max_degree = len(vertex.get_adjacent_vertices())
+    def __modified(self):
+        """Records that the vertices or edges of the graph have changed"""
+        self.version += 1
+        self.__csr = None
 
-        return max_degree
 
 
 
@@ -0,0 +1,162 @@
+import argparse
+import sys
+
+from GraphIO import load_graph, save_graph, load_edge_list, edge_list_to_binary
+
+
+# The command line interface to the graph engine, for running queries on graph files without a
+# display, for example
+#
+#     python GraphCLI.py info graph.txt
+#     python GraphCLI.py path graph.txt 1 5 --algorithm astar
+#     python GraphCLI.py fire graph.txt 1:2 3:-1 --output fired.txt
+#     python GraphCLI.py winnable graph.txt
+#     python GraphCLI.py import edges.csv graph.txt
+#     cat edges.txt | python GraphCLI.py import - graph.bin --binary
+#
+# Nothing here (or in the modules it uses) imports tkinter. See GraphIO for the graph file format.
+
+
+def info(args):
+    """Prints the basic information about a graph"""
+    graph = load_graph(args.file)
+
+    print(f'Vertices: {len(graph.vertices)}')
+    print(f'Edges: {len(graph.weights)}')
+    print(f'Min Degree: {graph.find_min_degree()}')
+    print(f'Max Degree: {graph.find_max_degree()}')
+    print(f'Total Value: {sum(vertex.value for vertex in graph.vertices)}')
+
+
+def path(args):
+    """Prints the shortest path between two vertices of a graph and its length"""
+    from ShortestPathCalculator import ShortestPathCalculator
+
+    graph = load_graph(args.file)
+    source, dest = graph.find_vertex(args.source), graph.find_vertex(args.dest)
+    if source is None or dest is None:
+        raise KeyError(f'There is no vertex with the id: {args.source if source is None else args.dest}')
+
+    sp = ShortestPathCalculator()
+    if args.algorithm == 'astar':
+        vertices = sp.astar(graph, source, dest)
+    elif args.algorithm == 'bidirectional':
+        vertices = sp.bidirectional_dijkstra(graph, source, dest)
+    else:
+        vertices = sp.dijkstra(graph, source, dest)
+
+    if not vertices:
+        print(f'There is no path from {args.source} to {args.dest}')
+    else:
+        print(f'Path: {" ".join(str(id) for id in vertices)}')
+        print(f'Length: {sp.distances[args.dest]}')
+    print(f'Expanded: {sp.expanded}')
+
+
+def fire(args):
+    """Has vertices of a graph give (or take) and prints the resulting values"""
+    from ChipFiring import ChipFiring
+
+    graph = load_graph(args.file)
+    game = ChipFiring(graph)
+
+    # Each move is written id:times, or just id to give once
+    moves = []
+    for move in args.moves:
+        id, _, times = move.partition(':')
+        moves.append((int(id), int(times) if times else 1))
+    game.run(moves)
+
+    for id, value in zip(game.csr.ids.tolist(), game.values.tolist()):
+        print(f'{id}: {value}')
+    print(f'Winning: {game.is_winning()}')
+
+    if args.output:
+        game.write_back()
+        save_graph(graph, args.output)
+
+
+def winnable(args):
+    """Prints whether the dollar game on a graph can be won, and how to win it"""
+    from DollarGameSolver import DollarGameSolver
+
+    solver = DollarGameSolver(load_graph(args.file))
+    script = solver.winning_script()
+
+    print(f'Winnable: {script is not None}')
+    if script is not None:
+        for id, gives in script.items():
+            print(f'{id}: gives {gives}')
+
+
+def import_edges(args):
+    """Converts an edge list into a graph file (or a binary graph file) and reports how fast it was read"""
+    if args.binary:
+        snapshot = edge_list_to_binary(args.edges, args.output, report=sys.stderr)
+        print(f'Vertices: {snapshot.num_vertices()}')
+        print(f'Edges: {snapshot.num_edges()}')
+    else:
+        graph = load_edge_list(args.edges, report=sys.stderr)
+        save_graph(graph, args.output)
+        print(f'Vertices: {len(graph.vertices)}')
+        print(f'Edges: {len(graph.weights)}')
+
+
+def main(argv=None):
+    """Runs the command given on the command line
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments (not including the program name), default is sys.argv[1:]
+
+    Returns
+    -------
+    int
+        The exit status, 0 on success and 1 if the command failed
+    """
+    parser = argparse.ArgumentParser(description='Runs queries on graph files without the GUI')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('info', help='print the number of vertices, edges and degrees')
+    command.add_argument('file', help='the graph file')
+    command.set_defaults(run=info)
+
+    command = commands.add_parser('path', help='print the shortest path between two vertices')
+    command.add_argument('file', help='the graph file')
+    command.add_argument('source', type=int, help='the id of the vertex the path starts at')
+    command.add_argument('dest', type=int, help='the id of the vertex the path ends at')
+    command.add_argument('--algorithm', choices=['dijkstra', 'astar', 'bidirectional'],
+                         default='dijkstra', help='the search algorithm to use')
+    command.set_defaults(run=path)
+
+    command = commands.add_parser('fire', help='have vertices give or take and print the values')
+    command.add_argument('file', help='the graph file')
+    command.add_argument('moves', nargs='+', help='id:times for a vertex to give times times, '
+                                                  'negative to take')
+    command.add_argument('--output', help='a graph file to save the graph with its new values to')
+    command.set_defaults(run=fire)
+
+    command = commands.add_parser('winnable', help='print whether the dollar game can be won')
+    command.add_argument('file', help='the graph file')
+    command.set_defaults(run=winnable)
+
+    command = commands.add_parser('import', help='convert an edge list (or CSV file) into a graph file')
+    command.add_argument('edges', help='the edge list, one \'<id> <id> [<weight>]\' per line, or - for stdin')
+    command.add_argument('output', help='the graph file to write')
+    command.add_argument('--binary', action='store_true',
+                         help='write a binary graph file without building the graph in memory')
+    command.set_defaults(run=import_edges)
+
+    args = parser.parse_args(argv)
+    try:
+        args.run(args)
+    except (RuntimeError, KeyError, OSError, ValueError) as error:
+        # A KeyError would otherwise print its message in quotes
+        print(f'Error: {error.args[0] if isinstance(error, KeyError) else error}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+from Vertex import Vertex
+from Graph import Graph
+from CSRGraph import CSRGraph
+import numpy as np
+
+
+# Generators of large synthetic graphs, for benchmarking the engine on inputs far bigger than
+# anyone would draw by hand, for example
+#
+#     graph = grid_graph(1000, 1000)
+#     graph = random_geometric_graph(1000000, 1.5, seed=1)
+#     graph = road_graph(1000, 1000, seed=1)
+#
+# Every generator picks all of its vertices and edges with NumPy arrays and builds the Graph at
+# the end with one add_vertices and one add_edges_from, so that no Python code runs per edge
+# until the graph itself is built. Building the Graph is still most of the time taken for a large
+# graph, so every generator can instead return a CSRGraph built straight from the arrays, which
+# never creates a Python object per vertex or edge. The vertices have the ids 0 to n-1 and a
+# value of 0. The random generators take a seed, and the same seed always gives the same graph.
+#
+# The vertices of the grid, random geometric and road graphs have coordinates, and the weight
+# of each of their edges is its length rounded up to a whole number, so the straight line
+# distance never overestimates the length of a path (as A* needs). The Erdos-Renyi and
+# Barabasi-Albert graphs have no geometry, their vertices are scattered at random so that they
+# can still be drawn and their weights are whole numbers picked at random.
+
+
+# The most pairs of vertices for which erdos_renyi_graph draws a number for every pair, rather
+# than drawing the number of edges and then picking that many pairs
+ERDOS_RENYI_ALL_PAIRS = 1 << 22
+
+
+def grid_graph(rows, columns, spacing=10, csr=False):
+    """Returns a graph whose vertices are the points of a grid, each joined to the vertices
+        next to it horizontally and vertically
+
+    Parameters
+    ----------
+    rows : int
+        The number of rows of vertices
+    columns : int
+        The number of columns of vertices
+    spacing : int, optional
+        The distance between neighboring vertices, which is also the weight of every edge
+
+    csr : bool, optional
+        If True the graph is returned as a CSRGraph snapshot without building a Graph, which
+        is many times quicker for large graphs
+
+    Returns
+    -------
+    Graph/CSRGraph
+        The grid, where the vertex in row r and column c has the id r * columns + c
+    """
+    ids = np.arange(rows * columns, dtype=np.int64).reshape(rows, columns)
+    x = (ids % columns) * spacing
+    y = (ids // columns) * spacing
+
+    # Each vertex is joined to the one on its right and the one below it
+    first = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    second = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    return _build(x.ravel(), y.ravel(), first, second, _lengths(x.ravel(), y.ravel(), first, second), csr)
+
+
+def random_geometric_graph(n, radius, seed=None, size=1000, csr=False):
+    """Returns a graph whose vertices are scattered at random over a square, where every two
+        vertices no further than radius apart are joined
+
+    The average degree is close to n * pi * radius ** 2 / size ** 2 (a little less, since the
+    vertices near the sides of the square have fewer neighbors).
+
+    Parameters
+    ----------
+    n : int
+        The number of vertices
+    radius : float
+        The greatest distance between two vertices that are joined
+    seed : int, optional
+        The seed of the random number generator
+    size : float, optional
+        The width and height of the square the vertices are scattered over
+
+    csr : bool, optional
+        If True the graph is returned as a CSRGraph snapshot without building a Graph, which
+        is many times quicker for large graphs
+
+    Returns
+    -------
+    Graph/CSRGraph
+        The random geometric graph
+    """
+    from scipy.spatial import cKDTree
+
+    rng = np.random.default_rng(seed)
+    x, y = rng.random(n) * size, rng.random(n) * size
+
+    # The tree finds every pair within radius without comparing each vertex with all of the others
+    pairs = cKDTree(np.column_stack((x, y))).query_pairs(radius, output_type='ndarray')
+    first, second = pairs[:, 0].astype(np.int64), pairs[:, 1].astype(np.int64)
+    return _build(x, y, first, second, _lengths(x, y, first, second), csr)
+
+
+def erdos_renyi_graph(n, p, seed=None, size=1000, max_weight=1, csr=False):
+    """Returns a graph where each pair of vertices is joined with probability p, independently
+        of all of the other pairs (the G(n, p) model of Erdos and Renyi)
+
+    Parameters
+    ----------
+    n : int
+        The number of vertices
+    p : float
+        The probability that two vertices are joined, between 0 and 1
+    seed : int, optional
+        The seed of the random number generator
+    size : float, optional
+        The width and height of the square the vertices are scattered over
+    max_weight : int, optional
+        The weights are picked uniformly from 1 to max_weight, default is 1 for every edge
+
+    csr : bool, optional
+        If True the graph is returned as a CSRGraph snapshot without building a Graph, which
+        is many times quicker for large graphs
+
+    Returns
+    -------
+    Graph/CSRGraph
+        The random graph
+
+    Raises
+    ------
+    ValueError
+        If p is not between 0 and 1
+    """
+    if not 0 <= p <= 1:
+        raise ValueError(f'The probability of an edge must be between 0 and 1, not {p}')
+
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1) // 2
+
+    if pairs <= ERDOS_RENYI_ALL_PAIRS:
+        # Few enough pairs to draw a number for every one of them
+        first, second = np.triu_indices(n, 1)
+        joined = rng.random(pairs) < p
+        first, second = first[joined].astype(np.int64), second[joined].astype(np.int64)
+    else:
+        # Far too many pairs, so the number of edges is drawn first and then that many distinct
+        # pairs are picked, which gives every graph with that many edges the same chance
+        count = int(rng.binomial(pairs, p))
+        keys = np.zeros(0, dtype=np.int64)
+        while len(keys) < count:
+            # A few more pairs than are missing are drawn, to make up for loops and repeats
+            missing = count - len(keys)
+            a = rng.integers(0, n, missing + missing // 8 + 16)
+            b = rng.integers(0, n, len(a))
+            a, b = np.minimum(a, b)[a != b], np.maximum(a, b)[a != b]
+
+            # The first time each pair was drawn is kept, in the order they were drawn, so the
+            # first count distinct pairs are a uniformly random choice of count pairs
+            keys = np.concatenate((keys, a * n + b))
+            _, firsts = np.unique(keys, return_index=True)
+            keys = keys[np.sort(firsts)]
+
+        # Sorted, the edges of each vertex are added together, which is kinder to the caches
+        keys = np.sort(keys[:count])
+        first, second = keys // n, keys % n
+
+    x, y = rng.random(n) * size, rng.random(n) * size
+    return _build(x, y, first, second, rng.integers(1, max_weight + 1, len(first)), csr)
+
+
+def barabasi_albert_graph(n, m, seed=None, size=1000, max_weight=1, csr=False):
+    """Returns a graph grown by preferential attachment (the model of Barabasi and Albert): the
+        vertices are added one at a time and each is joined to m of the earlier vertices, which
+        are picked with probability proportional to their degree
+
+    The edges are picked with the linear time method of Batagelj and Brandes, where the ends of
+    all of the edges so far are kept in one list, so that picking an entry of it uniformly picks
+    a vertex in proportion to its degree. The picks only depend on each other through earlier
+    entries of the list, so they are all drawn at once and then followed back to the vertex they
+    land on. As in that method, a vertex can pick itself or the same vertex twice, those edges
+    are not created, so a few vertices have fewer than m edges to earlier vertices.
+
+    Parameters
+    ----------
+    n : int
+        The number of vertices
+    m : int
+        The number of edges each new vertex is given
+    seed : int, optional
+        The seed of the random number generator
+    size : float, optional
+        The width and height of the square the vertices are scattered over
+    max_weight : int, optional
+        The weights are picked uniformly from 1 to max_weight, default is 1 for every edge
+
+    csr : bool, optional
+        If True the graph is returned as a CSRGraph snapshot without building a Graph, which
+        is many times quicker for large graphs
+
+    Returns
+    -------
+    Graph/CSRGraph
+        The random graph
+
+    Raises
+    ------
+    ValueError
+        If m is less than 1
+    """
+    if m < 1:
+        raise ValueError(f'Each new vertex needs at least one edge, not {m}')
+
+    rng = np.random.default_rng(seed)
+
+    # Edge e (the (e % m)th edge of vertex e // m) has its ends at entries 2e and 2e + 1 of the
+    # list of ends, the first is the new vertex and the second copies an entry picked uniformly
+    # from all of the entries before it
+    edges = n * m
+    first = np.arange(edges, dtype=np.int64) // m
+    picks = (rng.random(edges) * (2 * np.arange(edges, dtype=np.int64) + 1)).astype(np.int64)
+
+    # A pick of an even entry lands on the new vertex of that edge straight away, a pick of an odd
+    # entry copies the second end of an earlier edge, which is followed back (doubling the number
+    # of steps taken each time) until it lands on an even entry
+    second = np.where(picks % 2 == 0, picks // 2 // m, -1)
+    earlier = picks // 2
+    unknown = np.flatnonzero(second < 0)
+    while len(unknown):
+        found = second[earlier[unknown]]
+        second[unknown] = found
+        unknown = unknown[found < 0]
+        earlier[unknown] = earlier[earlier[unknown]]
+
+    x, y = rng.random(n) * size, rng.random(n) * size
+    return _build(x, y, first, second, rng.integers(1, max_weight + 1, edges), csr)
+
+
+def road_graph(rows, columns, spacing=10, jitter=0.2, diagonals=0.3, keep=0.7, seed=None,
+               csr=False):
+    """Returns a planar graph that looks like a road network: a grid of junctions, each moved a
+        little at random, where some blocks are cut across and some streets are missing
+
+    Every junction is joined to the next one along its row and column, and each block is cut
+    across by one of its diagonals with probability diagonals. Every street is kept with
+    probability keep, together with a random spanning tree of the streets so that the network
+    stays connected. With jitter less than a quarter every block stays convex, so no two streets
+    ever cross.
+
+    Parameters
+    ----------
+    rows : int
+        The number of rows of junctions
+    columns : int
+        The number of columns of junctions
+    spacing : float, optional
+        The distance between neighboring junctions before they are moved
+    jitter : float, optional
+        The furthest a junction is moved along each axis, as a fraction of spacing
+    diagonals : float, optional
+        The probability that a block is cut across
+    keep : float, optional
+        The probability that a street is kept (on top of those in the spanning tree)
+    seed : int, optional
+        The seed of the random number generator
+
+    csr : bool, optional
+        If True the graph is returned as a CSRGraph snapshot without building a Graph, which
+        is many times quicker for large graphs
+
+    Returns
+    -------
+    Graph/CSRGraph
+        The road network, where the junction in row r and column c has the id r * columns + c
+
+    Raises
+    ------
+    ValueError
+        If jitter is not between 0 and a quarter
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import minimum_spanning_tree
+
+    if not 0 <= jitter < 0.25:
+        raise ValueError(f'The jitter must be at least 0 and less than 0.25, not {jitter}')
+
+    rng = np.random.default_rng(seed)
+    n = rows * columns
+    ids = np.arange(n, dtype=np.int64).reshape(rows, columns)
+    x = ((ids % columns) + rng.uniform(-jitter, jitter, (rows, columns))).ravel() * spacing
+    y = ((ids // columns) + rng.uniform(-jitter, jitter, (rows, columns))).ravel() * spacing
+
+    # The streets along the rows and columns, then one diagonal of each block that is cut across
+    corners = ids[:-1, :-1].ravel()
+    cut = rng.random(len(corners)) < diagonals
+    falling = rng.random(len(corners)) < 0.5
+    corners, falling = corners[cut], falling[cut]
+    first = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel(),
+                            np.where(falling, corners, corners + 1)))
+    second = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel(),
+                             np.where(falling, corners + columns + 1, corners + columns)))
+
+    # The spanning tree of the streets with the smallest random numbers is a random spanning tree,
+    # the numbers are kept above 0 since the sparse matrix would drop the streets with a 0
+    chances = 1 - rng.random(len(first))
+    tree = minimum_spanning_tree(coo_matrix((chances, (first, second)), shape=(n, n))).tocoo()
+    tree_keys = np.minimum(tree.row, tree.col).astype(np.int64) * n + np.maximum(tree.row, tree.col)
+    kept = np.isin(first * n + second, tree_keys) | (chances <= keep)
+
+    first, second = first[kept], second[kept]
+    return _build(x, y, first, second, _lengths(x, y, first, second), csr)
+
+
+def _lengths(x, y, first, second):
+    """Returns the length of each edge rounded up to a whole number, at least 1"""
+    lengths = np.ceil(np.hypot(x[first] - x[second], y[first] - y[second]))
+    return np.maximum(lengths, 1).astype(np.int64)
+
+
+def _build(x, y, first, second, weights, csr=False):
+    """Returns a new graph with a vertex at each (x, y), with the id of its index, and an edge
+        from first[i] to second[i] with the weight weights[i] for each i, as a CSRGraph if csr
+    """
+    if csr:
+        return CSRGraph.from_edges(len(x), first, second, weights, x.astype(np.float64), y.astype(np.float64))
+
+    graph = Graph()
+    graph.add_vertices(*[Vertex(0, vx, vy, id) for id, (vx, vy) in enumerate(zip(x.tolist(), y.tolist()))])
+    graph.add_edges_from(list(zip(first.tolist(), second.tolist(), weights.tolist())))
+    return graph
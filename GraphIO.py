@@ -0,0 +1,800 @@
+from Vertex import Vertex
+from Graph import Graph
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import warnings
+
+
+# The graph file format is plain text with one vertex or edge per line, for example
+#
+#     # A path with three vertices
+#     v 1 2 100 100
+#     v 2 -1 200 100
+#     v 3 0 300 100
+#     e 1 2 5
+#     e 2 3 7
+#
+# A vertex line is 'v <id> [<value> [<x> <y>]]' and an edge line is 'e <id> <id> [<weight>]'.
+# Blank lines and everything after a '#' are ignored, and the vertices of an edge do not need
+# to come before it in the file.
+#
+# Graphs can also be imported from an edge list, which has one edge '<id> <id> [<weight>]' per
+# line, with the fields separated by spaces or by commas (as in a CSV file, whose header line
+# is skipped). The vertices are created as their ids are first seen, with a value of 0 at (0, 0).
+#
+# For moving graphs to and from other programs, graphs can be written and read as JSON in the
+# node-link layout (as used by NetworkX and D3) and as GraphML. In both, the vertices have an
+# integer id and a value, x and y, and the edges have a weight. The files are written and read
+# a vertex or edge at a time, so neither is ever held in memory as one big string. load_graph
+# and save_graph pick the format from the extension of the path: .json, .graphml, .bin (the
+# binary format of CSRGraph) or anything else for the text format above.
+
+
+def load_graph(path):
+    """Reads a graph from a graph file, in the format given by the extension of its path
+
+    Parameters
+    ----------
+    path : str
+        The path of the graph file to read
+
+    Returns
+    -------
+    Graph
+        The graph described by the file
+
+    Raises
+    ------
+    RuntimeError
+        If a line of the file is not a valid vertex or edge line, or an edge uses a vertex that
+        is not in the file
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        return read_json(path)
+    if extension == '.graphml':
+        return read_graphml(path)
+    if extension == '.bin':
+        return Graph.load(path)
+
+    vertices = []
+    edges = []
+
+    with open(path) as file:
+        for number, line in enumerate(file, start=1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+
+            try:
+                if fields[0] == 'v' and len(fields) in (2, 3, 5):
+                    id, value = int(fields[1]), int(fields[2]) if len(fields) > 2 else 0
+                    x, y = (_number(fields[3]), _number(fields[4])) if len(fields) > 3 else (0, 0)
+                    vertices.append(Vertex(value, x, y, id))
+                elif fields[0] == 'e' and len(fields) in (3, 4):
+                    weight = _number(fields[3]) if len(fields) > 3 else 0
+                    edges.append((int(fields[1]), int(fields[2]), weight))
+                else:
+                    raise ValueError
+            except ValueError:
+                raise RuntimeError(f'Line {number} of {path} is not a valid vertex or edge: {line.strip()}')
+
+    graph = Graph()
+    graph.add_vertices(*vertices)
+    for edge in edges:
+        if edge[0] not in graph.vertex_index or edge[1] not in graph.vertex_index:
+            raise RuntimeError(f'The edge {edge[0]} - {edge[1]} in {path} uses a vertex that is not in the file')
+    graph.add_edges_from(edges)
+
+    return graph
+
+
+def save_graph(graph, path):
+    """Writes a graph to a graph file, in the format given by the extension of its path
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to write
+    path : str
+        The path of the graph file to write
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        return write_json(graph, path)
+    if extension == '.graphml':
+        return write_graphml(graph, path)
+    if extension == '.bin':
+        return graph.save(path)
+
+    with open(path, 'w') as file:
+        for vertex in graph.vertices:
+            file.write(f'v {vertex.id} {vertex.value} {vertex.x} {vertex.y}\n')
+        for (id1, id2), weight in graph.weights.items():
+            file.write(f'e {id1} {id2} {weight}\n')
+
+
+def read_edges(source, chunk_size=65536):
+    """Reads the edges of an edge list a chunk at a time, so that only one chunk of the text is
+        ever held in memory
+
+    Parameters
+    ----------
+    source : str/file
+        The path of the edge list, '-' for the standard input, or a file opened for reading
+    chunk_size : int, optional
+        The number of lines of the list read at a time
+
+    Yields
+    ------
+    list
+        The (id, id, weight) of the edges on the next lines of the list, the weight is 0 when
+        it is not given
+
+    Raises
+    ------
+    RuntimeError
+        If a line of the list (other than a header line at the start) is not a valid edge
+    """
+    for number, name, lines in _read_lines(source, chunk_size):
+        yield _parse_edges(lines, number, name)
+
+
+def _read_lines(source, chunk_size):
+    """Yields the number of the first line, the name of the file and the lines of each chunk of
+        lines of an edge list (a path, '-' for the standard input or an open file)"""
+    if source == '-':
+        file = sys.stdin
+    elif isinstance(source, str):
+        file = open(source)
+    else:
+        file = source
+    name = getattr(file, 'name', 'the edge list')
+
+    try:
+        number = 1
+        while True:
+            lines = list(itertools.islice(file, chunk_size))
+            if not lines:
+                return
+            yield number, name, lines
+            number += len(lines)
+    finally:
+        if file is not source and file is not sys.stdin:
+            file.close()
+
+
+def _parse_edges(lines, number, name):
+    """Returns the (id, id, weight) of the edge on each of the lines of an edge list, skipping
+        blank lines and comments, and a header line if the first line of the list is one
+
+    Parameters
+    ----------
+    lines : list
+        The lines to parse
+    number : int
+        The line number of the first of the lines
+    name : str
+        The name of the edge list, for error messages
+
+    Returns
+    -------
+    list
+        The (id, id, weight) of each edge, the weight is 0 when it is not given
+
+    Raises
+    ------
+    RuntimeError
+        If a line is not a valid edge
+    """
+    edges = []
+    for number, line in enumerate(lines, start=number):
+        fields = line.split('#', 1)[0]
+        fields = fields.split(',') if ',' in fields else fields.split()
+        if not fields or fields == ['']:
+            continue
+
+        try:
+            if len(fields) not in (2, 3):
+                raise ValueError
+            edges.append((int(fields[0]), int(fields[1]), _number(fields[2]) if len(fields) > 2 else 0))
+        except ValueError:
+            # The first line of a CSV file may name its columns rather than give an edge
+            if number != 1:
+                raise RuntimeError(f'Line {number} of {name} is not a valid edge: {line.strip()}')
+    return edges
+
+
+def _read_edge_arrays(source, chunk_size):
+    """Reads an edge list a chunk at a time like read_edges, but parses each chunk with NumPy
+
+    Yields
+    ------
+    tuple
+        An array of the (id, id) of each edge of the chunk and an array of their weights
+    """
+    import numpy as np
+
+    for number, name, lines in _read_lines(source, chunk_size):
+        # NumPy's parser is many times faster than splitting every line in Python, but it needs
+        # every line of the chunk to have the same number of fields, so any chunk it can not
+        # parse (including one with a header line) goes through _parse_edges instead
+        delimiter = ',' if ',' in lines[0] else None
+        edges = None
+        for fields in (_EDGE_FIELDS, _EDGE_FIELDS[:2]):
+            try:
+                with warnings.catch_warnings():
+                    # NumPy warns about chunks with nothing but comments in them
+                    warnings.simplefilter('ignore', UserWarning)
+                    edges = np.loadtxt(lines, dtype=fields, delimiter=delimiter, comments='#', ndmin=1)
+                break
+            except ValueError:
+                continue
+
+        if edges is not None:
+            pairs = np.column_stack((edges['id1'], edges['id2']))
+            weights = edges['weight'].astype(np.float64) if 'weight' in edges.dtype.names else np.zeros(len(edges))
+        else:
+            parsed = _parse_edges(lines, number, name)
+            pairs = np.array([(id1, id2) for id1, id2, _ in parsed], dtype=np.int64).reshape(-1, 2)
+            weights = np.array([weight for _, _, weight in parsed], dtype=np.float64)
+        yield pairs, weights
+
+
+def load_edge_list(source, chunk_size=262144, report=None):
+    """Builds a graph from an edge list, which is read a chunk at a time
+
+    Parameters
+    ----------
+    source : str/file
+        The path of the edge list, '-' for the standard input, or a file opened for reading
+    chunk_size : int, optional
+        The number of edges read and added to the graph at a time
+    report : file, optional
+        A file (such as sys.stderr) to write the number of edges read per second to at the end
+
+    Returns
+    -------
+    Graph
+        The graph with every edge of the list, edges that repeat an earlier one or join a
+        vertex to itself are ignored
+
+    Raises
+    ------
+    RuntimeError
+        If a line of the list is not a valid edge
+    """
+    start = time.perf_counter()
+    graph = Graph()
+    count = 0
+
+    for chunk in read_edges(source, chunk_size):
+        # Each chunk's new vertices are added together, then its edges
+        new_vertices = {}
+        for id1, id2, _ in chunk:
+            for id in (id1, id2):
+                if id not in graph.vertex_index and id not in new_vertices:
+                    new_vertices[id] = Vertex(0, 0, 0, id)
+        graph.add_vertices(*new_vertices.values())
+
+        graph.add_edges_from(chunk)
+        count += len(chunk)
+
+    _report_throughput(report, count, time.perf_counter() - start)
+    return graph
+
+
+def edge_list_to_binary(source, path, chunk_size=1 << 20, report=None):
+    """Converts an edge list into a binary graph file (see CSRGraph) without ever holding the
+        edges in memory, so that lists of graphs too big for memory can be converted
+
+    The edges are first spilled to temporary files on disk a chunk at a time, the adjacency
+    rows are then filled in by scattering the spilled edges into a memory map, and lastly
+    repeated edges are dropped one block of rows at a time as the file is written. Only the
+    id of every vertex and a few numbers per vertex are kept in memory.
+
+    Parameters
+    ----------
+    source : str/file
+        The path of the edge list, '-' for the standard input, or a file opened for reading
+    path : str
+        The path of the binary graph file to write
+    chunk_size : int, optional
+        The number of edges read (and later moved around) at a time
+    report : file, optional
+        A file (such as sys.stderr) to write the number of edges read per second to at the end
+
+    Returns
+    -------
+    CSRGraph
+        The snapshot of the graph in the file, memory-mapped
+
+    Raises
+    ------
+    RuntimeError
+        If a line of the list is not a valid edge
+    """
+    import numpy as np
+    import tempfile
+    from CSRGraph import CSRGraph
+
+    start = time.perf_counter()
+    index = {}
+    degrees = np.zeros(0, dtype=np.int64)
+    count = 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        edges_path = os.path.join(directory, 'edges')
+        weights_path = os.path.join(directory, 'weights')
+
+        # Read the list, giving every new id the next index and writing each edge (without
+        # self loops) as a pair of indices and a weight
+        with open(edges_path, 'wb') as edges_file, open(weights_path, 'wb') as weights_file:
+            for pairs, weights in _read_edge_arrays(source, chunk_size):
+                count += len(pairs)
+
+                # Only the distinct ids of the chunk are looked up, new ones are given the next
+                # indices in increasing order of id
+                ids, inverse = np.unique(pairs, return_inverse=True)
+                indices = np.array([index.setdefault(id, len(index)) for id in ids.tolist()], dtype=np.int64)
+                pairs = indices[inverse.reshape(-1)].reshape(-1, 2)
+
+                loops = pairs[:, 0] == pairs[:, 1]
+                pairs, weights = pairs[~loops], weights[~loops]
+                pairs.tofile(edges_file)
+                weights.tofile(weights_file)
+
+                if len(index) > len(degrees):
+                    degrees = np.concatenate((degrees, np.zeros(len(index) - len(degrees), dtype=np.int64)))
+                degrees += np.bincount(pairs.ravel(), minlength=len(degrees))
+
+        n = len(index)
+        ids = np.fromiter(index, dtype=np.int64, count=n)
+        del index
+
+        # The rows start where the degrees of the vertices before them add up to
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        nnz = int(indptr[-1])
+        index_type = np.int32 if n <= np.iinfo(np.int32).max else np.int64
+
+        columns = _scratch_array(os.path.join(directory, 'columns'), index_type, nnz)
+        entry_weights = _scratch_array(os.path.join(directory, 'entry_weights'), np.float64, nnz)
+        edges = np.memmap(edges_path, dtype=np.int64, mode='r') if nnz else np.zeros(0, dtype=np.int64)
+        edge_weights = np.memmap(weights_path, dtype=np.float64, mode='r') if nnz else np.zeros(0)
+        edges = edges.reshape(-1, 2)
+
+        filled = np.zeros(n, dtype=np.int64)
+        for first in range(0, len(edges), chunk_size):
+            pairs = np.array(edges[first:first + chunk_size])
+            weights = np.array(edge_weights[first:first + chunk_size])
+            # Each edge is an entry in the row of both of its vertices, kept in the order read
+            rows = pairs.ravel()
+            cols = pairs[:, ::-1].ravel()
+            weights = np.repeat(weights, 2)
+
+            # Entries of the same row get consecutive places after those already filled in
+            order = np.argsort(rows, kind='stable')
+            rows, cols, weights = rows[order], cols[order], weights[order]
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            rank = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+            places = indptr[rows] + filled[rows] + rank
+            columns[places] = cols
+            entry_weights[places] = weights
+            filled += np.bincount(rows, minlength=n)
+        del edges, edge_weights
+
+        # Drop repeated edges, keeping the first, a block of whole rows at a time. The kept
+        # entries are moved forward in place, which never overwrites an entry not yet looked at
+        kept = np.zeros(n + 1, dtype=np.int64)
+        end_row = 0
+        while end_row < n:
+            # As many whole rows as fit in a chunk, or one row if even that does not fit
+            first_row = end_row
+            end_row = int(np.searchsorted(indptr, indptr[first_row] + chunk_size, 'right')) - 1
+            end_row = min(max(end_row, first_row + 1), n)
+            lo, hi = int(indptr[first_row]), int(indptr[end_row])
+
+            rows = np.repeat(np.arange(first_row, end_row), degrees[first_row:end_row])
+            cols = np.array(columns[lo:hi])
+            order = np.lexsort((cols, rows))
+            repeated = np.zeros(hi - lo, dtype=bool)
+            repeated[order[1:]] = (rows[order[1:]] == rows[order[:-1]]) & (cols[order[1:]] == cols[order[:-1]])
+
+            keep = ~repeated
+            out = int(kept[first_row])
+            block_weights = np.array(entry_weights[lo:hi])[keep]
+            columns[out:out + len(block_weights)] = cols[keep]
+            entry_weights[out:out + len(block_weights)] = block_weights
+            np.cumsum(np.bincount(rows[keep] - first_row, minlength=end_row - first_row),
+                      out=kept[first_row + 1:end_row + 1])
+            kept[first_row + 1:end_row + 1] += out
+
+        nnz = int(kept[-1])
+        snapshot = CSRGraph(kept, columns[:nnz], entry_weights[:nnz], ids,
+                            x=np.zeros(n), y=np.zeros(n), values=np.zeros(n, dtype=np.int64))
+        snapshot.save(path)
+        del snapshot, columns, entry_weights
+
+    _report_throughput(report, count, time.perf_counter() - start)
+    return CSRGraph.load(path)
+
+
+def write_json(graph, path):
+    """Writes a graph to a JSON file in the node-link layout, one vertex or edge per line
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to write
+    path : str
+        The path of the JSON file to write
+    """
+    with open(path, 'w') as file:
+        file.write('{"directed": false, "multigraph": false, "graph": {},\n"nodes": [')
+
+        # Every item after the first is preceded by a comma
+        separator = '\n'
+        for v in graph.vertices:
+            file.write(f'{separator}{{"id": {v.id}, "value": {v.value}, "x": {v.x}, "y": {v.y}}}')
+            separator = ',\n'
+        file.write('\n],\n"links": [')
+
+        separator = '\n'
+        for (id1, id2), weight in graph.weights.items():
+            file.write(f'{separator}{{"source": {id1}, "target": {id2}, "weight": {weight}}}')
+            separator = ',\n'
+        file.write('\n]}\n')
+
+
+def read_json(path):
+    """Reads a graph from a JSON file in the node-link layout, a vertex or edge at a time
+
+    The vertices are the objects in "nodes" (their "value", "x" and "y" are 0 if not given) and
+    the edges are the objects in "links" (or "edges"), whose "weight" is 0 if not given.
+    Anything else in the file is skipped.
+
+    Parameters
+    ----------
+    path : str
+        The path of the JSON file to read
+
+    Returns
+    -------
+    Graph
+        The graph described by the file
+
+    Raises
+    ------
+    RuntimeError
+        If the file is not valid JSON in the node-link layout, a vertex id is not a whole
+        number, or an edge uses a vertex that is not in the file
+    """
+    builder = _GraphBuilder(path)
+    with open(path) as file:
+        for key, item in _json_array_items(file, path):
+            if not isinstance(item, dict):
+                raise RuntimeError(f'{path} has an entry in "{key}" that is not an object: {item!r}')
+
+            if key == 'nodes':
+                builder.add_vertex(item.get('id'), item.get('value', 0), item.get('x', 0), item.get('y', 0))
+            else:
+                builder.add_edge(item.get('source'), item.get('target'), item.get('weight', 0))
+    return builder.finish()
+
+
+def write_graphml(graph, path):
+    """Writes a graph to a GraphML file, one vertex or edge per line
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to write
+    path : str
+        The path of the GraphML file to write
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                   '<key id="value" for="node" attr.name="value" attr.type="long"/>\n'
+                   '<key id="x" for="node" attr.name="x" attr.type="double"/>\n'
+                   '<key id="y" for="node" attr.name="y" attr.type="double"/>\n'
+                   '<key id="weight" for="edge" attr.name="weight" attr.type="double"/>\n'
+                   '<graph edgedefault="undirected">\n')
+        file.writelines(f'<node id="{v.id}"><data key="value">{v.value}</data><data key="x">{v.x}</data>'
+                        f'<data key="y">{v.y}</data></node>\n' for v in graph.vertices)
+        file.writelines(f'<edge source="{id1}" target="{id2}"><data key="weight">{weight}</data></edge>\n'
+                        for (id1, id2), weight in graph.weights.items())
+        file.write('</graph>\n</graphml>\n')
+
+
+def read_graphml(path):
+    """Reads a graph from a GraphML file, a vertex or edge at a time
+
+    The value, x and y of the vertices and the weight of the edges are the data whose key has
+    that attr.name (they are 0, or the default of the key, if not given). Any other data is
+    skipped, and directed edges are read as undirected ones.
+
+    Parameters
+    ----------
+    path : str
+        The path of the GraphML file to read
+
+    Returns
+    -------
+    Graph
+        The graph described by the file
+
+    Raises
+    ------
+    RuntimeError
+        If the file is not valid GraphML, a vertex id is not a whole number, or an edge uses a
+        vertex that is not in the file
+    """
+    from xml.etree.ElementTree import XMLParser, ParseError
+
+    builder = _GraphBuilder(path)
+    parser = XMLParser(target=_GraphMLTarget(builder))
+
+    try:
+        with open(path, 'rb') as file:
+            while True:
+                data = file.read(1 << 16)
+                if not data:
+                    break
+                parser.feed(data)
+        parser.close()
+    except ParseError as error:
+        raise RuntimeError(f'{path} is not a valid GraphML file: {error}')
+    except ValueError:
+        raise RuntimeError(f'{path} has a value, coordinate or weight that is not a number')
+
+    return builder.finish()
+
+
+# The attr.names of the GraphML data that are read, the data of any other key is skipped
+_GRAPHML_DATA = {'value', 'x', 'y', 'weight'}
+
+
+class _GraphMLTarget:
+    """
+    Class which receives the start and end of every element of a GraphML file from the XML parser
+    and passes each vertex and edge on to a _GraphBuilder, without building a tree of the file
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+
+        # The name and default value of the data of each key that is read, by the id of the key
+        self.keys = {}
+
+        # The attributes of the key, node or edge being read, its data values so far, the key of the
+        # data element being read and the pieces of text read inside the current element
+        self.key = None
+        self.element = None
+        self.values = {}
+        self.data_key = None
+        self.text = []
+
+    def start(self, tag, attributes):
+        # Tags have the GraphML namespace in front of them, if the file declares it
+        tag = tag.rsplit('}', 1)[-1]
+        if tag == 'node' or tag == 'edge':
+            self.element = attributes
+            self.values = {}
+        elif tag == 'data':
+            self.data_key = attributes.get('key')
+        elif tag == 'key':
+            self.key = attributes
+        self.text = []
+
+    def data(self, text):
+        self.text.append(text)
+
+    def end(self, tag):
+        tag = tag.rsplit('}', 1)[-1]
+        if tag == 'data':
+            if self.data_key in self.keys:
+                text = ''.join(self.text).strip()
+                self.values[self.keys[self.data_key][0]] = _number(text) if text else 0
+        elif tag == 'default':
+            if self.key is not None:
+                self.key = dict(self.key, default=''.join(self.text).strip())
+        elif tag == 'key':
+            name = self.key.get('attr.name', self.key.get('id'))
+            if name in _GRAPHML_DATA:
+                self.keys[self.key.get('id')] = (name, self.key.get('default'))
+            self.key = None
+        elif tag == 'node' or tag == 'edge':
+            # Data that is not given takes the default of its key
+            data = self.values
+            for name, default in self.keys.values():
+                if name not in data and default is not None:
+                    data[name] = _number(default)
+
+            if tag == 'node':
+                self.builder.add_vertex(self.element.get('id'), data.get('value', 0), data.get('x', 0), data.get('y', 0))
+            else:
+                self.builder.add_edge(self.element.get('source'), self.element.get('target'), data.get('weight', 0))
+
+    def close(self):
+        pass
+
+
+class _GraphBuilder:
+    """
+    Class which collects the vertices and edges read from a file and adds them to a new graph in
+    batches, with add_vertices and add_edges_from
+
+    An edge read before one of its vertices is kept back until the whole file has been read.
+    """
+
+    def __init__(self, name, batch_size=65536):
+        self.graph = Graph()
+        self.name = name
+        self.batch_size = batch_size
+
+        # The vertices and edges not yet added to the graph, and the edges kept back
+        self.__vertices = []
+        self.__edges = []
+        self.__waiting = []
+
+    def add_vertex(self, id, value, x, y):
+        """Adds a vertex to the next batch"""
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise RuntimeError(f'The vertex {id} in {self.name} has a value that is not a whole number: {value!r}')
+        self.__vertices.append(Vertex(value, x, y, self.__id(id)))
+        if len(self.__vertices) >= self.batch_size:
+            self.__add_vertices()
+
+    def add_edge(self, id1, id2, weight):
+        """Adds an edge to the next batch"""
+        # Most files have whole number ids already, so the check is skipped for them
+        if type(id1) is not int:
+            id1 = self.__id(id1)
+        if type(id2) is not int:
+            id2 = self.__id(id2)
+        self.__edges.append((id1, id2, weight))
+        if len(self.__edges) >= self.batch_size:
+            self.__add_edges()
+
+    def finish(self):
+        """Adds everything that is left to the graph and returns it"""
+        self.__add_vertices()
+        self.__add_edges()
+        for edge in self.__waiting:
+            if edge[0] not in self.graph.vertex_index or edge[1] not in self.graph.vertex_index:
+                raise RuntimeError(f'The edge {edge[0]} - {edge[1]} in {self.name} uses a vertex that is not in the file')
+        self.graph.add_edges_from(self.__waiting)
+        return self.graph
+
+    def __add_vertices(self):
+        """Adds the batch of vertices to the graph"""
+        self.graph.add_vertices(*self.__vertices)
+        self.__vertices = []
+
+    def __add_edges(self):
+        """Adds the batch of edges to the graph, keeping back those with a vertex not yet read"""
+        self.__add_vertices()
+        vertex_index = self.graph.vertex_index
+        ready = [edge for edge in self.__edges if edge[0] in vertex_index and edge[1] in vertex_index]
+        if len(ready) < len(self.__edges):
+            self.__waiting.extend(edge for edge in self.__edges
+                                  if edge[0] not in vertex_index or edge[1] not in vertex_index)
+        self.graph.add_edges_from(ready)
+        self.__edges = []
+
+    def __id(self, id):
+        """Returns the vertex id read from the file as an int"""
+        if type(id) is int:
+            return id
+        if isinstance(id, str) and id.strip().lstrip('-').isdigit():
+            return int(id)
+        if not isinstance(id, int) or isinstance(id, bool):
+            raise RuntimeError(f'{self.name} has a vertex id that is not a whole number: {id!r}')
+        return id
+
+
+# The whitespace between the parts of a JSON document
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+
+def _json_array_items(file, name):
+    """Reads the top level object of a JSON file a piece at a time, yielding the key ("nodes" or
+        "links") and the value of every item of its "nodes", "links" and "edges" arrays"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    ended = False
+
+    def read_more():
+        nonlocal buffer, position, ended
+        text = file.read(1 << 16)
+        ended = not text
+        buffer = buffer[position:] + text
+        position = 0
+        return not ended
+
+    def next_character():
+        # Skips over whitespace, reading more of the file as needed
+        nonlocal position
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position < len(buffer) or not read_more():
+                return buffer[position] if position < len(buffer) else ''
+
+    def expect(characters):
+        nonlocal position
+        character = next_character()
+        if not character or character not in characters:
+            raise RuntimeError(f'{name} is not valid JSON in the node-link layout')
+        position += 1
+        return character
+
+    def value():
+        # A value is only taken once it can not go on past the end of what has been read (a
+        # number split between two reads would otherwise be cut short)
+        nonlocal position
+        next_character()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                if end < len(buffer) or ended:
+                    position = end
+                    return item
+            except json.JSONDecodeError:
+                if ended:
+                    raise RuntimeError(f'{name} is not valid JSON in the node-link layout')
+            read_more()
+
+    expect('{')
+    if next_character() == '}':
+        return
+    while True:
+        key = value()
+        expect(':')
+        if key in ('nodes', 'links', 'edges'):
+            expect('[')
+            if next_character() == ']':
+                expect(']')
+            else:
+                while True:
+                    yield 'nodes' if key == 'nodes' else 'links', value()
+                    if expect(',]') == ']':
+                        break
+        else:
+            value()
+        if expect(',}') == '}':
+            return
+
+
+def _number(field):
+    """Returns the number written in a field of a graph file, as an int if it is a whole number"""
+    try:
+        return int(field)
+    except ValueError:
+        return float(field)
+
+
+# The fields of a line of an edge list, for NumPy's parser
+_EDGE_FIELDS = [('id1', '<i8'), ('id2', '<i8'), ('weight', '<f8')]
+
+
+def _scratch_array(path, dtype, length):
+    """Returns a writable memory-mapped array of the given length backed by a new file"""
+    import numpy as np
+
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='w+', shape=(length,))
+
+
+def _report_throughput(report, count, seconds):
+    """Writes the number of edges read per second to the report file, if there is one"""
+    if report is not None:
+        rate = count / seconds if seconds > 0 else float('inf')
+        print(f'Read {count} edges in {seconds:.2f} s ({rate:.0f} edges per second)', file=report)
@@ -9,7 +9,11 @@ from time import sleep, time
 from Vertex import Vertex
 from Graph import Graph
 from ShortestPathCalculator import ShortestPathCalculator
+from SpatialGrid import SpatialGrid
+from CanvasRenderer import CanvasRenderer
+from GraphIO import load_graph, save_graph
 from tkinter import *
+from tkinter import filedialog
 import tkinter as tk
 import math
 
@@ -40,6 +44,10 @@ class Graph_GUI(Frame):
         Button that when clicked allows the user to calculate a shortest path in the graph
     cancel_button : Button
         Button that when clicked cancels the currently active command
+    save_button : Button
+        Button that when clicked saves the graph and its layout to a file
+    load_button : Button
+        Button that when clicked replaces the graph with one saved to a file
     value_prompt_window : TopLevel
         Window in which the user is prompted to enter a value for a new vertex
     value_entry : Entry
@@ -56,10 +64,31 @@ class Graph_GUI(Frame):
         Text that displays instructions to the user about the currently active command
     graph : Graph
         The underlying graph object being manipulated
+    sp : ShortestPathCalculator
+        The calculator used for every shortest path, it keeps the shortest path trees it has
+        found until the graph changes
     ovals : list
         A list of the ids of the ovals in the graph canvas that correspond to a vertex
     lines : dict
         A map taking the id of each line (edge) in the graph canvas to info about it
+    spatial_grid : SpatialGrid
+        An index of the centers of the ovals used to find the vertex at a point
+    value_texts : dict
+        A map taking the id of each oval to the id of its value text
+    vertex_lines : dict
+        A map taking the id of each oval to the set of ids of the lines (edges) connected to it
+    edge_lines : dict
+        A map taking each pair of adjacent vertex ids to the id of the line (edge) between them
+    renderer : CanvasRenderer
+        Collects the changes to the items of the graph canvas and draws them together
+    info_renderer : CanvasRenderer
+        Collects the changes to the items of the info canvas and draws them together
+    hovered_vertex : int
+        The id of the vertex currently highlighted by hovering over it, or None
+    hover_interval : int
+        The least number of milliseconds between two handled mouse movements
+    hover_stats : dict
+        The number of mouse movements that were handled and that were coalesced into later ones
     sel_vertex_ids : list
         A list of the ids of the currently selected vertices (ovals)
     cancel_commands : dict
@@ -93,6 +122,10 @@ class Graph_GUI(Frame):
         Calculate the shortest path between the two currently selected vertices using Dijkstra's algorithm
     cancel()
         Cancel the currently active command
+    save_session(path)
+        Save the graph, including where each vertex is on the canvas, to a graph file
+    load_session(path)
+        Replace the graph with the one in a graph file, drawing its vertices where they were saved
     """
 
     def __init__(self, master=None):
@@ -110,6 +143,11 @@ class Graph_GUI(Frame):
         self.info_canvas = Canvas(self, bg='black', height=175, width=1300)
         self.info_canvas.grid(row=1, column=0, columnspan=2)
 
+        # Changes to the items of the graph and info canvases are collected by these renderers
+        # and drawn together once tkinter is idle, rather than one canvas call at a time
+        self.renderer = CanvasRenderer(self.graph_canvas)
+        self.info_renderer = CanvasRenderer(self.info_canvas)
+
         # The window for the value prompt when creating a new Vertex in the graph
         self.value_prompt_window = None
 
@@ -128,13 +166,35 @@ class Graph_GUI(Frame):
         # Creates a new Graph object which will hold the information about the vertices and whatnot
         self.graph = Graph()
 
+        # A single shortest path calculator, so that paths from a source we have already searched
+        # from are found in its cache (it notices by itself when the graph has changed)
+        self.sp = ShortestPathCalculator()
+
+        # The id of the source of the last shortest path found, a second search from the same
+        # source is the sign that a whole shortest path tree is worth building
+        self.sp_source = None
+
         # A list of the ovals in the graph canvas: used in part to ensure vertices do not overlap
         self.ovals = []
 
+        # A grid of the centers of the ovals, so that we can find the vertex under the mouse (or
+        # near a new one) without asking the canvas about every item around it
+        self.spatial_grid = SpatialGrid()
+
         # A dictionary of the ids of the lines (edges) in the graph mapped to the ids of
         # the weight text of the line
         self.lines = {}
 
+        # A dictionary of the ids of the ovals mapped to the ids of their value texts
+        self.value_texts = {}
+
+        # A dictionary of the ids of the ovals mapped to the set of the ids of their lines (edges)
+        self.vertex_lines = {}
+
+        # A dictionary of the pairs of vertex ids joined by an edge (as given by Graph.edge_key)
+        # mapped to the id of the line between them
+        self.edge_lines = {}
+
         # A list of the currently selected Vertices
         self.sel_vertex_ids = []
 
@@ -153,6 +213,19 @@ class Graph_GUI(Frame):
                                 'sp': self.__cancel_sp}
         self.active_command = None
 
+        # The vertex highlighted by hovering, and the mouse movement handling: at most one
+        # movement is handled per refresh of the display (about 60 per second), any others in
+        # between are coalesced so only the latest mouse position is used
+        self.hovered_vertex = None
+        self.hover_interval = 16
+        self.hover_stats = {'handled': 0, 'coalesced': 0}
+        self.__hover_position = None
+        self.__hover_after_id = None
+        self.__last_hover_time = 0
+
+        # Whether the information about the graph is already waiting to be displayed
+        self.__graph_info_pending = False
+
         self.grid()
 
     def __create_info_texts(self):
@@ -203,6 +276,9 @@ class Graph_GUI(Frame):
         # Cancel Button
         self.__create_cancel_button()
 
+        # Save and Load Buttons
+        self.__create_session_buttons()
+
         # Create the hover vertex event
         self.__set_hover_vertex()
 
@@ -245,48 +321,82 @@ class Graph_GUI(Frame):
         self.hv_funcid = self.graph_canvas.bind('<Motion>', self.__hover_vertex)
 
     def __hover_vertex(self, event):
-        """Highlights a Vertex and all of its connected edges when the mouse hovers over it
+        """Handles the mouse moving over the graph canvas, at most once every hover_interval
+            milliseconds, later movements in between replace the waiting one
 
         Parameters
         ----------
         event : Event
-            The event that is triggered when the mouse hovers over a vertex (oval)
+            The event that is triggered when the mouse moves over the graph canvas
         """
+        self.__hover_position = (event.x, event.y)
+
+        # If a movement is already waiting to be handled, it will use this position instead
+        if self.__hover_after_id is not None:
+            self.hover_stats['coalesced'] += 1
+            return
+
+        # Handle the movement now, unless the last one was handled too recently
+        wait = self.__last_hover_time + self.hover_interval / 1000 - time()
+        if wait > 0:
+            self.__hover_after_id = self.after(math.ceil(wait * 1000), self.__handle_hover)
+        else:
+            self.__handle_hover()
 
-        # The objects that overlap with the current mouse position
-        overlaps = self.graph_canvas.find_overlapping(event.x-3, event.y-3,
-                                                      event.x+3, event.y+3)
+    def __handle_hover(self):
+        """Handles a mouse movement over the graph canvas, counting it and updating the hover"""
+        self.__hover_after_id = None
+        self.__last_hover_time = time()
+        self.hover_stats['handled'] += 1
+        self.__update_hover()
+
+    def __update_hover(self):
+        """Highlights a Vertex and all of its connected edges when the mouse hovers over it"""
 
         # The vertex being hovered over
-        vertex_id = None
+        vertex_id = self.__find_vertex_at(*self.__hover_position)
 
-        for i in range(len(overlaps)):
-            if self.graph_canvas.type(overlaps[i]) == 'oval':
-                vertex_id = overlaps[i]
+        # If the mouse is still over the same vertex (or still over no vertex at all), the
+        # highlighting and the info are already up to date
+        if vertex_id == self.hovered_vertex:
+            return
+
+        # Remove the highlighting of the vertex that was hovered over before
+        self.__reset_colors()
 
         if vertex_id:
             # Change the color of the vertex to red if it is not currently selected
             if vertex_id not in self.sel_vertex_ids:
-                self.graph_canvas.itemconfigure(vertex_id, fill='red')
-
-            # The coordinates of the vertex being hovered over
-            x, y = self.graph.get_coordinates(vertex_id)
-
-            # Get a list of all overlapping objects
-            overlaps = self.graph_canvas.find_overlapping(x-3, y-3,
-                                                          x+3, y+3)
+                self.renderer.configure(vertex_id, fill='red')
 
-            # Change the edges connected to this vertex and its weight text to red
-            for i in range(len(overlaps)):
-                if self.graph_canvas.type(overlaps[i]) == 'line':
-                    self.graph_canvas.itemconfigure(overlaps[i], fill='red')
-                    self.graph_canvas.itemconfigure(self.lines[overlaps[i]][1], fill='red')
+            # Change the edges connected to this vertex and their weight texts to red
+            for line in self.vertex_lines[vertex_id]:
+                self.renderer.configure(line, fill='red')
+                self.renderer.configure(self.lines[line][1], fill='red')
 
             # Display the vertex information in the info canvas
             self.__display_hover_info(vertex_id)
+            self.hovered_vertex = vertex_id
         else:
+            self.info_renderer.configure(self.hover_info_txt, text='')
+
+    def __refresh_hover(self):
+        """Redoes the hover highlighting and info, after a change to the graph may have left
+            them out of date
+        """
+        if self.hovered_vertex is not None:
+            # Resetting forgets the hovered vertex, so if nothing is under the mouse any more
+            # __update_hover sees no change and the info has to be cleared here. This is not a
+            # mouse movement, so it is not counted in hover_stats
             self.__reset_colors()
-            self.info_canvas.itemconfigure(self.hover_info_txt, text='')
+            self.info_renderer.configure(self.hover_info_txt, text='')
+            self.__update_hover()
+
+    def __cancel_hover(self):
+        """Drops the mouse movement waiting to be handled, if there is one"""
+        if self.__hover_after_id is not None:
+            self.after_cancel(self.__hover_after_id)
+            self.__hover_after_id = None
 
     # -------------------------------- #
     #                                  #
@@ -563,6 +673,23 @@ class Graph_GUI(Frame):
         # Add the cancel button to the window
         self.options_canvas.itemconfigure(self.cancel_id, window=self.cancel_button)
 
+    def __create_session_buttons(self):
+        """Creates the Save and Load Buttons, side by side below the others"""
+
+        # Create the windows in the options canvas to contain the save and load buttons
+        self.save_id = self.options_canvas.create_window(75, 765)
+        self.load_id = self.options_canvas.create_window(225, 765)
+
+        # Create the save and load buttons
+        self.save_button = Button(self.options_canvas, text='Save', command=self.__prompt_save_session,
+                                  height=1, width=16)
+        self.load_button = Button(self.options_canvas, text='Load', command=self.__prompt_load_session,
+                                  height=1, width=16)
+
+        # Add the buttons to their windows
+        self.options_canvas.itemconfigure(self.save_id, window=self.save_button)
+        self.options_canvas.itemconfigure(self.load_id, window=self.load_button)
+
     # -------------------------------- #
     #                                  #
     #          Draw Vertex             #
@@ -587,15 +714,12 @@ class Graph_GUI(Frame):
             return
 
         # Check to make sure that the selected location will be a certain distance from other ovals
-        if len(self.graph_canvas.find_overlapping(event.x-r-25, event.y-r-25,
-                                                  event.x+r+25, event.y+r+25)) != 0:
+        if self.spatial_grid.find_within(event.x, event.y, 2*r+25):
             print("Too close to another circle")
             return
 
         # Draws a green circle at the mouse's location
-        self.ovals.append(self.graph_canvas.create_oval(event.x-r, event.y-r,
-                            event.x+r, event.y+r, outline='black', width=2, fill='green',
-                            tags='vertex'))
+        oval = self.__draw_oval(event.x, event.y)
 
         # Prompt the user for a value for the Vertex
         self.__prompt_vertex_value()
@@ -605,17 +729,59 @@ class Graph_GUI(Frame):
         # NOTE: If the user closes the value entry window using the close button,
         # then we must prevent an AttributeError by choosing a default vertex value
         try:
-            self.graph.add_vertices(Vertex(self.entered_value, event.x, event.y, self.ovals[-1]))
+            self.graph.add_vertices(Vertex(self.entered_value, event.x, event.y, oval))
         except AttributeError:
-            self.graph.add_vertices(Vertex(0, event.x, event.y, self.ovals[-1]))
+            self.graph.add_vertices(Vertex(0, event.x, event.y, oval))
 
-        # Displays the associated vertex's value at the circle's center
-        self.graph_canvas.create_text(event.x, event.y-34, text=str(self.graph.vertices[-1].value),
-                                      font=('Courier', 14, 'bold'), tags='vertexvalue')
+        # Displays the associated vertex's value above the circle
+        self.__draw_value_text(oval, event.x, event.y, self.graph.vertices[-1].value)
 
         # Update the graph info text
         self.__update_graph_info()
 
+    def __draw_oval(self, x, y):
+        """Draws the green circle of a vertex centered at (x, y) and keeps track of it
+
+        Parameters
+        ----------
+        x : int
+            The x-coordinate of the center of the circle
+        y : int
+            The y-coordinate of the center of the circle
+
+        Returns
+        -------
+        int
+            The id of the new oval, which is also the id of its vertex
+        """
+        r = 25
+        self.ovals.append(self.graph_canvas.create_oval(x-r, y-r, x+r, y+r, outline='black', width=2,
+                                                        fill='green', tags='vertex'))
+        self.renderer.track(self.ovals[-1], fill='green')
+        self.spatial_grid.insert(self.ovals[-1], x, y)
+        return self.ovals[-1]
+
+    def __draw_value_text(self, oval, x, y, value):
+        """Draws the value of a vertex above its oval and keeps track of it
+
+        Parameters
+        ----------
+        oval : int
+            The id of the oval of the vertex
+        x : int
+            The x-coordinate of the center of the oval
+        y : int
+            The y-coordinate of the center of the oval
+        value : int
+            The value of the vertex
+        """
+        self.value_texts[oval] = self.graph_canvas.create_text(x, y-34, text=str(value),
+                                                               font=('Courier', 14, 'bold'), tags='vertexvalue')
+        self.renderer.track(self.value_texts[oval], text=str(value))
+
+        # The new vertex does not have any edges yet
+        self.vertex_lines[oval] = set()
+
     def __prompt_vertex_value(self):
         """"Method which creates a dialog box for the user to enter the value of a new Vertex,
             evaluates whether their entry was legal and then returns it
@@ -694,48 +860,26 @@ class Graph_GUI(Frame):
             The event triggered by left clicking a vertex (oval) in the graph canvas
         """
 
-        # All objects which overlap with where the user clicked
-        overlap = self.graph_canvas.find_overlapping(event.x - 3, event.y - 3,
-                                                     event.x + 3, event.y + 3)
-
         # The selected vertex
-        sel_vertex_id = None
+        sel_vertex_id = self.__find_vertex_at(event.x, event.y)
 
-        # Set the selected vertex to whichever of the overlapping objects is an oval
-        for i in range(0, len(overlap)):
-            if self.graph_canvas.type(overlap[i]) == 'oval':
-                sel_vertex_id = overlap[i]
-
-        # If none of the overlapping objects are somehow an oval, just return
+        # If the user did not click on a vertex, just return
         if not sel_vertex_id:
             return
 
-        x, y = self.graph.get_coordinates(sel_vertex_id)
-
-        # Get the list of all edges connected to the selected vertex
-        connected_edges = self.__get_edges(sel_vertex_id)
-
-        # Delete all of the lines from the screen
-        for i in range(len(connected_edges)):
-            self.graph_canvas.delete(self.lines[connected_edges[i]][0])
-            self.graph_canvas.delete(self.lines[connected_edges[i]][1])
-            self.graph_canvas.delete(connected_edges[i])
-
-            # Before removing the edge (and its weight text) from the line dictionary,
-            # we need to ensure that we remove the edge from the underlying graph
-            v1_id, v2_id = self.lines[connected_edges[i]][2]
-            self.graph.remove_edge(v1_id, v2_id)
-
-            # Now we can completely delete the edge's entry from the dictionary
-            del self.lines[connected_edges[i]]
+        # Delete all of the edges connected to the selected vertex
+        for line in self.__get_edges(sel_vertex_id):
+            self.__remove_line(line)
 
         # Delete the oval and its value text from the screen
-        self.graph_canvas.delete(sel_vertex_id)
-        self.graph_canvas.delete(self.graph_canvas.find_closest(x, y-34))
+        self.renderer.delete(sel_vertex_id, self.value_texts.pop(sel_vertex_id))
+        del self.vertex_lines[sel_vertex_id]
         self.ovals.remove(sel_vertex_id)
+        self.spatial_grid.remove(sel_vertex_id)
 
         # Now delete the vertex from the underlying graph
         self.graph.remove_vertex(sel_vertex_id)
+        self.__refresh_hover()
 
         # Update the graph info text
         self.__update_graph_info()
@@ -755,28 +899,19 @@ class Graph_GUI(Frame):
             The event triggered by left clicking a vertex (oval) in the graph canvas
         """
 
-        # All objects which overlap with where the user clicked
-        overlap = self.graph_canvas.find_overlapping(event.x-3, event.y-3,
-                                                     event.x+3, event.y+3)
-
         # The selected vertex
-        sel_vertex_id = None
+        sel_vertex_id = self.__find_vertex_at(event.x, event.y)
 
-        # Set the selected vertex to whichever of the overlapping objects is an oval
-        for i in range(len(overlap)):
-            if self.graph_canvas.type(overlap[i]) == 'oval':
-                sel_vertex_id = overlap[i]
-
-        # If none of the overlapping objects are somehow an oval, just return
+        # If the user did not click on a vertex, just return
         if not sel_vertex_id:
             return
 
         # Make the selected vertex stay blue
-        self.graph_canvas.itemconfigure(sel_vertex_id, fill='blue')
+        self.renderer.configure(sel_vertex_id, fill='blue')
 
         # If the same Vertex is selected twice, cancel the choice
         if self.sel_vertex_ids and self.sel_vertex_ids[0] == sel_vertex_id:
-            self.graph_canvas.itemconfigure(sel_vertex_id, fill='green')
+            self.renderer.configure(sel_vertex_id, fill='green')
             self.sel_vertex_ids = []
             return
 
@@ -810,89 +945,124 @@ class Graph_GUI(Frame):
             print("Already adjacent!")
             return
 
-        # Get the x and y coordinates of both vertices
-        x1, y1 = self.graph.get_coordinates(v1_id)
-        x2, y2 = self.graph.get_coordinates(v2_id)
-
-        # Draw the actual edge and place it below the vertices in the display list
-        new_edge = self.graph_canvas.create_line(x1, y1, x2, y2, fill='blue', tag='edge', width=3)
-        self.graph_canvas.tag_lower('edge', 'vertex')
-
-        # Check to see if the new line intersects more than its ending vertices
-        vertex_overlaps = self.__check_for_overlap(new_edge)
+        # Check to see if the new line would intersect more than its ending vertices
+        vertex_overlaps = self.__check_for_overlap(v1_id, v2_id)
         if vertex_overlaps:
             print("This edge would intersect another vertex")
-            self.graph_canvas.delete(new_edge)
             return
 
+        # Draw the actual edge and place it below the vertices in the display list
+        new_edge = self.__draw_line(v1_id, v2_id)
+
         # Prompt the user to enter a weight for their new edge
         self.__prompt_edge_weight()
         sleep(0.2)
 
-        # Find the midpoint of the new line
-        midx, midy = ((x1 + x2) / 2, (y1 + y2) / 2)
-
         # Make the two vertices adjacent in the Graph
         # NOTE: If the user closes the weight prompt window with the close button we need to catch
         # the possible AttributeError that can occur and give a default weight
         try:
-            self.graph.create_edge(v1_id, v2_id, self.entered_weight)
-            # Create text of the new edge's weight slightly off from the midpoint
-            weight_text = self.graph_canvas.create_text(midx, midy, text=str(self.entered_weight),
-                                                        font=('Courier', 14, 'bold'), tag='weight')
+            weight = self.entered_weight
         except AttributeError:
-            self.graph.create_edge(v1_id, v2_id, 0)
-            # Create text of the new edge's weight slightly off from the midpoint
-            weight_text = self.graph_canvas.create_text(midx, midy, text=str(0),
-                                                        font=('Courier', 14, 'bold'), tag='weight')
+            weight = 0
+        self.graph.create_edge(v1_id, v2_id, weight)
         print("New edge created")
 
+        # Create text of the new edge's weight at its midpoint
+        self.__draw_weight(new_edge, v1_id, v2_id, weight)
+
+        # Update the graph info text
+        self.__update_graph_info()
+        self.__refresh_hover()
+
+    def __draw_line(self, v1_id, v2_id):
+        """Draws the line of an edge between two vertices, below the vertices in the display list
+
+        Parameters
+        ----------
+        v1_id : int
+            The id of the vertex (oval) at one end of the edge
+        v2_id : int
+            The id of the vertex (oval) at the other end of the edge
+
+        Returns
+        -------
+        int
+            The id of the new line
+        """
+        x1, y1 = self.graph.get_coordinates(v1_id)
+        x2, y2 = self.graph.get_coordinates(v2_id)
+
+        line = self.graph_canvas.create_line(x1, y1, x2, y2, fill='blue', tag='edge', width=3)
+        self.graph_canvas.tag_lower('edge', 'vertex')
+        return line
+
+    def __draw_weight(self, line, v1_id, v2_id, weight):
+        """Draws the weight of an edge at the midpoint of its line and keeps track of the line
+
+        Parameters
+        ----------
+        line : int
+            The id of the line of the edge
+        v1_id : int
+            The id of the vertex (oval) at one end of the edge
+        v2_id : int
+            The id of the vertex (oval) at the other end of the edge
+        weight : int
+            The weight of the edge
+        """
+        x1, y1 = self.graph.get_coordinates(v1_id)
+        x2, y2 = self.graph.get_coordinates(v2_id)
+
+        # Find the midpoint of the line
+        midx, midy = ((x1 + x2) / 2, (y1 + y2) / 2)
+
+        weight_text = self.graph_canvas.create_text(midx, midy, text=str(weight),
+                                                    font=('Courier', 14, 'bold'), tag='weight')
+
         # We will create a small opaque rectangle at the point where the text will be
         # displayed to cover up the line
-        width = (len(self.graph_canvas.itemcget(weight_text, 'text'))*10)/2 + 3
+        width = (len(str(weight))*10)/2 + 3
         weight_box = self.graph_canvas.create_rectangle(midx-width, midy-10, midx+width, midy+9,
                                            outline='#908b8b', fill='#908b8b', tag='weightbox')
         self.graph_canvas.tag_lower('weightbox', 'weight')
 
-        # Add the new edge with its weight to the dictionary of lines and weight texts
-        self.lines.update({new_edge: [weight_box, weight_text, [v1_id, v2_id]]})
+        # The renderer needs to know the colors the line and its weight text were drawn with
+        self.renderer.track(line, fill='blue')
+        self.renderer.track(weight_text, fill='black')
 
-        # Update the graph info text
-        self.__update_graph_info()
+        # Add the new edge with its weight to the dictionary of lines and weight texts
+        self.lines.update({line: [weight_box, weight_text, [v1_id, v2_id]]})
+        self.vertex_lines[v1_id].add(line)
+        self.vertex_lines[v2_id].add(line)
+        self.edge_lines[Graph.edge_key(v1_id, v2_id)] = line
 
-    def __check_for_overlap(self, new_edge):
-        """Returns a list of the vertices which the edge will intersect, if the only
-            vertices it intersects are its endpoints, the method will return False
+    def __check_for_overlap(self, v1_id, v2_id):
+        """Returns a list of the vertices which an edge between the given vertices would
+            intersect, if the only vertices it intersects are its endpoints, the method will return False
 
         Parameters
         ----------
-        new_edge : int
-            The id of the new edge being created
+        v1_id : int
+            The id of the vertex (oval) at one end of the new edge
+        v2_id : int
+            The id of the vertex (oval) at the other end of the new edge
 
         Returns
         -------
         list/bool
-            Either a list of the ovals that the new edge will intersect or False
+            Either a list of the ovals that the new edge would intersect or False
         """
+        x1, y1 = self.graph.get_coordinates(v1_id)
+        x2, y2 = self.graph.get_coordinates(v2_id)
 
-        # The number of vertices this edge would overlap with as a straight line
-        # if it is greater than 2 the line must be curved
-        vertex_overlaps = []
-
-        for i in range(len(self.ovals)):
-            # The x and y coordinates of self.ovals[i]
-            x, y = self.graph.get_coordinates(self.ovals[i])
-
-            # Search for overlaps between the center of the circle and the line
-            overlap = self.graph_canvas.find_overlapping(x-30, y-30, x+30, y+30)
-
-            # Check to see if the new edge is in the overlap
-            for j in range(0, len(overlap)):
-                if overlap[j] == new_edge:
-                    vertex_overlaps.append(self.ovals[i])
+        # The vertices whose centers are close enough to the line for it to cross their oval: the
+        # radius of the ovals plus a few pixels for the outline and the width of the line
+        vertex_overlaps = [v_id for v_id in self.spatial_grid.find_near_segment(x1, y1, x2, y2, 25 + 5)
+                           if v_id != v1_id and v_id != v2_id]
 
-        # If the number of vertices overlapping with the line is more than 2, return True
-        if len(vertex_overlaps) > 2:
+        # If the line would cross any vertex other than its endpoints, return them
+        if vertex_overlaps:
             return vertex_overlaps
         return False
 
@@ -979,24 +1149,12 @@ class Graph_GUI(Frame):
             print('The selected vertices are not adjacent!')
             return
 
-        # Since the selected vertices are adjacent, we find the id of the edge between them
-        for k in self.lines.keys():
-            if v1_id in self.lines[k][2] and v2_id in self.lines[k][2]:
-                # Remove the edge, the weight text box and its weight text from the graph canvas
-                self.graph_canvas.delete(k)
-                self.graph_canvas.delete(self.lines[k][0])
-                self.graph_canvas.delete(self.lines[k][1])
+        # Since the selected vertices are adjacent, we remove the edge between them
+        self.__remove_line(self.__get_edge(v1_id, v2_id))
 
-                # Remove the edge from the underlying graph
-                self.graph.remove_edge(v1_id, v2_id)
-
-                # Now finally, remove the edge from the lines dictionary
-                del self.lines[k]
-
-                # Update the graph info text
-                self.__update_graph_info()
-
-                return
+        # Update the graph info text
+        self.__update_graph_info()
+        self.__refresh_hover()
 
     # -------------------------------- #
     #                                  #
@@ -1013,46 +1171,34 @@ class Graph_GUI(Frame):
             The event triggered when the user left-clicks on the graph canvas
         """
 
-        # Get all objects overlapping with the current mouse location
-        overlaps = self.graph_canvas.find_overlapping(event.x-3, event.y-3,
-                                                      event.x+3, event.y+3)
-
-        # The vertex that was clicked on
-        vertex = 0
-
-        for i in range(len(overlaps)):
-            if self.graph_canvas.type(overlaps[i]) == 'oval':
-                self.sel_vertex_ids.append(overlaps[i])
-                vertex = self.graph.find_vertex(overlaps[i])
+        # The vertex that was clicked on, if the user did not click on a vertex just return
+        vertex_id = self.__find_vertex_at(event.x, event.y)
+        if not vertex_id:
+            return
+        self.sel_vertex_ids.append(vertex_id)
+        vertex = self.graph.find_vertex(vertex_id)
 
         # A list of the ids of the vertices adjacent to the selected vertex
         adj_vertices = vertex.get_adjacent_vertices()
 
         # The value texts of all the adjacent vertices
-        adj_value_texts = []
-
-        # Get a list of the value texts of the adjacent vertices
-        for i in range(len(adj_vertices)):
-            x, y = adj_vertices[i].get_coordinates()
-            adj_value_texts.append(self.graph_canvas.find_closest(x, y-34))
+        adj_value_texts = [self.value_texts[adj.id] for adj in adj_vertices]
 
-        # The coordinates of the selected vertex
-        x, y = vertex.get_coordinates()
-
-        # Find the value text for the selected vertex
-        value_text = self.graph_canvas.find_closest(x, y-34)
+        # The value text for the selected vertex
+        value_text = self.value_texts[vertex_id]
 
         # Have the vertex give to all of its adjacent vertices
         vertex.give()
 
         # Change the value text of the vertex to reflect its new value
-        self.graph_canvas.itemconfigure(value_text, text=str(vertex.get_value()))
+        self.renderer.configure(value_text, text=str(vertex.get_value()))
 
         # Change the value text of all of the vertices adjacent to the selected vertex
         for i in range(len(adj_value_texts)):
-            self.graph_canvas.itemconfigure(adj_value_texts[i], text=str(adj_vertices[i].get_value()))
+            self.renderer.configure(adj_value_texts[i], text=str(adj_vertices[i].get_value()))
 
         self.sel_vertex_ids = []
+        self.__refresh_hover()
 
     def take(self, event):
         """The action of taking a value from each of the selected vertex's adjacent vertices
@@ -1063,46 +1209,34 @@ class Graph_GUI(Frame):
             The event triggered when the user left-clicks on the graph canvas
         """
 
-        # Get all objects overlapping with the current mouse location
-        overlaps = self.graph_canvas.find_overlapping(event.x - 3, event.y - 3,
-                                                      event.x + 3, event.y + 3)
-
-        # The vertex that was clicked on
-        sel_vertex = None
-
-        for i in range(len(overlaps)):
-            if self.graph_canvas.type(overlaps[i]) == 'oval':
-                self.sel_vertex_ids.append(overlaps[i])
-                sel_vertex = self.graph.find_vertex(overlaps[i])
+        # The vertex that was clicked on, if the user did not click on a vertex just return
+        vertex_id = self.__find_vertex_at(event.x, event.y)
+        if not vertex_id:
+            return
+        self.sel_vertex_ids.append(vertex_id)
+        sel_vertex = self.graph.find_vertex(vertex_id)
 
         # A list of the ids of the vertices adjacent to the selected vertex
         adj_vertex_ids = sel_vertex.get_adjacent_vertices()
 
         # The value texts of all the adjacent vertices
-        adj_value_texts = []
-
-        # Get a list of the value texts of the adjacent vertices
-        for i in range(len(adj_vertex_ids)):
-            x, y = adj_vertex_ids[i].get_coordinates()
-            adj_value_texts.append(self.graph_canvas.find_closest(x, y - 34))
+        adj_value_texts = [self.value_texts[adj.id] for adj in adj_vertex_ids]
 
-        # The coordinates of the selected vertex
-        x, y = sel_vertex.get_coordinates()
-
-        # Find the value text for the selected vertex
-        value_text = self.graph_canvas.find_closest(x, y - 34)
+        # The value text for the selected vertex
+        value_text = self.value_texts[vertex_id]
 
         # Have the vertex from each of its adjacent vertices
         sel_vertex.take()
 
         # Change the value text of the vertex to reflect its new value
-        self.graph_canvas.itemconfigure(value_text, text=str(sel_vertex.get_value()))
+        self.renderer.configure(value_text, text=str(sel_vertex.get_value()))
 
         # Change the value text of all of the vertices adjacent to the selected vertex
         for i in range(len(adj_value_texts)):
-            self.graph_canvas.itemconfigure(adj_value_texts[i], text=str(adj_vertex_ids[i].get_value()))
+            self.renderer.configure(adj_value_texts[i], text=str(adj_vertex_ids[i].get_value()))
 
         self.sel_vertex_ids = []
+        self.__refresh_hover()
 
     # -------------------------------- #
     #                                  #
@@ -1114,14 +1248,20 @@ class Graph_GUI(Frame):
         """Calculates the shortest path between the two selected vertices"""
         v1_id, v2_id = self.sel_vertex_ids
 
-        sp = ShortestPathCalculator()
-
         source, dest = self.graph.find_vertex(v1_id), self.graph.find_vertex(v2_id)
 
-        path = sp.dijkstra(self.graph, source, dest)
+        # A single query stops as soon as the searches from both ends meet, but users often
+        # compare several destinations from the same source, so once a source is used again its
+        # whole shortest path tree is found (or taken from the cache) and the path read off it
+        if v1_id == self.sp_source or self.sp.has_tree(self.graph, source):
+            path = self.sp.tree_path(self.graph, source, dest)
+        else:
+            path = self.sp.bidirectional_dijkstra(self.graph, source, dest)
+        self.sp_source = v1_id
 
         # Unbind the hover vertex command so the user can see the shortest path
         self.graph_canvas.unbind('<Motion>', self.hv_funcid)
+        self.__cancel_hover()
 
         # Unbind the select vertex command so the user cannot select more vertices
         self.graph_canvas.tag_unbind('vertex', '<Button-1>', self.sv_funcid)
@@ -1130,18 +1270,123 @@ class Graph_GUI(Frame):
         self.__reset_colors()
 
         # The source vertex will be cyan and the destination vertex will be yellow
-        self.graph_canvas.itemconfigure(path[0], fill='Cyan')
-        self.graph_canvas.itemconfigure(path[-1], fill='Yellow')
+        self.renderer.configure(path[0], fill='Cyan')
+        self.renderer.configure(path[-1], fill='Yellow')
 
         for i in range(len(path)):
             if 0 < i < len(path)-1:
-                self.graph_canvas.itemconfigure(path[i], fill='Purple')
+                self.renderer.configure(path[i], fill='Purple')
             if i != len(path)-1:
-                self.graph_canvas.itemconfigure(self.__get_edge(path[i], path[i+1]), fill='Purple')
+                self.renderer.configure(self.__get_edge(path[i], path[i+1]), fill='Purple')
 
         # Reactivate the shortest path button
         self.sp_button.config(state=tk.ACTIVE)
 
+    # -------------------------------- #
+    #                                  #
+    #       Saving and Loading         #
+    #                                  #
+    # -------------------------------- #
+
+    def save_session(self, path):
+        """Saves the graph to a graph file, the coordinates of the vertices keep the layout
+
+        Parameters
+        ----------
+        path : str
+            The file to save to, its extension (.json, .graphml, .bin or anything else for the
+            text format) picks the format
+        """
+        save_graph(self.graph, path)
+        print(f"Graph saved to {path}")
+
+    def load_session(self, path):
+        """Replaces the graph with the one in a graph file, drawing each vertex where it was saved
+
+        The ids of the vertices in the file are replaced by the ids of the ovals drawn for them.
+
+        Parameters
+        ----------
+        path : str
+            The file to load, in any of the formats save_session writes
+
+        Raises
+        ------
+        RuntimeError
+            If the file is not a valid graph file
+        """
+        # Read the whole file first, so that a bad file leaves the current graph alone
+        loaded = load_graph(path)
+
+        # Whatever the user was doing applies to the old graph
+        self.cancel()
+        self.__cancel_hover()
+
+        # Remove every item of the old graph from the canvas
+        for line, (weight_box, weight_text, _) in self.lines.items():
+            self.renderer.delete(line, weight_box, weight_text)
+        for oval in self.ovals:
+            self.renderer.delete(oval, self.value_texts[oval])
+
+        self.graph = Graph()
+        self.ovals = []
+        self.spatial_grid = SpatialGrid()
+        self.lines = {}
+        self.value_texts = {}
+        self.vertex_lines = {}
+        self.edge_lines = {}
+        self.sel_vertex_ids = []
+        self.hovered_vertex = None
+        self.info_renderer.configure(self.hover_info_txt, text='')
+
+        # Draw the vertices, the id of each one becomes the id of its oval
+        ovals = {vertex.id: self.__draw_oval(vertex.x, vertex.y) for vertex in loaded.vertices}
+        self.graph.add_vertices(*[Vertex(vertex.value, vertex.x, vertex.y, ovals[vertex.id])
+                                  for vertex in loaded.vertices])
+        for vertex in self.graph.vertices:
+            self.__draw_value_text(vertex.id, vertex.x, vertex.y, vertex.value)
+
+        # Then the edges, all added to the graph at once
+        edges = [(ovals[id1], ovals[id2], weight) for (id1, id2), weight in loaded.weights.items()]
+        self.graph.add_edges_from(edges)
+        for v1_id, v2_id, weight in edges:
+            self.__draw_weight(self.__draw_line(v1_id, v2_id), v1_id, v2_id, weight)
+
+        print(f"Graph loaded from {path}")
+        self.__update_graph_info()
+
+        # The buttons of the old graph may not apply to the new one
+        self.__deactivate_all()
+        self.__activate_all()
+
+    def __prompt_save_session(self):
+        """Asks the user for a file and saves the graph to it"""
+        path = filedialog.asksaveasfilename(parent=self, defaultextension='.json', filetypes=self.__file_types())
+        if not path:
+            return
+
+        try:
+            self.save_session(path)
+        except (RuntimeError, OSError) as error:
+            print(f"Could not save the graph: {error}")
+
+    def __prompt_load_session(self):
+        """Asks the user for a file and replaces the graph with the one in it"""
+        path = filedialog.askopenfilename(parent=self, filetypes=self.__file_types())
+        if not path:
+            return
+
+        try:
+            self.load_session(path)
+        except (RuntimeError, KeyError, OSError) as error:
+            print(f"Could not load the graph: {error}")
+
+    @staticmethod
+    def __file_types():
+        """Returns the kinds of graph files offered by the file dialogs"""
+        return [('JSON graph', '*.json'), ('GraphML', '*.graphml'), ('Binary graph', '*.bin'),
+                ('Text graph', '*.txt'), ('All files', '*')]
+
     # -------------------------------- #
     #                                  #
     #            Canceling             #
@@ -1191,7 +1436,7 @@ class Graph_GUI(Frame):
         # Set selected vertices back to empty and change the selected vertices back to green
         if self.sel_vertex_ids:
             for i in range(len(self.sel_vertex_ids)):
-                self.graph_canvas.itemconfigure(self.sel_vertex_ids[i], fill='green')
+                self.renderer.configure(self.sel_vertex_ids[i], fill='green')
             self.sel_vertex_ids = []
 
     def __cancel_gt(self):
@@ -1220,7 +1465,16 @@ class Graph_GUI(Frame):
     # -------------------------------- #
 
     def __update_graph_info(self):
+        """Arranges for the information about the graph to be displayed once tkinter is idle,
+            so that a whole batch of changes to the graph only updates it once
+        """
+        if not self.__graph_info_pending:
+            self.__graph_info_pending = True
+            self.after_idle(self.__display_graph_info)
+
+    def __display_graph_info(self):
         """Display information about the graph in its current state"""
+        self.__graph_info_pending = False
 
         # First we update the information with the graph's current form
         graph_info = f'Vertices: {len(self.graph.vertices)}\n' + \
@@ -1229,7 +1483,7 @@ class Graph_GUI(Frame):
                      f'Max Degree: {self.graph.find_max_degree()}'
 
         # Then we update the text widget to display this new text
-        self.info_canvas.itemconfigure(self.basic_info_txt, text=graph_info)
+        self.info_renderer.configure(self.basic_info_txt, text=graph_info)
 
     def __display_hover_info(self, v_id):
         """Displays info about the given vertex in the info canvas
@@ -1248,7 +1502,7 @@ class Graph_GUI(Frame):
                       f'Coordinates: ({x}, {y})'
 
         # Then we update the text widget to display this new text
-        self.info_canvas.itemconfigure(self.hover_info_txt, text=vertex_info)
+        self.info_renderer.configure(self.hover_info_txt, text=vertex_info)
 
     # -------------------------------- #
     #                                  #
@@ -1256,6 +1510,26 @@ class Graph_GUI(Frame):
     #                                  #
     # -------------------------------- #
 
+    def __find_vertex_at(self, x, y):
+        """Returns the id of the vertex (oval) under the given point on the graph canvas
+
+        Parameters
+        ----------
+        x : int
+            The x-coordinate of the point, for example of the mouse
+        y : int
+            The y-coordinate of the point, for example of the mouse
+
+        Returns
+        -------
+        int
+            The id of the vertex whose oval is under the point (within a few pixels of it), or None
+        """
+
+        # The radius of the ovals, their outline and the few pixels of slack around the
+        # point that the canvas search used to give
+        return self.spatial_grid.find_closest(x, y, 25 + 1 + 3)
+
     def __get_edges(self, vertex):
         """Returns a list of the edges (lines) that are connected to the supplied vertex
 
@@ -1273,13 +1547,7 @@ class Graph_GUI(Frame):
         if isinstance(vertex, Vertex):
             vertex = vertex.id
 
-        connected_edges = []
-
-        for k in self.lines.keys():
-            if vertex in self.lines[k][2]:
-                connected_edges.append(k)
-
-        return connected_edges
+        return list(self.vertex_lines.get(vertex, ()))
 
     def __get_edge(self, vertex1, vertex2):
         """Returns the edge (if there is one) between the given vertices
@@ -1302,20 +1570,41 @@ class Graph_GUI(Frame):
         if isinstance(vertex2, Vertex):
             vertex2 = vertex2.id
 
-        for k in self.lines.keys():
-            if vertex1 in self.lines[k][2] and vertex2 in self.lines[k][2]:
-                return k
+        return self.edge_lines.get(Graph.edge_key(vertex1, vertex2))
+
+    def __remove_line(self, line):
+        """Removes a line (edge) from the graph canvas, the underlying graph and all of the
+            dictionaries that keep track of it
+
+        Parameters
+        ----------
+        line : int
+            The id of the line (edge) to remove
+        """
+        weight_box, weight_text, (v1_id, v2_id) = self.lines.pop(line)
+
+        # Remove the edge, the weight text box and its weight text from the graph canvas
+        self.renderer.delete(line, weight_box, weight_text)
 
-        return None
+        # Remove the edge from the underlying graph and from the edges of its vertices
+        self.graph.remove_edge(v1_id, v2_id)
+        self.vertex_lines[v1_id].discard(line)
+        self.vertex_lines[v2_id].discard(line)
+        del self.edge_lines[Graph.edge_key(v1_id, v2_id)]
 
     def __reset_colors(self):
         """Resets the colors of all of the text, ovals and lines on the graph canvas to their defaults"""
-        for i in range(len(self.ovals)):
-            if not self.ovals[i] in self.sel_vertex_ids:
-                self.graph_canvas.itemconfigure(self.ovals[i], fill='green')
-        for k, v in self.lines.items():
-            self.graph_canvas.itemconfigure(k, fill='blue')
-            self.graph_canvas.itemconfigure(v[1], fill='black')
+
+        # Nothing is highlighted any more, so the next mouse movement over a vertex highlights it
+        self.hovered_vertex = None
+
+        # Each kind of item is reset through its tag, only the items whose colors actually
+        # changed are redrawn and the selected vertices stay blue
+        self.renderer.configure_tag('vertex', self.ovals, fill='green')
+        for vertex_id in self.sel_vertex_ids:
+            self.renderer.configure(vertex_id, fill='blue')
+        self.renderer.configure_tag('edge', self.lines.keys(), fill='blue')
+        self.renderer.configure_tag('weight', (v[1] for v in self.lines.values()), fill='black')
 
 
 
@@ -1,3 +1,12 @@
+import sys
+
+# With arguments, run them as a command of the headless command line interface (see GraphCLI),
+# otherwise start the GUI
+if len(sys.argv) > 1:
+    from GraphCLI import main
+
+    sys.exit(main())
+
 from Graph_GUI import Graph_GUI
 
 g = Graph_GUI()
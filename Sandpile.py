@@ -0,0 +1,337 @@
+import numpy as np
+
+
+class Sandpile:
+    """
+    Class which simulates the abelian sandpile model on a graph, using the give of Vertex.give
+
+    Every vertex whose value is at least its degree is unstable and topples: it gives one to each
+    of its neighbors, exactly like Vertex.give. Grains given to the sink vanish from the game (the
+    sink never topples, it just keeps count of them in its value), which is what makes every
+    avalanche come to an end. Dropping a grain onto a stable configuration may set off an
+    avalanche, whose size is the number of topples and whose duration is the number of waves,
+    where a wave topples every vertex that was unstable at the end of the previous one.
+
+    The avalanches can be run in one of two modes, which give exactly the same results:
+    'queue' only looks at the vertices toppled in the last wave and their neighbors, which is
+    fast for the small avalanches that most drops cause, and 'wave' topples every unstable vertex
+    of the graph at once with a sparse matrix-vector product, which is fast for huge avalanches.
+
+    Attributes
+    ----------
+    graph : Graph
+        The graph the sandpile lives on, it must be connected
+    csr : CSRGraph
+        The snapshot of the graph, it fixes the index of each vertex
+    sink : int
+        The index of the sink vertex
+    values : ndarray
+        The current number of grains on every vertex, by index
+    sizes : list
+        The size (number of topples) of every avalanche so far, in order
+    durations : list
+        The duration (number of waves) of every avalanche so far, in order
+
+    Methods
+    -------
+    stabilize(mode='queue')
+        Topples unstable vertices until none are left
+    drop(id, grains=1, mode='queue')
+        Drops grains onto a vertex and lets the avalanche run
+    drop_random(count, seed=None, mode='queue')
+        Drops grains one at a time onto randomly chosen vertices
+    is_stable()
+        Returns True if no vertex (other than the sink) is unstable
+    write_back()
+        Copies the values back into the Vertex objects of the graph
+    reload()
+        Copies the values of the Vertex objects of the graph into the values array
+    """
+
+    def __init__(self, graph, sink=None):
+        """Sets up a sandpile on the graph
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph to simulate the sandpile on
+        sink : int, optional
+            The id number of the sink vertex, default is the first vertex
+
+        Raises
+        ------
+        RuntimeError
+            If the graph is empty or not connected, or the sink is not in the graph
+        """
+        from scipy.sparse.csgraph import breadth_first_order
+
+        # The graph and the snapshot of it that fixes the index of each vertex
+        self.graph = graph
+        self.csr = graph.to_csr()
+
+        # The version of the graph when the snapshot was taken, so we can detect later changes
+        self.__version = graph.version
+
+        n = self.csr.num_vertices()
+        if n == 0:
+            raise RuntimeError('A sandpile needs at least one vertex')
+
+        self.sink = 0 if sink is None else self.csr.index_of(sink)
+        if self.sink is None:
+            raise RuntimeError(f'The vertex given: {sink} is not in the graph')
+
+        # The Laplacian of the graph, L = D - A, so that toppling the vertices in f is values -= L @ f
+        self.laplacian = self.csr.laplacian()
+
+        # Grains that can never reach the sink would topple forever
+        if len(breadth_first_order(self.laplacian, self.sink, return_predecessors=False)) != n:
+            raise RuntimeError('A sandpile can only be simulated on a connected graph')
+
+        # The number of grains at which each vertex topples, the sink never does
+        self.__thresholds = self.csr.degrees().astype(np.int64)
+        self.__thresholds[self.sink] = np.iinfo(np.int64).max
+
+        # Plain list copies of the snapshot, since indexing lists one element at a time is much
+        # faster than indexing arrays
+        self.__indptr = self.csr.indptr.tolist()
+        self.__indices = self.csr.indices.tolist()
+        self.__threshold_list = self.__thresholds.tolist()
+
+        self.values = np.zeros(n, dtype=np.int64)
+        self.sizes = []
+        self.durations = []
+        self.reload()
+
+    def stabilize(self, mode='queue'):
+        """Topples unstable vertices, wave by wave, until the whole sandpile is stable
+
+        Parameters
+        ----------
+        mode : str, optional
+            Either 'queue' or 'wave', see the class description, default is 'queue'
+
+        Returns
+        -------
+        tuple
+            The size and the duration of the avalanche, which is also recorded
+        """
+        unstable = np.flatnonzero(self.values >= self.__thresholds).tolist()
+        return self.__run([unstable], mode)[0]
+
+    def drop(self, id, grains=1, mode='queue'):
+        """Drops grains onto a vertex all at once and lets the resulting avalanche run
+
+        Parameters
+        ----------
+        id : int
+            The id number of the vertex to drop the grains onto
+        grains : int, optional
+            The number of grains to drop, default is 1
+        mode : str, optional
+            Either 'queue' or 'wave', see the class description, default is 'queue'
+
+        Returns
+        -------
+        tuple
+            The size and the duration of the avalanche, which is also recorded
+
+        Raises
+        ------
+        KeyError
+            If there is no vertex with the given id
+        """
+        i = self.csr.index_of(id)
+        if i is None:
+            raise KeyError(f'There is no vertex with the id: {id}')
+
+        self.values[i] += grains
+        return self.__run([[i]], mode)[0]
+
+    def drop_random(self, count, seed=None, mode='queue'):
+        """Drops grains one at a time onto vertices chosen uniformly at random (never the sink)
+            and lets each avalanche run before the next grain is dropped
+
+        Parameters
+        ----------
+        count : int
+            The number of grains to drop
+        seed : int, optional
+            The seed of the random number generator, so that runs can be repeated
+        mode : str, optional
+            Either 'queue' or 'wave', see the class description, default is 'queue'
+
+        Returns
+        -------
+        tuple
+            An array of the size and an array of the duration of each avalanche, which are
+            also recorded
+        """
+        n = self.csr.num_vertices()
+        if n == 1:
+            # There is nowhere to drop a grain other than the sink
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Pick every drop up front, skipping over the sink
+        sites = np.random.default_rng(seed).integers(0, n - 1, count)
+        sites[sites >= self.sink] += 1
+
+        results = self.__run(([i] for i in sites.tolist()), mode, drop=True)
+        sizes, durations = zip(*results) if results else ((), ())
+        return np.array(sizes, dtype=np.int64), np.array(durations, dtype=np.int64)
+
+    def is_stable(self):
+        """Returns True if no vertex other than the sink has at least as many grains as its degree
+
+        Returns
+        -------
+        bool
+            True if the sandpile is stable
+        """
+        return bool((self.values < self.__thresholds).all())
+
+    def write_back(self):
+        """Copies the current values into the Vertex objects of the graph
+
+        Raises
+        ------
+        RuntimeError
+            If the vertices or edges of the graph have changed since this sandpile was set up
+        """
+        self.__check_version()
+        for vertex, value in zip(self.graph.vertices, self.values.tolist()):
+            vertex.value = value
+
+    def reload(self):
+        """Copies the values of the Vertex objects of the graph into the values array
+
+        Raises
+        ------
+        RuntimeError
+            If the vertices or edges of the graph have changed since this sandpile was set up
+        """
+        self.__check_version()
+        self.values[:] = [vertex.value for vertex in self.graph.vertices]
+
+    def __run(self, starts, mode, drop=False):
+        """Runs one avalanche per entry of starts and records the size and duration of each
+
+        Parameters
+        ----------
+        starts : iterable
+            For each avalanche, a list of the indices of the vertices that may have become unstable
+        mode : str
+            Either 'queue' or 'wave'
+        drop : bool, optional
+            If True, one grain is dropped onto the (only) vertex in each entry of starts first
+
+        Returns
+        -------
+        list
+            A (size, duration) pair for each avalanche
+        """
+        if mode == 'queue':
+            values = self.values.tolist()
+            avalanche = self.__queue_avalanche
+        elif mode == 'wave':
+            values = self.values
+            avalanche = self.__wave_avalanche
+        else:
+            raise ValueError(f'Unknown mode: {mode}, expected \'queue\' or \'wave\'')
+
+        thresholds = self.__threshold_list
+        results = []
+        for start in starts:
+            if drop:
+                values[start[0]] += 1
+
+                # Most drops topple nothing, so we skip the avalanche altogether for them
+                if values[start[0]] < thresholds[start[0]]:
+                    results.append((0, 0))
+                    continue
+
+            results.append(avalanche(values, start))
+
+        if mode == 'queue':
+            self.values[:] = values
+
+        for size, duration in results:
+            self.sizes.append(size)
+            self.durations.append(duration)
+        return results
+
+    def __queue_avalanche(self, values, start):
+        """Runs an avalanche on a list of values, only revisiting the vertices that may be unstable
+
+        Parameters
+        ----------
+        values : list
+            The number of grains on every vertex, changed in place
+        start : list
+            The indices of the vertices that may be unstable
+
+        Returns
+        -------
+        tuple
+            The size and duration of the avalanche
+        """
+        indptr = self.__indptr
+        indices = self.__indices
+        thresholds = self.__threshold_list
+
+        size = 0
+        duration = 0
+        wave = [v for v in start if values[v] >= thresholds[v]]
+        while wave:
+            duration += 1
+            size += len(wave)
+
+            # Every vertex of the wave topples once. Values only go up apart from the topple
+            # itself, so a vertex belongs in the next wave exactly when it is still unstable
+            # right after toppling, or when a neighbor's grain takes it from one below its
+            # threshold to its threshold. Each of those happens at most once per wave, so
+            # nothing is queued twice
+            next_wave = []
+            for v in wave:
+                first, last = indptr[v], indptr[v + 1]
+                values[v] -= last - first
+                if values[v] >= thresholds[v]:
+                    next_wave.append(v)
+                for u in indices[first:last]:
+                    values[u] += 1
+                    if values[u] == thresholds[u]:
+                        next_wave.append(u)
+            wave = next_wave
+
+        return size, duration
+
+    def __wave_avalanche(self, values, start):
+        """Runs an avalanche on an array of values, toppling every unstable vertex at once
+
+        Parameters
+        ----------
+        values : ndarray
+            The number of grains on every vertex, changed in place
+        start : list
+            Not needed, since every vertex is checked in each wave
+
+        Returns
+        -------
+        tuple
+            The size and duration of the avalanche
+        """
+        size = 0
+        duration = 0
+        while True:
+            unstable = (values >= self.__thresholds).astype(np.int64)
+            toppled = int(unstable.sum())
+            if toppled == 0:
+                return size, duration
+
+            values -= self.laplacian @ unstable
+            size += toppled
+            duration += 1
+
+    def __check_version(self):
+        """Raises a RuntimeError if the graph has changed since the sandpile was set up"""
+        if self.graph.version != self.__version:
+            raise RuntimeError('The graph has changed since the sandpile was set up')
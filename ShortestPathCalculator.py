@@ -1,6 +1,10 @@
 from Graph import Graph
 from Vertex import Vertex
-import numpy as np
+import heapq
+import math
+from collections import OrderedDict
+from functools import partial
+import weakref
 
 
 class ShortestPathCalculator:
@@ -11,40 +15,83 @@ class ShortestPathCalculator:
     ----------
     visited : set
         The set of currently visited vertices in a search
-    unvisited : set
-        The set of currently unvisited vertices in a search
+    queue : list
+        A binary heap of (distance, vertex id) pairs still waiting to be visited in a search,
+        a vertex may appear more than once in which case only its smallest entry is used
     prev : dict
         A mapping of each vertex to the previous vertex in a search
     distances : dict
         (Dijkstra) A mapping of each vertex to the distance from it to the source node in a search
+    expanded : int
+        The number of vertices that were expanded (visited) during the last search
+    cache_size : int
+        The number of shortest path trees kept, the least recently used one is dropped first
+    cache_hits : int
+        The number of shortest path trees that were found in the cache
+    cache_misses : int
+        The number of shortest path trees that had to be calculated
 
     Methods
     -------
     dijkstra(graph, source, dest)
         Find the shortest path between source and dest in the given graph using Dijkstra's algorithm
+    astar(graph, source, dest, heuristic=None, scale=1)
+        Find the shortest path between source and dest in the given graph using A* search
+    bidirectional_dijkstra(graph, source, dest)
+        Find the shortest path between source and dest by searching from both of them at once
+    shortest_path_tree(graph, source)
+        Find the distances and previous vertices of every vertex reachable from source, cached per graph version
+    tree_path(graph, source, dest)
+        Find the shortest path between source and dest using the (cached) shortest path tree of source
+    all_pairs(graph, method='auto')
+        Find the distances and previous vertices of the shortest paths between every pair of vertices
     """
 
-    def __init__(self):
+    # all_pairs uses Floyd-Warshall for graphs with at most FLOYD_WARSHALL_SMALL vertices (which
+    # it finishes in less time than importing SciPy takes), and for graphs with at most
+    # FLOYD_WARSHALL_MAX_VERTICES vertices that have at least FLOYD_WARSHALL_MIN_DENSITY of the
+    # possible edges. Its n^3 work does not depend on the edges, while a Dijkstra search from
+    # every vertex gets slower the more edges there are
+    FLOYD_WARSHALL_SMALL = 64
+    FLOYD_WARSHALL_MAX_VERTICES = 400
+    FLOYD_WARSHALL_MIN_DENSITY = 0.5
+
+    def __init__(self, cache_size=32):
         # Algorithm agnostic attributes
         # The set of currently visited vertices
         self.visited = set()
 
-        # The set of unvisited vertices (reset each time we do a new calculation)
-        self.unvisited = set()
+        # The priority queue of vertices waiting to be visited (reset each time we do a new calculation)
+        self.queue = []
 
         # A map of each vertex in the graph to the previous vertex in the search
         self.prev = {}
 
+        # The number of vertices expanded during the last search
+        self.expanded = 0
+
         # Dijkstra specific attributes
         # A map of each vertex to the distance from it to the source vertex
         self.distances = {}
 
+        # Shortest path tree specific attributes
+        # The most recently used trees, mapping (id of the graph, version of the graph, id of
+        # the source) to (weak reference to the graph, distances, prev), the least recently used
+        # tree comes first. The reference is checked so that a new graph which happens to reuse
+        # the id of an old one can never be given its trees, and since it is weak the cache never
+        # keeps a graph alive: the trees of a graph are dropped as soon as the graph is freed
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.__trees = OrderedDict()
+
     def __reset(self):
         """Resets all of the attributes to empty"""
         # Reset the algorithm agnostic attributes
         self.visited = set()
-        self.unvisited = set()
+        self.queue = []
         self.prev = {}
+        self.expanded = 0
 
         # Reset the Dijkstra specific attributes
         self.distances = {}
@@ -80,35 +127,74 @@ class ShortestPathCalculator:
         # Reset all of the sets and maps to empty
         self.__reset()
 
-        # Set of all unvisited nodes
-        self.unvisited = set(v.id for v in graph.vertices)
+        # The distances of each node from the source node, any vertex without an entry is
+        # still at a distance of infinity, the distance from the source node to itself is zero
+        self.distances[source.id] = 0
+        self.prev[source.id] = None
+        self.queue.append((0, source.id))
 
-        # The distances of each node from the source node, all are initialized the infinity
-        # except the distance from the source node to itself, which is zero
-        for v in graph.vertices:
-            self.distances.update({v.id: np.inf})
-            self.prev.update({v.id: None})
-        self.distances.update({source.id: 0})
-
-        while len(self.unvisited) != 0:
+        while self.queue:
             # The current vertex: the unvisited vertex with the shortest distance
-            current = self.__min_distance()
-            current_v = graph.find_vertex(current)
+            dist, current = heapq.heappop(self.queue)
+
+            # Skip stale entries for vertices we have already reached by a shorter path
+            if current in self.visited:
+                continue
 
-            # Remove the current vertex from the set of unvisited vertices
+            # Mark the current vertex as visited
             self.visited.add(current)
-            self.unvisited.remove(current)
+            self.expanded += 1
 
             if current == dest.id:
                 break
 
-            # Update all the distances from the source to the unvisited neighbors of current_v
-            self.__update_distances(current_v)
+            # Update all the distances from the source to the unvisited neighbors of the current vertex
+            self.__update_distances(graph.find_vertex(current), dist)
 
         # Lastly, we find the exact path of vertices to follow and return it
+        return self.__build_path(source.id, dest.id)
+
+    def __update_distances(self, current, dist):
+        """Updates the distances to all unvisited vertices adjacent to the current one
+
+        Parameters
+        ----------
+        current : Vertex
+            The vertex currently being searched from
+        dist : int
+            The distance from the source vertex to the current vertex
+        """
+
+        # Go through all of the unvisited adjacent vertices and update their distances
+        for adj_vertex, weight in current.adjacent.items():
+            adj = adj_vertex.id
+            if adj in self.visited:
+                continue
+
+            new_dist = dist + weight
+            if new_dist < self.distances.get(adj, math.inf):
+                self.distances[adj] = new_dist
+                self.prev[adj] = current.id
+                heapq.heappush(self.queue, (new_dist, adj))
+
+    def __build_path(self, source, dest):
+        """Follows the previous vertices back from dest to construct the path found by a search
+
+        Parameters
+        ----------
+        source : int
+            The id number of the starting vertex of the search
+        dest : int
+            The id number of the destination vertex of the search
+
+        Returns
+        -------
+        list
+            A list of the ids of the vertices from source to dest, empty if dest was not reached
+        """
         path = []
-        current = dest.id
-        if self.prev[current] is not None or current == source.id:
+        current = dest
+        if self.prev.get(current) is not None or current == source:
             while current is not None:
                 path.append(current)
                 current = self.prev[current]
@@ -116,47 +202,407 @@ class ShortestPathCalculator:
         path.reverse()
         return path
 
-    def __min_distance(self):
-        """Returns the unvisited vertex with the smallest current distance from the source vertex
+    # -------------------------------- #
+    #                                  #
+    #            A* Search             #
+    #                                  #
+    # -------------------------------- #
+
+    def astar(self, graph, source, dest, heuristic=None, scale=1):
+        """Uses A* search to calculate the shortest path from source to dest
+
+        By default the search is guided by the straight line distance between the screen
+        coordinates of each vertex and dest, multiplied by scale. As long as that estimate
+        never exceeds the true remaining distance (for example when every edge weight is at
+        least the distance between its endpoints and scale <= 1) the path found is exact.
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph that we will be using in the search
+        source : Vertex
+            The starting vertex in our search
+        dest : Vertex
+            The destination vertex in our search
+        heuristic : function, optional
+            A function taking a Vertex and the destination Vertex and returning an estimate of
+            the distance between them, default is the scaled Euclidean distance
+        scale : float, optional
+            The factor the Euclidean distance is multiplied by when no heuristic is given
 
         Returns
         -------
-        int
-            The id number of the vertex with the current smallest distance from the start
+        list
+            A list of the vertices to traverse to follow the shortest path from source to dest
         """
 
-        # Set the initial minimum distance to infinity
-        min_dist = np.inf
+        # If either the source or the destination vertices are not in the graph, just return
+        if not graph.contains_vertex(source) or not graph.contains_vertex(dest):
+            return
 
-        # Set the initial closest unvisited vertex to None
-        closest = None
+        if heuristic is None:
+            def heuristic(vertex, target):
+                return scale * math.hypot(vertex.x - target.x, vertex.y - target.y)
 
-        for u in self.unvisited:
-            if self.distances[u] < min_dist:
-                min_dist = self.distances[u]
-                closest = u
+        # Reset all of the sets and maps to empty
+        self.__reset()
 
-        return closest
+        # The distances from the source are kept exactly as in Dijkstra, but the queue is
+        # ordered by the distance so far plus the estimated distance left to dest
+        self.distances[source.id] = 0
+        self.prev[source.id] = None
+        self.queue.append((heuristic(source, dest), source.id))
 
-    def __update_distances(self, current):
-        """Updates the distances to all unvisited vertices adjacent to the current one
+        while self.queue:
+            current = heapq.heappop(self.queue)[1]
+
+            # Skip stale entries for vertices we have already reached by a shorter path
+            if current in self.visited:
+                continue
+
+            self.visited.add(current)
+            self.expanded += 1
+
+            if current == dest.id:
+                break
+
+            dist = self.distances[current]
+            for adj_vertex, weight in graph.find_vertex(current).adjacent.items():
+                adj = adj_vertex.id
+                if adj in self.visited:
+                    continue
+
+                new_dist = dist + weight
+                if new_dist < self.distances.get(adj, math.inf):
+                    self.distances[adj] = new_dist
+                    self.prev[adj] = current
+                    heapq.heappush(self.queue, (new_dist + heuristic(adj_vertex, dest), adj))
+
+        return self.__build_path(source.id, dest.id)
+
+    # -------------------------------- #
+    #                                  #
+    #     Bidirectional Dijkstra       #
+    #                                  #
+    # -------------------------------- #
+
+    def bidirectional_dijkstra(self, graph, source, dest):
+        """Calculates the shortest path from source to dest by running Dijkstra's algorithm
+            from both ends at once until the two searches meet
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph that we will be using in the search
+        source : Vertex
+            The starting vertex in our search
+        dest : Vertex
+            The destination vertex in our search
+
+        Returns
+        -------
+        list
+            A list of the vertices to traverse to follow the shortest path from source to dest
+        """
+
+        # If either the source or the destination vertices are not in the graph, just return
+        if not graph.contains_vertex(source) or not graph.contains_vertex(dest):
+            return
+
+        # Reset all of the sets and maps to empty
+        self.__reset()
+
+        # The forward search uses the usual attributes, the backward search (from dest)
+        # keeps its own distances, previous vertices, visited set and queue
+        self.distances[source.id] = 0
+        self.prev[source.id] = None
+        self.queue.append((0, source.id))
+        back_distances = {dest.id: 0}
+        back_prev = {dest.id: None}
+        back_visited = set()
+        back_queue = [(0, dest.id)]
+
+        # The length of the shortest path found so far and the vertex where its two halves meet
+        best = 0 if source.id == dest.id else math.inf
+        meeting = source.id if source.id == dest.id else None
+
+        while self.queue and back_queue:
+            # Once the closest unvisited vertices of both searches together are no closer
+            # than the best path found so far, no shorter path can exist
+            if self.queue[0][0] + back_queue[0][0] >= best:
+                break
+
+            # Advance whichever search has the closer frontier
+            if self.queue[0][0] <= back_queue[0][0]:
+                distances, prev, visited, queue = self.distances, self.prev, self.visited, self.queue
+                other_distances = back_distances
+            else:
+                distances, prev, visited, queue = back_distances, back_prev, back_visited, back_queue
+                other_distances = self.distances
+
+            dist, current = heapq.heappop(queue)
+            if current in visited:
+                continue
+            visited.add(current)
+            self.expanded += 1
+
+            for adj_vertex, weight in graph.find_vertex(current).adjacent.items():
+                adj = adj_vertex.id
+                if adj in visited:
+                    continue
+
+                new_dist = dist + weight
+                if new_dist < distances.get(adj, math.inf):
+                    distances[adj] = new_dist
+                    prev[adj] = current
+                    heapq.heappush(queue, (new_dist, adj))
+
+                # If the other search has already reached this neighbor, we have a path
+                if adj in other_distances and new_dist + other_distances[adj] < best:
+                    best = new_dist + other_distances[adj]
+                    meeting = adj
+
+        self.visited |= back_visited
+        if meeting is None:
+            return []
+
+        # Join the two halves of the path by linking the backward half onto the forward one
+        current = meeting
+        while back_prev[current] is not None:
+            self.prev[back_prev[current]] = current
+            current = back_prev[current]
+        self.distances[dest.id] = best
+
+        return self.__build_path(source.id, dest.id)
+
+    # -------------------------------- #
+    #                                  #
+    #       Shortest Path Trees        #
+    #                                  #
+    # -------------------------------- #
+
+    def shortest_path_tree(self, graph, source):
+        """Uses Dijkstra's algorithm (without a destination) to calculate the shortest distance from
+            source to every vertex it can reach, and the previous vertex on each of those paths
+
+        The trees are cached by the version of the graph, so asking again for the tree of the
+        same source is just a dictionary lookup until the vertices or edges of the graph change.
+        At most cache_size trees are kept, and a graph is never kept alive by its cached trees.
+        The dictionaries returned are shared with the cache and must not be changed.
 
         Parameters
         ----------
-        current : int
-            The id number of the vertex currently being searched from
+        graph : Graph
+            The graph that we will be using in the search
+        source : Vertex
+            The starting vertex in our search
+
+        Returns
+        -------
+        tuple
+            A dictionary mapping the id of every reachable vertex to its distance from source, and
+            a dictionary mapping it to the id of the previous vertex on its path (None for source)
         """
 
-        # If there are no unvisited vertices left, then we just return
-        if len(self.unvisited) == 0:
+        # If the source vertex is not in the graph, just return
+        if not graph.contains_vertex(source):
             return
 
-        # Otherwise, go through all of the unvisited adjacent vertices and update their distances
-        for adj in current.weights.keys():
-            if adj in self.unvisited:
-                if self.distances[current.id] + current.weights[adj] < self.distances[adj]:
-                    self.distances[adj] = self.distances[current.id] + current.weights[adj]
-                    self.prev.update({adj: current.id})
+        key = (id(graph), graph.version, source.id)
+        entry = self.__trees.get(key)
+        if entry is not None and entry[0]() is graph:
+            self.__trees.move_to_end(key)
+            self.cache_hits += 1
+            self.expanded = 0
+            return entry[1], entry[2]
+
+        self.cache_misses += 1
+
+        # Run Dijkstra's algorithm until the queue runs out instead of stopping at a destination
+        self.__reset()
+        self.distances[source.id] = 0
+        self.prev[source.id] = None
+        self.queue.append((0, source.id))
+
+        while self.queue:
+            dist, current = heapq.heappop(self.queue)
+            if current in self.visited:
+                continue
+
+            self.visited.add(current)
+            self.expanded += 1
+            self.__update_distances(graph.find_vertex(current), dist)
+
+        # Trees of older versions of any graph can never be asked for again, so they are dropped
+        # straight away rather than waiting to become the least recently used
+        for old_key in [k for k in self.__trees if k[0] == key[0] and k[1] != key[1]]:
+            del self.__trees[old_key]
+
+        self.__trees[key] = (weakref.ref(graph, partial(self.__drop_graph, self.__trees, key[0])),
+                             self.distances, self.prev)
+        while len(self.__trees) > self.cache_size:
+            self.__trees.popitem(last=False)
+
+        return self.distances, self.prev
+
+    def has_tree(self, graph, source):
+        """Returns whether the shortest path tree of source in the current version of graph is cached
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph that we will be using in the search
+        source : Vertex
+            The starting vertex in our search
+
+        Returns
+        -------
+        bool
+            True if shortest_path_tree would be a cache hit, False otherwise
+        """
+        entry = self.__trees.get((id(graph), graph.version, source.id))
+        return entry is not None and entry[0]() is graph
+
+    @staticmethod
+    def __drop_graph(trees, graph_id, _):
+        """Drops every cached tree of the graph with the given id, called once that graph is freed"""
+        for key in [k for k in trees if k[0] == graph_id]:
+            del trees[key]
+
+    def tree_path(self, graph, source, dest):
+        """Finds the shortest path from source to dest by following the shortest path tree of source,
+            so that paths from the same source to several destinations only search the graph once
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph that we will be using in the search
+        source : Vertex
+            The starting vertex in our search
+        dest : Vertex
+            The destination vertex in our search
+
+        Returns
+        -------
+        list
+            A list of the vertices to traverse to follow the shortest path from source to dest
+        """
+
+        # If either the source or the destination vertices are not in the graph, just return
+        if not graph.contains_vertex(source) or not graph.contains_vertex(dest):
+            return
+
+        # The distances and previous vertices of the tree are used as those of this search
+        self.distances, self.prev = self.shortest_path_tree(graph, source)
+
+        return self.__build_path(source.id, dest.id)
+
+    # -------------------------------- #
+    #                                  #
+    #      All Pairs Shortest Paths    #
+    #                                  #
+    # -------------------------------- #
+
+    def all_pairs(self, graph, method='auto'):
+        """Calculates the length of the shortest path between every pair of vertices of the graph,
+            and the previous vertex on each of those paths
+
+        The rows and columns of the matrices are the indices of the vertices in graph.to_csr()
+        (the order of graph.vertices), so the shortest path from the vertex with index i to the
+        one with index j ends with the edge from predecessors[i, j] to j.
+
+        Parameters
+        ----------
+        graph : Graph
+            The graph that we will be using in the search
+        method : str, optional
+            'floyd-warshall' for the Floyd-Warshall algorithm, 'dijkstra' for a search from every
+            vertex, or 'auto' (the default) to pick Floyd-Warshall for small or dense graphs and
+            Dijkstra for the others
+
+        Returns
+        -------
+        tuple
+            A float32 matrix of the distances (inf where there is no path), and an int32 matrix
+            of the index of the previous vertex on each path (-1 where there is no path and on
+            the diagonal)
+
+        Raises
+        ------
+        RuntimeError
+            If an edge has a negative weight, since every undirected negative edge makes a cycle
+            that shortens any path through it without end
+        ValueError
+            If the method is not one of the above
+        """
+        import numpy as np
+
+        csr = graph.to_csr()
+        n = csr.num_vertices()
+        if (csr.weights < 0).any():
+            raise RuntimeError('Shortest paths can not be calculated with negative edge weights')
+
+        if method == 'auto':
+            dense = (n <= self.FLOYD_WARSHALL_MAX_VERTICES
+                     and csr.num_edges() >= self.FLOYD_WARSHALL_MIN_DENSITY * n * (n - 1) / 2)
+            method = 'floyd-warshall' if n <= self.FLOYD_WARSHALL_SMALL or dense else 'dijkstra'
+
+        if method == 'floyd-warshall':
+            distances, predecessors = self.__floyd_warshall(csr)
+        elif method == 'dijkstra':
+            from scipy.sparse import csr_matrix
+            from scipy.sparse.csgraph import dijkstra
+
+            # SciPy's Dijkstra searches from every vertex with a heap, in compiled code, and
+            # (unlike for dense matrices) counts the explicit zeros of a sparse matrix as edges,
+            # so edges of weight 0 are kept
+            adjacency = csr_matrix((csr.weights, csr.indices, csr.indptr), shape=(n, n))
+            distances, predecessors = dijkstra(adjacency, directed=False, return_predecessors=True)
+            predecessors[predecessors < 0] = -1
+        else:
+            raise ValueError(f'Unknown method: {method}, expected \'auto\', \'floyd-warshall\' or \'dijkstra\'')
+
+        return distances.astype(np.float32), predecessors.astype(np.int32)
+
+    @staticmethod
+    def __floyd_warshall(csr):
+        """Runs the Floyd-Warshall algorithm on a CSR snapshot, relaxing a whole matrix at a time
+
+        Parameters
+        ----------
+        csr : CSRGraph
+            The snapshot of the graph
+
+        Returns
+        -------
+        tuple
+            The float64 matrix of distances and the int32 matrix of previous vertices
+        """
+        import numpy as np
+
+        n = csr.num_vertices()
+        rows = np.repeat(np.arange(n), np.diff(csr.indptr))
+
+        distances = np.full((n, n), np.inf)
+        distances[rows, csr.indices] = csr.weights
+        np.fill_diagonal(distances, 0)
+
+        # The previous vertex of a single edge path is where it starts
+        predecessors = np.full((n, n), -1, dtype=np.int32)
+        predecessors[rows, csr.indices] = rows
+
+        through = np.empty_like(distances)
+        shorter = np.empty((n, n), dtype=bool)
+        for k in range(n):
+            # Going from i to j through k is the column of distances to k plus the row of
+            # distances from k, broadcast into a matrix. Where that is shorter, the path to j
+            # now ends the way the path from k to j does
+            np.add(distances[:, k, None], distances[k], out=through)
+            np.less(through, distances, out=shorter)
+            np.copyto(distances, through, where=shorter)
+            np.copyto(predecessors, np.broadcast_to(predecessors[k], (n, n)), where=shorter)
+
+        return distances, predecessors
 
 
 
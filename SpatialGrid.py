@@ -0,0 +1,216 @@
+import math
+
+
+class SpatialGrid:
+    """
+    Class which indexes points on the screen in a uniform grid so that the points near a
+    location can be found without looking at all of them
+
+    The plane is split into square cells and every point is kept in the cell containing it, so
+    finding the points within some distance of a location only has to look in the few cells
+    that distance reaches.
+
+    Attributes
+    ----------
+    cell_size : float
+        The width and height of each cell of the grid
+    cells : dict
+        A dictionary mapping the (column, row) of every non-empty cell to a dictionary of the
+        ids of the points in it mapped to their coordinates
+    points : dict
+        A dictionary mapping the id of every point to its coordinates
+
+    Methods
+    -------
+    insert(id, x, y)
+        Adds a point to the grid, or moves it if it is already there
+    remove(id)
+        Removes a point from the grid
+    find_within(x, y, distance)
+        Returns the ids of all of the points within distance of (x, y)
+    find_closest(x, y, distance)
+        Returns the id of the point closest to (x, y), if it is within distance
+    find_near_segment(x1, y1, x2, y2, distance)
+        Returns the ids of all of the points within distance of the line segment from (x1, y1) to (x2, y2)
+    """
+
+    def __init__(self, cell_size=75):
+        # The width and height of the cells, queries look in every cell they reach, so a
+        # cell size close to the usual query distance keeps them to a 3x3 block of cells
+        self.cell_size = cell_size
+
+        # The points in every cell that has any, and the coordinates of every point
+        self.cells = {}
+        self.points = {}
+
+    def __len__(self):
+        """Returns the number of points in the grid"""
+        return len(self.points)
+
+    def __contains__(self, id):
+        """Returns True if there is a point with the given id in the grid"""
+        return id in self.points
+
+    def insert(self, id, x, y):
+        """Adds a point to the grid, if there already is a point with the same id it is moved
+
+        Parameters
+        ----------
+        id : int
+            The id of the point, for example the id of a vertex
+        x : float
+            The x-coordinate of the point
+        y : float
+            The y-coordinate of the point
+        """
+        if id in self.points:
+            self.remove(id)
+
+        self.points[id] = (x, y)
+        self.cells.setdefault(self.__cell(x, y), {})[id] = (x, y)
+
+    def remove(self, id):
+        """Removes a point from the grid
+
+        Parameters
+        ----------
+        id : int
+            The id of the point to remove
+
+        Returns
+        -------
+        bool
+            True if the point was removed and False if there was no point with that id
+        """
+        if id not in self.points:
+            return False
+
+        x, y = self.points.pop(id)
+        cell = self.__cell(x, y)
+        del self.cells[cell][id]
+
+        # Do not keep empty cells around, so that the dictionary only grows with the points
+        if not self.cells[cell]:
+            del self.cells[cell]
+        return True
+
+    def find_within(self, x, y, distance):
+        """Returns the ids of all of the points no further than distance from (x, y)
+
+        Parameters
+        ----------
+        x : float
+            The x-coordinate of the location
+        y : float
+            The y-coordinate of the location
+        distance : float
+            The largest distance from the location that a point may be at
+
+        Returns
+        -------
+        list
+            The ids of the points within distance of the location, in no particular order
+        """
+        found = []
+        for cell in self.__cells_near(x, y, distance):
+            for id, (px, py) in cell.items():
+                if (px - x) ** 2 + (py - y) ** 2 <= distance ** 2:
+                    found.append(id)
+        return found
+
+    def find_closest(self, x, y, distance):
+        """Returns the id of the point closest to (x, y), as long as it is within distance
+
+        Parameters
+        ----------
+        x : float
+            The x-coordinate of the location
+        y : float
+            The y-coordinate of the location
+        distance : float
+            The largest distance from the location that the point may be at
+
+        Returns
+        -------
+        int
+            The id of the closest point, or None if no point is within distance
+        """
+        closest = None
+        closest_dist = distance ** 2
+        for cell in self.__cells_near(x, y, distance):
+            for id, (px, py) in cell.items():
+                dist = (px - x) ** 2 + (py - y) ** 2
+                if dist <= closest_dist:
+                    closest = id
+                    closest_dist = dist
+        return closest
+
+    def find_near_segment(self, x1, y1, x2, y2, distance):
+        """Returns the ids of all of the points no further than distance from a line segment,
+            for example the centers of the circles that a line would pass through
+
+        Only the cells that the segment (grown by distance) passes through are looked at, and
+        the distance from each point in them to the segment is calculated exactly.
+
+        Parameters
+        ----------
+        x1 : float
+            The x-coordinate of one end of the segment
+        y1 : float
+            The y-coordinate of one end of the segment
+        x2 : float
+            The x-coordinate of the other end of the segment
+        y2 : float
+            The y-coordinate of the other end of the segment
+        distance : float
+            The largest distance from the segment that a point may be at
+
+        Returns
+        -------
+        list
+            The ids of the points within distance of the segment, in no particular order
+        """
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx ** 2 + dy ** 2
+
+        left = math.floor((min(x1, x2) - distance) / self.cell_size)
+        right = math.floor((max(x1, x2) + distance) / self.cell_size)
+
+        found = []
+        for column in range(left, right + 1):
+            # A point in this column can only be near the part of the segment whose x-coordinates
+            # are within distance of the column, so only the rows that part spans are looked at
+            xa = max(column * self.cell_size - distance, min(x1, x2))
+            xb = min((column + 1) * self.cell_size + distance, max(x1, x2))
+            if dx == 0:
+                ya, yb = y1, y2
+            else:
+                ya, yb = y1 + (xa - x1) * dy / dx, y1 + (xb - x1) * dy / dx
+            top = math.floor((min(ya, yb) - distance) / self.cell_size)
+            bottom = math.floor((max(ya, yb) + distance) / self.cell_size)
+
+            for row in range(top, bottom + 1):
+                for id, (px, py) in self.cells.get((column, row), {}).items():
+                    # The point of the segment closest to (px, py) is at the fraction t of the
+                    # way from (x1, y1) to (x2, y2), clamped to the ends of the segment
+                    t = 0
+                    if length_sq > 0:
+                        t = min(max(((px - x1) * dx + (py - y1) * dy) / length_sq, 0), 1)
+                    if (x1 + t * dx - px) ** 2 + (y1 + t * dy - py) ** 2 <= distance ** 2:
+                        found.append(id)
+        return found
+
+    def __cell(self, x, y):
+        """Returns the (column, row) of the cell containing (x, y)"""
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def __cells_near(self, x, y, distance):
+        """Yields the points of every non-empty cell that is at least partly within distance of (x, y)"""
+        left, top = self.__cell(x - distance, y - distance)
+        right, bottom = self.__cell(x + distance, y + distance)
+
+        for column in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                cell = self.cells.get((column, row))
+                if cell:
+                    yield cell
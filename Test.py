@@ -16,3 +16,432 @@ dest = g.find_vertex(5)
 
 sp = ShortestPathCalculator()
 sp.dijkstra(g, source, dest)
+
+# Saving after changing a vertex value must not write the stale cached CSR snapshot
+import os
+import tempfile
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'g.bin')
+    g.to_csr()
+    g.find_vertex(1).value = 42
+    g.save(path)
+    assert Graph.load(path).find_vertex(1).value == 42
+
+# Firing from the command line and saving to a binary file keeps the fired values
+import contextlib
+import io
+
+from GraphCLI import main
+
+with tempfile.TemporaryDirectory() as tmp:
+    source, fired = os.path.join(tmp, 'g.txt'), os.path.join(tmp, 'f.bin')
+    with open(source, 'w') as file:
+        file.write('v 1 2 0 0\nv 2 -1 10 0\nv 3 0 20 0\ne 1 2 1\n')
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert main(['fire', source, '1:1', '--output', fired]) == 0
+    assert [Graph.load(fired).find_vertex(id).value for id in (1, 2, 3)] == [1, 0, 0]
+
+# GraphML data other than the value, coordinates and weight (such as string labels) is skipped
+from GraphIO import read_graphml
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'g.graphml')
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0"?>\n<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                   '<key id="d0" for="node" attr.name="label" attr.type="string"><default>none</default></key>\n'
+                   '<key id="d1" for="node" attr.name="value" attr.type="long"><default>3</default></key>\n'
+                   '<key id="d2" for="edge" attr.name="weight" attr.type="double"/>\n'
+                   '<graph edgedefault="undirected">\n'
+                   '<node id="1"><data key="d0">a</data></node>\n'
+                   '<node id="2"><data key="d0">b</data><data key="d1">5</data></node>\n'
+                   '<edge source="1" target="2"><data key="d2">2.5</data></edge>\n'
+                   '</graph>\n</graphml>\n')
+    read = read_graphml(path)
+    assert [read.find_vertex(id).value for id in (1, 2)] == [3, 5]
+    assert read.get_weight(1, 2) == 2.5
+
+# Saving a session again after the values change (a give or take) keeps the new values, in every format
+from GraphIO import load_graph, save_graph
+
+with tempfile.TemporaryDirectory() as tmp:
+    for extension in ('.bin', '.json', '.graphml', '.txt'):
+        path = os.path.join(tmp, 'session' + extension)
+        save_graph(g, path)
+        g.find_vertex(2).value -= 1
+        g.find_vertex(3).value += 1
+        save_graph(g, path)
+        assert {v.id: v.value for v in load_graph(path).vertices} == {v.id: v.value for v in g.vertices}
+
+# Removing a vertex moves the last vertex into its place, and later removals still find every vertex
+h = Graph()
+h.add_vertices(*[Vertex(0, 0, 0, id) for id in range(6)])
+h.add_edges_from([(0, 1), (1, 5), (2, 5), (3, 4)])
+assert h.remove_vertex(1) and [v.id for v in h.vertices] == [0, 5, 2, 3, 4]
+assert h.remove_vertex(4) and h.remove_vertex(0) and not h.remove_vertex(0)
+assert [v.id for v in h.vertices] == [3, 5, 2] and h.degree_distribution() == {0: 1, 1: 2}
+assert all(h.remove_vertex(id) for id in (5, 3, 2)) and h.vertices == [] and h.weights == {}
+
+# Adding edges in bulk leaves the same degrees as adding them one at a time
+import random
+
+rng = random.Random(1)
+edge_list = [(rng.randrange(30), rng.randrange(30), rng.randrange(9)) for _ in range(120)]
+one, bulk = Graph(), Graph()
+for graph in (one, bulk):
+    graph.add_vertices(*[Vertex(0, 0, 0, id) for id in range(30)])
+    graph.create_edge(0, 1, 5)
+for edge in edge_list:
+    one.create_edge(*edge)
+assert bulk.add_edges_from(edge_list) == len(one.weights) - 1
+assert bulk.weights == one.weights and bulk.degree_distribution() == one.degree_distribution()
+assert (bulk.find_min_degree(), bulk.find_max_degree()) == (one.find_min_degree(), one.find_max_degree())
+
+# Generating a graph straight into a CSR snapshot gives the same graph as building it
+import GraphGenerators
+
+for generate in (lambda csr: GraphGenerators.grid_graph(4, 6, csr=csr),
+                 lambda csr: GraphGenerators.barabasi_albert_graph(200, 3, seed=5, csr=csr),
+                 lambda csr: GraphGenerators.road_graph(8, 9, seed=6, csr=csr)):
+    built, snapshot = generate(False), generate(True)
+    assert snapshot.to_graph().weights == built.weights
+    assert snapshot.num_edges() == len(built.weights)
+
+# A* finds paths as short as Dijkstra's on random weighted graphs, and none to unreachable vertices
+import math
+
+
+def path_length(graph, path):
+    return sum(graph.get_weight(a, b) for a, b in zip(path, path[1:]))
+
+
+rng = random.Random(2)
+for trial in range(20):
+    r = Graph()
+    r.add_vertices(*[Vertex(0, rng.randrange(100), rng.randrange(100), id) for id in range(40)])
+    for _ in range(60):
+        v1, v2 = r.find_vertex(rng.randrange(35)), r.find_vertex(rng.randrange(35))
+        # The weight is at least the straight line distance, so the default heuristic never overestimates
+        r.create_edge(v1, v2, math.ceil(math.hypot(v1.x - v2.x, v1.y - v2.y)) + rng.randrange(20))
+    for _ in range(10):
+        start, end = r.find_vertex(rng.randrange(40)), r.find_vertex(rng.randrange(40))
+        expected = sp.dijkstra(r, start, end)
+        found = sp.astar(r, start, end)
+        assert (found == []) == (expected == []) and path_length(r, found) == path_length(r, expected)
+        assert not found or (found[0], found[-1]) == (start.id, end.id)
+    assert sp.astar(r, r.find_vertex(0), r.find_vertex(39)) == []
+
+# Bidirectional Dijkstra finds paths as short as Dijkstra's, including from a vertex to itself
+# and to vertices it cannot reach
+rng = random.Random(3)
+for trial in range(20):
+    r = Graph()
+    r.add_vertices(*[Vertex(0, 0, 0, id) for id in range(30)])
+    r.add_edges_from([(rng.randrange(25), rng.randrange(25), rng.randrange(1, 50)) for _ in range(45)])
+    for _ in range(10):
+        start, end = r.find_vertex(rng.randrange(30)), r.find_vertex(rng.randrange(30))
+        expected = sp.dijkstra(r, start, end)
+        found = sp.bidirectional_dijkstra(r, start, end)
+        assert (found == []) == (expected == []) and path_length(r, found) == path_length(r, expected)
+        assert not found or (found[0], found[-1]) == (start.id, end.id)
+    assert sp.bidirectional_dijkstra(r, r.find_vertex(4), r.find_vertex(4)) == [4]
+    assert sp.bidirectional_dijkstra(r, r.find_vertex(4), r.find_vertex(29)) == []
+
+# Shortest path trees are cached until the graph changes, and the cache does not keep graphs alive
+import gc
+import weakref
+
+cached = ShortestPathCalculator(cache_size=2)
+t = Graph()
+t.add_vertices(*[Vertex(0, 0, 0, id) for id in range(4)])
+t.add_edges_from([(0, 1, 5), (1, 2, 5), (2, 3, 5)])
+assert cached.tree_path(t, t.find_vertex(0), t.find_vertex(3)) == [0, 1, 2, 3]
+assert cached.has_tree(t, t.find_vertex(0)) and not cached.has_tree(t, t.find_vertex(1))
+assert cached.tree_path(t, t.find_vertex(0), t.find_vertex(2)) == [0, 1, 2]
+assert (cached.cache_hits, cached.cache_misses) == (1, 1)
+t.create_edge(0, 3, 1)
+assert not cached.has_tree(t, t.find_vertex(0))
+assert cached.tree_path(t, t.find_vertex(0), t.find_vertex(3)) == [0, 3]
+assert cached.shortest_path_tree(t, t.find_vertex(0))[0][2] == 6
+assert (cached.cache_hits, cached.cache_misses) == (2, 2)
+
+freed = weakref.ref(t)
+del t
+gc.collect()
+assert freed() is None
+
+# A CSR snapshot survives a save and a memory-mapped load, even of an empty graph, and changes to
+# the graph bump its version and discard the cached snapshot
+import numpy as np
+from CSRGraph import CSRGraph
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'csr.bin')
+    snapshot = g.to_csr()
+    snapshot.save(path)
+    loaded = CSRGraph.load(path)
+    assert isinstance(loaded.indices, np.memmap) or isinstance(loaded.indices.base, np.memmap)
+    for name in ('indptr', 'indices', 'weights', 'ids', 'x', 'y', 'values'):
+        assert np.array_equal(getattr(loaded, name), getattr(snapshot, name))
+    assert loaded.to_graph().weights == g.weights
+    del loaded
+
+    empty_path = os.path.join(tmp, 'empty.bin')
+    Graph().to_csr().save(empty_path)
+    empty = CSRGraph.load(empty_path)
+    assert (empty.num_vertices(), empty.num_edges()) == (0, 0) and empty.to_graph().vertices == []
+    del empty
+
+version = g.version
+assert g.to_csr() is snapshot
+g.create_edge(2, 4, 7)
+assert g.version > version and g.to_csr() is not snapshot
+assert g.to_csr().num_edges() == snapshot.num_edges() + 1
+version = g.version
+g.remove_edge(2, 4)
+assert g.version > version and g.to_csr().num_edges() == snapshot.num_edges()
+
+# Firing with the Laplacian changes the values exactly as giving and taking one vertex at a time does
+from ChipFiring import ChipFiring
+
+rng = random.Random(4)
+for trial in range(10):
+    values = [rng.randrange(-5, 15) for _ in range(15)]
+    edge_list = [(rng.randrange(15), rng.randrange(15)) for _ in range(25)]
+    by_vertex, by_laplacian = Graph(), Graph()
+    for graph in (by_vertex, by_laplacian):
+        graph.add_vertices(*[Vertex(value, 0, 0, id) for id, value in enumerate(values)])
+        graph.add_edges_from(edge_list)
+
+    game = ChipFiring(by_laplacian)
+    moves = [(rng.randrange(15), rng.randrange(-3, 4)) for _ in range(30)]
+    for id, times in moves:
+        for _ in range(abs(times)):
+            by_vertex.find_vertex(id).give() if times > 0 else by_vertex.find_vertex(id).take()
+    game.run(moves[:10])
+    for id, times in moves[10:]:
+        game.give([id], times) if times > 0 else game.take([id], -times)
+
+    game.write_back()
+    assert {v.id: v.value for v in by_laplacian.vertices} == {v.id: v.value for v in by_vertex.vertices}
+    assert game.is_winning() == all(v.value >= 0 for v in by_vertex.vertices)
+
+# The dollar game: a divisor of degree genus - 1 may or may not be winnable, one of degree genus
+# always is, and giving as the winning script says leaves no vertex in debt
+from DollarGameSolver import DollarGameSolver
+
+
+def dollar_game(values, edge_list):
+    graph = Graph()
+    graph.add_vertices(*[Vertex(value, 0, 0, id) for id, value in enumerate(values)])
+    graph.add_edges_from(edge_list)
+    return graph
+
+
+def wins_with_script(graph):
+    script = DollarGameSolver(graph).winning_script()
+    game = ChipFiring(graph)
+    game.run(script.items())
+    return min(script.values()) >= 0 and game.is_winning()
+
+
+cycle = [(0, 1), (1, 2), (2, 3), (3, 0)]
+complete = [(a, b) for a in range(4) for b in range(a + 1, 4)]
+assert DollarGameSolver(dollar_game([0, 0, 0, 0], cycle)).genus() == 1
+assert DollarGameSolver(dollar_game([0, 0, 0, 0], complete)).genus() == 3
+
+# Degree genus - 1 on a cycle: a dollar moved along one edge can never be moved back, while a
+# vertex that gave to both of its neighbors can take from them again
+assert not DollarGameSolver(dollar_game([1, -1, 0, 0], cycle)).is_winnable()
+assert DollarGameSolver(dollar_game([2, -1, 0, -1], cycle)).is_winnable()
+assert wins_with_script(dollar_game([2, -1, 0, -1], cycle))
+
+# Ordering the vertices and giving each one a dollar less than its number of earlier neighbors
+# is never winnable, one more dollar anywhere (degree genus) always is
+assert not DollarGameSolver(dollar_game([-1, 0, 1, 2], complete)).is_winnable()
+assert DollarGameSolver(dollar_game([-1, 0, 1, 2], complete)).winning_script() is None
+for id in range(4):
+    values = [-1, 0, 1, 2]
+    values[id] += 1
+    assert DollarGameSolver(dollar_game(values, complete)).is_winnable()
+    assert wins_with_script(dollar_game(values, complete))
+
+# Random connected graphs with degree genus, and with a negative degree
+rng = random.Random(5)
+for trial in range(20):
+    edge_list = [(id, rng.randrange(id)) for id in range(1, 12)]
+    edge_list += [(rng.randrange(12), rng.randrange(12)) for _ in range(8)]
+    graph = dollar_game([0] * 12, edge_list)
+    genus = DollarGameSolver(graph).genus()
+    for _ in range(genus + 30):
+        graph.find_vertex(rng.randrange(12)).value += 1
+    for _ in range(30):
+        graph.find_vertex(rng.randrange(12)).value -= 1
+    assert DollarGameSolver(graph).is_winnable() and wins_with_script(graph)
+    graph.find_vertex(0).value -= genus + 1
+    assert not DollarGameSolver(graph).is_winnable() and DollarGameSolver(graph).winning_script() is None
+
+# The queue and wave modes of the sandpile topple to the same configuration, through avalanches
+# of the same sizes and durations
+from Sandpile import Sandpile
+
+rng = random.Random(6)
+for trial in range(10):
+    edge_list = [(id, rng.randrange(id)) for id in range(1, 40)]
+    edge_list += [(rng.randrange(40), rng.randrange(40)) for _ in range(40)]
+    values = [rng.randrange(12) for _ in range(40)]
+    piles = {}
+    for mode in ('queue', 'wave'):
+        graph = Graph()
+        graph.add_vertices(*[Vertex(value, 0, 0, id) for id, value in enumerate(values)])
+        graph.add_edges_from(edge_list)
+        pile = Sandpile(graph, sink=trial)
+        first = pile.stabilize(mode)
+        assert pile.is_stable()
+        pile.drop(7, grains=25, mode=mode)
+        sizes, durations = pile.drop_random(200, seed=trial, mode=mode)
+        piles[mode] = (first, pile.values.tolist(), pile.sizes, pile.durations, sizes.tolist(), durations.tolist())
+    assert piles['queue'] == piles['wave']
+
+# The spatial grid finds the closest point, even on the edges of cells and after points move or go
+from SpatialGrid import SpatialGrid
+
+rng = random.Random(7)
+spatial = SpatialGrid(cell_size=10)
+near = [-10, -0.5, 0, 0.5, 9.5, 10, 10.5, 20, 29.5, 30]
+coordinates = {}
+for id in range(60):
+    coordinates[id] = (rng.choice(near), rng.choice(near))
+    spatial.insert(id, *coordinates[id])
+for step in range(300):
+    if step % 3 == 0:
+        id = rng.randrange(60)
+        coordinates[id] = (rng.choice(near), rng.choice(near))
+        spatial.insert(id, *coordinates[id])
+    elif step % 3 == 1 and coordinates:
+        id = rng.choice(list(coordinates))
+        assert spatial.remove(id) and not spatial.remove(id)
+        del coordinates[id]
+
+    x, y, distance = rng.choice(near), rng.choice(near), rng.choice([0, 0.5, 5, 10, 15])
+    closest = spatial.find_closest(x, y, distance)
+    dists = {id: (px - x) ** 2 + (py - y) ** 2 for id, (px, py) in coordinates.items()}
+    within = {id for id, dist in dists.items() if dist <= distance ** 2}
+    assert set(spatial.find_within(x, y, distance)) == within
+    assert (closest is None) == (not within)
+    assert closest is None or dists[closest] == min(dists[id] for id in within)
+assert len(spatial) == len(coordinates) and all(id in spatial for id in coordinates)
+
+# Points near a segment are found exactly as a brute force search finds them, for segments that
+# start, end or run along the edges of cells
+def segment_distance_sq(px, py, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    t = 0 if dx == dy == 0 else min(max(((px - x1) * dx + (py - y1) * dy) / (dx ** 2 + dy ** 2), 0), 1)
+    return (x1 + t * dx - px) ** 2 + (y1 + t * dy - py) ** 2
+
+
+rng = random.Random(8)
+spatial = SpatialGrid(cell_size=10)
+coordinates = {id: (rng.uniform(-15, 45), rng.uniform(-15, 45)) for id in range(200)}
+for id in range(200, 230):
+    coordinates[id] = (10 * rng.randrange(-1, 5), 10 * rng.randrange(-1, 5))
+for id, (x, y) in coordinates.items():
+    spatial.insert(id, x, y)
+ends = [-10, 0, 5, 10, 20, 29.5, 30]
+for _ in range(300):
+    x1, y1, x2, y2 = (rng.choice(ends) for _ in range(4))
+    if rng.random() < 0.3:
+        x2 = x1
+    elif rng.random() < 0.3:
+        y2 = y1
+    distance = rng.choice([0, 2, 5, 10])
+    expected = {id for id, (px, py) in coordinates.items()
+                if segment_distance_sq(px, py, x1, y1, x2, y2) <= distance ** 2}
+    found = spatial.find_near_segment(x1, y1, x2, y2, distance)
+    assert len(found) == len(expected) and set(found) == expected
+
+# The canvas renderer waits for tkinter to be idle and then sends each real change once
+from CanvasRenderer import CanvasRenderer
+
+
+class StubCanvas:
+    def __init__(self):
+        self.idle, self.configured, self.deleted = [], [], []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def itemconfigure(self, item, **options):
+        self.configured.append((item, options))
+
+    def delete(self, item):
+        self.deleted.append(item)
+
+    def run_idle(self):
+        callbacks, self.idle = self.idle, []
+        for callback in callbacks:
+            callback()
+
+
+canvas = StubCanvas()
+renderer = CanvasRenderer(canvas, bulk_threshold=3)
+for item in range(1, 6):
+    renderer.track(item, fill='green', width=1)
+renderer.configure(1, fill='red')
+renderer.configure(1, width=2)
+renderer.configure(2, fill='red')
+renderer.configure(2, fill='green')
+renderer.configure(3, fill='green')
+assert len(canvas.idle) == 1 and canvas.configured == [] and renderer.get(1, 'fill') == 'red'
+canvas.run_idle()
+assert canvas.configured == [(1, {'fill': 'red', 'width': 2})] and renderer.calls == 1
+
+# A tag is configured in one call once enough of its items change, fewer go one at a time
+canvas.configured = []
+renderer.configure_tag('vertex', range(1, 6), fill='blue')
+renderer.configure_tag('edge', [1, 2], width=3)
+renderer.configure(4, fill='red')
+renderer.delete(5)
+assert len(canvas.idle) == 1
+canvas.run_idle()
+assert canvas.configured == [('vertex', {'fill': 'blue'}), (1, {'width': 3}), (2, {'width': 3}), (4, {'fill': 'red'})]
+assert canvas.deleted == [5] and renderer.get(3, 'fill') == 'blue' and renderer.get(5, 'fill') is None
+renderer.flush()
+assert canvas.idle == [] and renderer.calls == 5
+
+# All pairs shortest paths agree with Dijkstra for both backends, including edges of weight 0 and
+# vertices that cannot be reached
+rng = random.Random(9)
+for trial in range(10):
+    r = Graph()
+    r.add_vertices(*[Vertex(0, 0, 0, id) for id in range(25)])
+    r.add_edges_from([(rng.randrange(22), rng.randrange(22), rng.randrange(0, 20)) for _ in range(40)])
+    ids = r.to_csr().ids.tolist()
+    for method in ('floyd-warshall', 'dijkstra'):
+        distances, predecessors = sp.all_pairs(r, method)
+        for i in range(0, 25, 3):
+            for j in range(25):
+                expected = sp.dijkstra(r, r.find_vertex(ids[i]), r.find_vertex(ids[j]))
+                if not expected:
+                    assert distances[i, j] == np.inf and predecessors[i, j] == -1
+                    continue
+                assert distances[i, j] == path_length(r, expected)
+
+                # Following the predecessors back from j gives a path of the same length
+                path = [j]
+                while predecessors[i, path[-1]] >= 0:
+                    path.append(predecessors[i, path[-1]])
+                assert path[-1] == i and path_length(r, [ids[k] for k in reversed(path)]) == distances[i, j]
+
+assert r.create_edge(22, 23, -1)
+for method in ('floyd-warshall', 'dijkstra', 'auto'):
+    try:
+        sp.all_pairs(r, method)
+        assert False, 'negative weights were not rejected'
+    except RuntimeError:
+        pass
+try:
+    sp.all_pairs(g, 'bellman-ford')
+    assert False, 'an unknown method was not rejected'
+except ValueError:
+    pass
@@ -5,11 +5,17 @@
 # Created On: 9/1/2018             				                     #
 #--------------------------------------------------------------------#
 
+from collections.abc import Mapping
+
 
 class Vertex():
     """A class for a vertex in a graph, keeps track of its value,
         x and y coordinates and adjacent vertices"""
 
+    # Vertices have a fixed set of attributes, so we store them in slots rather than in a
+    # per-instance __dict__ to keep large graphs small in memory
+    __slots__ = ('value', 'x', 'y', 'id', 'adjacent')
+
     def __init__(self, value=0, x=0, y=0, id=0):
         """Constructs a new Vertex with a value and coordinates
 
@@ -23,10 +29,10 @@ class Vertex():
             The y-coordinate of this vertex on the screen (default 0)
         id : int
             The unique identifier of this vertex
-        adjacent : list
-            A list containing every vertex that is adjacent to this vertex
-        weights : dict
-            A dictionary mapping the id's of adjacent vertices to the weight of the edge
+        adjacent : dict
+            A dictionary mapping every vertex that is adjacent to this vertex to the weight of the edge
+        weights : Mapping
+            A view mapping the id's of adjacent vertices to the weight of the edge (read only)
 
         Methods
         -------
@@ -48,6 +54,8 @@ class Vertex():
             Gets a list of the id numbers of the vertices currently adjacent to this vertex
         get_value()
             Gets the current value of this vertex
+        degree()
+            Gets the number of vertices adjacent to this vertex
         """
 
         # The value first held by this Vertex
@@ -61,18 +69,16 @@ class Vertex():
         # represents it in the canvas
         self.id = id
 
-        # The list of this Vertex's adjacent vertices (those it is connected to via an edge)
-        self.adjacent = []
-
-        # Dictionary of the ids of the vertices adjacent to this vertex to the weight of their edge
-        self.weights = {}
+        # Dictionary of this Vertex's adjacent vertices (those it is connected to via an edge)
+        # to the weight of their edge
+        self.adjacent = {}
 
     def __repr__(self):
         """Returns a representation of this Vertex"""
         s = f'Coordinates: ({self.x}, {self.y})\nValue: {self.value}\n'
 
-        for k in self.weights.keys():
-            s = s + f'Adjacent: {str(k)} - {self.weights[k]}\n'
+        for k, w in self.adjacent.items():
+            s = s + f'Adjacent: {str(k.id)} - {w}\n'
 
         return s
 
@@ -82,6 +88,28 @@ class Vertex():
             return self.id == other.id
         return False
 
+    def __hash__(self):
+        """Returns a hash of this Vertex, equal vertices (those with the same id) hash the same"""
+        return hash(self.id)
+
+    @property
+    def weights(self):
+        """A read only mapping of the id's of adjacent vertices to the weight of the edge
+
+        The mapping is a live view of the adjacent vertices, so it is cheap to request and
+        always reflects the current edges of this vertex
+        """
+        return _AdjacentWeights(self)
+
+    def _lookup(self, vertex_id, default=None):
+        """Returns the weight of the edge to the vertex with the given id, or default if there is none"""
+
+        # Adjacent vertices hash and compare by their id numbers, so a shared probe holding the
+        # id finds the edge without building a new Vertex for every lookup
+        probe = Vertex._probe
+        probe.id = vertex_id
+        return self.adjacent.get(probe, default)
+
     def add_adjacent(self, vertex, weight=0):
         """Adds a new Vertex adjacent to this Vertex, essentially creating an edge
 
@@ -100,16 +128,12 @@ class Vertex():
 
         # If the given vertex has the same id number as this vertex, or has the same
         # id as an already adjacent vertex, do not create the edge
-        if self == vertex or vertex.id in self.weights.keys():
+        if self == vertex or vertex in self.adjacent:
             return False
 
-        # First add the new vertex to the list of adjacent vertices and map its id to the weight
-        self.adjacent.append(vertex)
-        self.weights.update({vertex.id: weight})
-
-        # Now do the same for the other vertex
-        vertex.adjacent.append(self)
-        vertex.weights.update({self.id: weight})
+        # Map the new vertex to the weight of the edge, and do the same for the other vertex
+        self.adjacent[vertex] = weight
+        vertex.adjacent[self] = weight
         return True
 
     def delete_adjacent(self, vertex):
@@ -126,13 +150,9 @@ class Vertex():
             True if the edge was successfully removed and False otherwise
         """
         if self.is_adjacent(vertex):
-            # Now remove the vertex from the weights dictionary and the list of adjacent vertices
-            del self.weights[vertex.id]
-            self.adjacent.remove(vertex)
-
-            # Do the same for the removed vertex
-            del vertex.weights[self.id]
-            vertex.adjacent.remove(self)
+            # Remove the vertex from the adjacent vertices, and do the same for the removed vertex
+            del self.adjacent[vertex]
+            del vertex.adjacent[self]
             return True
         return False
 
@@ -153,19 +173,19 @@ class Vertex():
             return vertex in self.adjacent
 
         if isinstance(vertex, int):
-            return vertex in self.weights.keys()
+            return self._lookup(vertex, _MISSING) is not _MISSING
 
     def give(self):
         """Gives a dollar to each of this Vertex's neighboring Vertices"""
-        for i in range(len(self.adjacent)):
-            self.value = self.value - 1
-            self.adjacent[i].value = self.adjacent[i].value + 1
+        for adj in self.adjacent:
+            adj.value = adj.value + 1
+        self.value = self.value - len(self.adjacent)
 
     def take(self):
         """Takes a dollar from each of this Vertex's neighboring Vertices"""
-        for i in range(len(self.adjacent)):
-            self.value = self.value + 1
-            self.adjacent[i].value = self.adjacent[i].value - 1
+        for adj in self.adjacent:
+            adj.value = adj.value - 1
+        self.value = self.value + len(self.adjacent)
 
     def get_coordinates(self):
         """Returns a tuple of this Vertex's x and y coordinates
@@ -195,7 +215,7 @@ class Vertex():
         list
             List of the vertices currently adjacent to this vertex
         """
-        return self.adjacent
+        return list(self.adjacent)
 
     def get_adjacent_ids(self):
         """Returns the list of ids of this Vertex's adjacent vertices
@@ -205,7 +225,7 @@ class Vertex():
         list
             List of the id numbers of the vertices adjacent to this vertex
         """
-        return self.weights.keys()
+        return [v.id for v in self.adjacent]
 
     def get_value(self):
         """Returns the value of this vertex
@@ -217,6 +237,16 @@ class Vertex():
         """
         return self.value
 
+    def degree(self):
+        """Returns the degree of this vertex
+
+        Returns
+        -------
+        int
+            The number of vertices adjacent to this vertex
+        """
+        return len(self.adjacent)
+
     def weight(self, vertex):
         """Gets the weight of the edge between this vertex and the given one (if there is an edge)
 
@@ -231,17 +261,42 @@ class Vertex():
             The weight of the edge between the vertices or None if there is no edge
         """
 
-        # If the given vertex is not adjacent at all, then return None
-        if not self.is_adjacent(vertex):
-            return None
+        # If the given argument was an id number, look it up by id
+        if isinstance(vertex, int):
+            return self._lookup(vertex)
+
+        return self.adjacent.get(vertex)
+
+
+# The vertex used by Vertex._lookup to find adjacent vertices by id number
+Vertex._probe = Vertex()
+
+# Marks a missing edge in lookups where None could be a weight
+_MISSING = object()
 
-        # If the given argument was a Vertex instance, set it to its id number
-        # NOTE: At this point we have a guarantee that the passed vertex IS adjacent,
-        # thus is must follow that vertex.id is a key in the self.weights dictionary
-        if isinstance(vertex, Vertex):
-            vertex = vertex.id
 
-        return self.weights[vertex]
+class _AdjacentWeights(Mapping):
+    """A read only view mapping the id's of a vertex's adjacent vertices to the weights of the edges"""
+
+    __slots__ = ('_vertex',)
+
+    def __init__(self, vertex):
+        self._vertex = vertex
+
+    def __getitem__(self, vertex_id):
+        weight = self._vertex._lookup(vertex_id, _MISSING)
+        if weight is _MISSING:
+            raise KeyError(vertex_id)
+        return weight
+
+    def __iter__(self):
+        return (v.id for v in self._vertex.adjacent)
+
+    def __len__(self):
+        return len(self._vertex.adjacent)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
 
 
 